@@ -0,0 +1,163 @@
+import os
+import time
+import argparse
+
+from pedal_events import RAPID_ACCELERATION, HARD_BRAKE, NO_BRAKE, STOP
+from pedal_alerts import (AlertPlayer, RecordingSink, Clip, ClipCache, DEFAULT_ALERTS,
+                          detectFormat, probeMp3, decodeClip, miniaudio)
+
+'''
+Headless checks of the pedal alert path (pedal_alerts.AlertPlayer) with a
+RecordingSink.
+
+- formats: the real format of every alert clip and its length; with miniaudio
+  installed, the time to decode each clip from disk (what every alert would
+  cost without the cache) against a cached lookup.
+- alert(): the time the calling (sampling) thread spends per alert.
+- latency: alert() to start of playback on an idle player.
+- ordering: a burst of every kind, with repeats, while a low priority clip
+  plays; the clips must come out highest priority first with each kind once.
+- preempt: a NO_BRAKE alert stopping a STOP clip that is playing.
+
+Clips play --speed times faster than real time.  Without miniaudio the MP3
+clips cannot be decoded, so silent clips of the same length (read from the
+MP3 frame headers) are put in the cache instead.
+
+Usage: python benchmark_alerts.py [--alerts 200] [--speed 20]
+'''
+
+KINDS = (NO_BRAKE, HARD_BRAKE, RAPID_ACCELERATION, STOP)
+
+
+def loadClips(directory):
+    """알림 클립의 (이름, 형식, 길이(초), 디스크에서 디코딩한 시간(초) 또는 None) 목록"""
+    result = []
+    for priority, names in DEFAULT_ALERTS.values():
+        for name in names:
+            with open(os.path.join(directory, name), 'rb') as f:
+                data = f.read()
+            format = detectFormat(data)
+            duration = probeMp3(data)[2] if format == 'mp3' else None
+            decodeSeconds = None
+            if miniaudio is not None or format == 'wav':
+                start = time.perf_counter()
+                with open(os.path.join(directory, name), 'rb') as f:
+                    clip = decodeClip(name, f.read())
+                decodeSeconds = time.perf_counter() - start
+                duration = len(clip.pcm) / (2 * clip.channels * clip.sampleRate)
+            result.append((name, format, duration, decodeSeconds))
+    return result
+
+
+def makePlayer(clips, speed, **kwargs):
+    player = AlertPlayer(RecordingSink(realtime=True, speed=speed), **kwargs)
+    for name, format, duration, decodeSeconds in clips:
+        if decodeSeconds is None:
+            # 디코더가 없으면 같은 길이의 무음으로 대신함
+            player.cache.add(Clip(name, bytes(2 * int(duration * 24000)), 24000, 1))
+    player.start()
+    return player
+
+
+def waitIdle(player, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while (player.playing is not None or player.getStats()['counts']['waiting']) and \
+            time.perf_counter() < deadline:
+        time.sleep(0.001)
+
+
+def measureLatency(clips, alerts, speed):
+    player = makePlayer(clips, speed, dedupeWindow=0.0, minGap=0.0)
+    callCost = []
+    for i in range(alerts):
+        kind = KINDS[i % len(KINDS)]
+        start = time.perf_counter_ns()
+        player.alert(kind)
+        callCost.append(time.perf_counter_ns() - start)
+        waitIdle(player)
+    player.stop()
+    callCost.sort()
+    return callCost, player.latency.snapshot(), player.getStats()['counts']
+
+
+def checkOrdering(clips, speed):
+    player = makePlayer(clips, speed, preempt=False, minGap=0.05)
+    player.alert(STOP)
+    while player.playing is None:
+        time.sleep(0.001)
+    # 재생 중에 낮은 우선순위부터 반복해서 넣음
+    for repeat in range(3):
+        for kind in reversed(KINDS):
+            player.alert(kind)
+    waitIdle(player)
+    player.stop()
+    names = [entry[0] for entry in player.sink.played]
+    starts = [entry[1] for entry in player.sink.played]
+    gaps = [(b - a) / 1e9 for a, b in zip(starts, starts[1:])]
+    kinds = []
+    for name in names:
+        for kind, (priority, kindNames) in DEFAULT_ALERTS.items():
+            if name in kindNames:
+                kinds.append(kind)
+    expected = [STOP, NO_BRAKE, HARD_BRAKE, RAPID_ACCELERATION]
+    return kinds, kinds == expected, min(gaps) if gaps else None, player.getStats()['counts']
+
+
+def checkPreempt(clips, speed):
+    player = makePlayer(clips, speed, preempt=True)
+    player.alert(STOP)
+    while player.playing is None:
+        time.sleep(0.001)
+    time.sleep(0.01)
+    start = time.perf_counter_ns()
+    player.alert(NO_BRAKE)
+    waitIdle(player)
+    player.stop()
+    played = player.sink.played
+    stopped = played[0][3] if played else False
+    startNs = played[1][1] if len(played) > 1 else None
+    return stopped, (startNs - start) / 1e6 if startNs is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless alert latency and ordering checks")
+    parser.add_argument('--alerts', type=int, default=200)
+    parser.add_argument('--speed', type=float, default=20.0, help="playback speed-up of the recording sink")
+    args = parser.parse_args()
+
+    directory = os.path.dirname(os.path.abspath(__file__))
+    clips = loadClips(directory)
+    print("decoder: %s" % ("miniaudio" if miniaudio is not None else "none (MP3 clips replaced by silence)"))
+    for name, format, duration, decodeSeconds in clips:
+        print("  %-24s %-4s %5.2f s%s" % (name, format, duration,
+                                          "  decode %.1f ms" % (decodeSeconds * 1000)
+                                          if decodeSeconds is not None else ""))
+
+    cache = ClipCache(lambda name: Clip(name, b'\x00\x00', 24000, 1))
+    cache.get('clip')
+    start = time.perf_counter_ns()
+    for i in range(10000):
+        cache.get('clip')
+    print("cached clip lookup: %.2f us" % ((time.perf_counter_ns() - start) / 10000 / 1000))
+
+    callCost, latency, counts = measureLatency(clips, args.alerts, args.speed)
+    print("alert() call: p50 %.1f us, p99 %.1f us, max %.1f us" % (
+        callCost[len(callCost) // 2] / 1000, callCost[int(len(callCost) * 0.99)] / 1000,
+        callCost[-1] / 1000))
+    # 재생 지연은 2의 거듭제곱 버킷 상한
+    print("alert -> playback: p50 <= %.2f ms, p99 <= %.2f ms, max %.2f ms (%d played, %d failed)" % (
+        latency['p50Ns'] / 1e6, latency['p99Ns'] / 1e6, latency['maxNs'] / 1e6,
+        counts['played'], counts['failed']))
+
+    kinds, ordered, minGap, counts = checkOrdering(clips, args.speed)
+    print("ordering: %s -> %s; %d deduplicated, smallest start gap %.3f s" % (
+        ", ".join(kinds), "OK" if ordered else "WRONG", counts['deduped'], minGap or 0.0))
+
+    stopped, preemptMs = checkPreempt(clips, args.speed)
+    print("preempt: STOP clip %s, NO_BRAKE started %s" % (
+        "stopped" if stopped else "NOT stopped",
+        "after %.2f ms" % preemptMs if preemptMs is not None else "never"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import sys
+import time
+import asyncio
+
+from hx711_emulator import HX711
+from hx711_async import AsyncHX711
+
+'''
+Event-loop cost of fanning HX711 samples out to many coroutines with
+AsyncHX711.
+
+An emulated HX711 converts at 80 SPS on its acquisition thread while N
+coroutines consume every sample, either one at a time (stream()) or one batch
+per wake-up (batches()).  A ticker coroutine sleeping 5 ms measures how late
+the loop runs other work: that lag is what an audio or UI task on the same
+loop would see.  "samples/wake" above 1 means wake-ups were merged because
+the loop was busy.
+
+Usage: python benchmark_async.py [consumers] [seconds]
+'''
+
+
+async def measure(mode, consumers, seconds):
+    hx = HX711(seed=1, dataRate=80)
+    counts = []
+
+    async with AsyncHX711(hx) as source:
+        async def consume():
+            count = 0
+            if mode == 'stream':
+                async for sample in source.stream():
+                    count += 1
+            else:
+                async for samples in source.batches():
+                    count += len(samples)
+            counts.append(count)
+
+        tasks = [asyncio.ensure_future(consume()) for i in range(consumers)]
+        await asyncio.sleep(0.5)
+
+        lags = []
+        firstSeq = hx.ring.seq
+        firstWake = source.wakeCount
+        cpuStart = time.process_time()
+        wallStart = time.perf_counter()
+        while time.perf_counter() - wallStart < seconds:
+            start = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - start - 0.005)
+        wall = time.perf_counter() - wallStart
+        cpu = time.process_time() - cpuStart
+        samples = hx.ring.seq - firstSeq
+        wakes = source.wakeCount - firstWake
+
+        source.stop()
+        await asyncio.gather(*tasks)
+        dropped = source.droppedCount
+
+    hx.stopAcquisition()
+    lags.sort()
+    return {
+        'cpu': cpu / wall,
+        'lagP50Ms': lags[len(lags) // 2] * 1000,
+        'lagP99Ms': lags[min(len(lags) - 1, int(len(lags) * 0.99))] * 1000,
+        'samplesPerWake': samples / wakes if wakes else 0.0,
+        'dropped': dropped,
+    }
+
+
+def main():
+    consumers = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3.0
+
+    for mode in ('stream', 'batches'):
+        result = asyncio.run(measure(mode, consumers, seconds))
+        print("%-8s %5d consumers: CPU %3.0f%%, loop lag p50 %6.1f ms, p99 %6.1f ms, %.1f samples/wake, dropped %d" % (
+            mode, consumers, result['cpu'] * 100, result['lagP50Ms'], result['lagP99Ms'],
+            result['samplesPerWake'], result['dropped']))
+
+
+if __name__ == "__main__":
+    main()
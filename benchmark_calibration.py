@@ -0,0 +1,143 @@
+import os
+import time
+import argparse
+import tempfile
+
+from hx711_time import SimulatedClock
+from hx711_emulator import HX711
+from hx711_calibration import Calibrator, ProfileStore, sensorIdOf, profileToWeight
+
+'''
+Calibration profiles against an emulated load cell with a slightly
+non-linear response (counts = 80000 + 100 * w + k * w^2).
+
+- fit: offset, reference unit, residual and worst error over 0..20 kg of the
+  linear and the quadratic fit from 6 known weights.
+- load: time to load a store of --profiles profiles at boot.
+- first weight: simulated time from power-up to the first weight, taring
+  with 15 conversions (as tare_A() does) against applying a stored profile.
+- hot reload: with the acquisition thread streaming at 80 SPS in real time,
+  the time from saving a new profile to the driver using it.  Then the file
+  is overwritten with a truncated copy, as an editor saving in place might
+  leave it: the reload must fail, keep the last profile and leave
+  acquisition running, and pick up the file once it is whole again.
+
+Usage: python benchmark_calibration.py [--nonlinearity K] [--profiles 8]
+'''
+
+WEIGHTS = (0.0, 1000.0, 2000.0, 5000.0, 10000.0, 20000.0)
+
+
+class LoadCell:
+    """올려 둔 무게에 따른 원시값 (에뮬레이터 signal)"""
+
+    def __init__(self, nonlinearity):
+        self.nonlinearity = nonlinearity
+        self.weight = 0.0
+
+    def counts(self, weight):
+        return 80000 + 100 * weight + self.nonlinearity * weight * weight
+
+    def __call__(self, times):
+        return [self.counts(self.weight)] * len(times)
+
+
+def emulator(cell, clock=time, seed=1):
+    hx = HX711(dataRate=80, seed=seed, clock=clock, signal=cell, noise=300.0, spikeRate=0)
+    # 무게를 바꾸면 다음 변환부터 반영되도록 블록을 작게
+    hx.BLOCK_SIZE = 1
+    return hx
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibration fit, profile load and hot reload")
+    parser.add_argument('--nonlinearity', type=float, default=0.00005)
+    parser.add_argument('--profiles', type=int, default=8)
+    args = parser.parse_args()
+
+    clock = SimulatedClock()
+    cell = LoadCell(args.nonlinearity)
+    hx = emulator(cell, clock)
+    calibrator = Calibrator(sensorIdOf(hx), hx.getGain())
+    for weight in WEIGHTS:
+        cell.weight = weight
+        calibrator.measure(hx, weight, times=40)
+    for quadratic in (False, True):
+        profile = calibrator.fit(quadratic)
+        worst = max(abs(profileToWeight(profile, cell.counts(w)) - w) for w in range(0, 20001, 100))
+        print("%-9s fit: offset %.0f, reference unit %.4f, residual %.2f, worst error %.2f (noise %.0f counts)" % (
+            "quadratic" if quadratic else "linear", profile.offset, profile.referenceUnit,
+            profile.residual, worst, profile.noise))
+
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'calibration.json')
+    store = ProfileStore(path)
+    for i in range(args.profiles - 1):
+        store.put(profile._replace(sensorId="%d:%d" % (10 + i, 20 + i)))
+    store.put(profile)
+    store.save()
+    start = time.perf_counter()
+    for i in range(1000):
+        ProfileStore(path)
+    print("load %d profiles: %.1f us" % (args.profiles, (time.perf_counter() - start) / 1000 * 1e6))
+
+    cell.weight = 7000.0
+    for name in ('tare(15)', 'profile'):
+        clock = SimulatedClock()
+        startNs = clock.monotonic_ns()
+        hx = emulator(cell, clock, seed=2)
+        constructedNs = clock.monotonic_ns()
+        if name == 'profile':
+            ProfileStore(path).apply(hx)
+            weight = hx.getWeight()
+        else:
+            # 빈 저울로 영점을 잡아야 하므로 페달에서 발을 뗀 상태를 가정
+            cell.weight = 0.0
+            hx.autosetOffset(15)
+            cell.weight = 7000.0
+            hx.setReferenceUnit(profile.referenceUnit)
+            weight = hx.getWeight()
+        doneNs = clock.monotonic_ns()
+        print("first weight with %-8s %7.1f ms after power-up (%.1f ms after construction): %.1f" % (
+            name + ':', (doneNs - startNs) / 1e6, (doneNs - constructedNs) / 1e6, weight))
+
+    hx = emulator(cell)
+    store = ProfileStore(path)
+    store.apply(hx)
+    store.attach(hx, checkInterval=0.05)
+    time.sleep(0.2)
+    updated = profile._replace(referenceUnit=profile.referenceUnit * 1.01)
+    writer = ProfileStore(path)
+    writer.put(updated)
+    start = time.perf_counter()
+    writer.save()
+    while hx.getReferenceUnit() != updated.referenceUnit and time.perf_counter() - start < 5.0:
+        time.sleep(0.001)
+    print("hot reload: applied %.1f ms after save (check interval 50 ms), %d reloads" % (
+        (time.perf_counter() - start) * 1000, store.loadCount - 1))
+
+    with open(path, 'rb') as f:
+        whole = f.read()
+    with open(path, 'wb') as f:
+        f.write(whole[:len(whole) // 2])
+    seq = hx.ring.seq
+    time.sleep(0.2)
+    survived = hx.acquisitionThread.is_alive() and hx.ring.seq > seq
+    kept = hx.getReferenceUnit() == updated.referenceUnit
+    errors = store.reloadErrorCount
+    writer.put(profile)
+    writer.save()
+    start = time.perf_counter()
+    while hx.getReferenceUnit() != profile.referenceUnit and time.perf_counter() - start < 5.0:
+        time.sleep(0.001)
+    recovered = hx.getReferenceUnit() == profile.referenceUnit
+    print("truncated file: %d failed reloads (%s), profile %s, acquisition %s, %s after rewrite" % (
+        errors, type(store.lastReloadError).__name__, "kept" if kept else "LOST",
+        "running" if survived else "STOPPED", "recovered" if recovered else "NOT recovered"))
+    hx.stopAcquisition()
+    os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import time
+import argparse
+
+from hx711_gpio import FakeGPIO, FakeHX711
+from hx711_channels import ChannelScheduler
+import hx711
+import hx711v0_5_1
+
+'''
+Reading both channels of one HX711, on the fake GPIO backend with a chip
+that converts channel A and channel B to different values.
+
+- setGain switching: setGain(32), read, setGain(128), read, as
+  get_value_B() used to do.  Every switch throws one conversion away.
+- get_value_B(1)/read_long(): hx711.HX711 with the pipelined channel B reads.
+  The conversion already armed for channel A is still thrown away before
+  each B read, so this costs one extra conversion per B sample.
+- ChannelScheduler 1:1 and 3:1: the trailing gain pulses of each read pick
+  the channel of the next conversion, and nothing is thrown away but the
+  first read.
+
+Reports the samples per channel, the conversions read out of the chip and
+thrown away, the samples per second and the number of samples whose channel
+tag does not match the value (must be 0).
+
+Usage: python benchmark_channels.py [--samples 80] [--rate 80]
+'''
+
+VALUES = {128: 100000, 64: 50000, 32: -7000}
+
+
+def makeSensor(module, rate):
+    gpio = FakeGPIO()
+    chip = gpio.attach(FakeHX711(dataRate=rate, source=VALUES.get), 5, 6)
+    return module.HX711(5, 6, gpio=gpio), chip
+
+
+def switching(samples, rate):
+    hx, chip = makeSensor(hx711v0_5_1, rate)
+    result = []
+    while len(result) < samples:
+        for gain, channel in ((32, 'B'), (128, 'A')):
+            hx.setGain(gain)
+            result.append((channel, hx.getLong()))
+    return hx, chip, result
+
+
+def pipelinedB(samples, rate):
+    hx, chip = makeSensor(hx711, rate)
+    hx.set_offset_B(0)
+    result = []
+    while len(result) < samples:
+        result.append(('B', hx.get_value_B(1)))
+        result.append(('A', hx.read_long()))
+    return hx, chip, result
+
+
+def scheduled(ratio):
+    def run(samples, rate):
+        hx, chip = makeSensor(hx711v0_5_1, rate)
+        scheduler = ChannelScheduler(ratio)
+        result = []
+        while len(result) < samples:
+            seq, timestampNs, channel, value = scheduler.read(hx)
+            result.append((channel, value))
+        return hx, chip, result
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Channel A/B interleaving with and without discarded conversions")
+    parser.add_argument('--samples', type=int, default=80)
+    parser.add_argument('--rate', type=float, default=80.0, help="conversions per second of the fake chip")
+    args = parser.parse_args()
+
+    print("%-28s %5s %5s %8s %9s %9s %8s" % (
+        "method", "A", "B", "readout", "discarded", "samples/s", "mistags"))
+    for name, method in (("setGain switching", switching),
+                         ("get_value_B(1)/read_long()", pipelinedB),
+                         ("ChannelScheduler 1:1", scheduled((1, 1))),
+                         ("ChannelScheduler 3:1", scheduled((3, 1)))):
+        start = time.perf_counter()
+        hx, chip, result = method(args.samples, args.rate)
+        elapsed = time.perf_counter() - start
+        # 칩은 다음 준비 확인 때 읽기를 마무리하므로 마지막 읽기를 반영
+        chip.isReadyAt(time.perf_counter_ns())
+        counts = dict((channel, sum(1 for c, v in result if c == channel)) for channel in 'AB')
+        mistags = sum(1 for channel, value in result if (value == VALUES[32]) != (channel == 'B'))
+        print("%-28s %5d %5d %8d %9d %9.1f %8d" % (
+            name, counts['A'], counts['B'], chip.sampleCount, chip.sampleCount - len(result),
+            len(result) / elapsed, mistags))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import sys
+import time
+
+from hx711_gpio import FakeGPIO, FakeHX711
+from hx711 import HX711
+
+'''
+Compares the 24+N bit clock-out of the old per-bit method calls
+(readNextByte -> readNextBit -> GPIO calls, with the bit format checked on
+every bit) against the single-loop clock-out used by readRawBytes() now.
+
+With the fake GPIO backend it records, for every read, the longest PD_SCK high
+interval (the HX711 powers down if it exceeds 60us) and the total clock-out
+duration from the backend's call timestamps.  The fake's pin calls are Python
+code themselves, so the same reads are also timed against BuiltinPins, whose
+pin calls are C builtins like RPi.GPIO's, to show the driver's own overhead.
+
+Usage: python benchmark_clockout.py [reads]
+'''
+
+
+class BuiltinPins:
+    BCM = 11
+    OUT = 0
+    IN = 1
+    LOW = 0
+
+    def __init__(self, dout):
+        levels = {dout: 0}
+        self.output = levels.__setitem__
+        self.input = levels.get
+
+    def setmode(self, mode):
+        pass
+
+    def setup(self, channel, direction):
+        pass
+
+
+def legacyClockOut(hx):
+    firstByte = hx.readNextByte()
+    secondByte = hx.readNextByte()
+    thirdByte = hx.readNextByte()
+    for i in range(hx.GAIN):
+        hx.readNextBit()
+    return [firstByte, secondByte, thirdByte]
+
+
+def loopClockOut(hx):
+    return hx._bytesDecoder(hx._clockOut(24 + hx.GAIN))
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(clockOut, reads):
+    gpio = FakeGPIO()
+    chip = gpio.attach(FakeHX711(value=-123456, dataRate=None), 5, 6)
+    hx = HX711(5, 6, gpio=gpio)
+    sck = hx.PD_SCK
+
+    highTimes = []
+    totalTimes = []
+    gpio.recordEvents = True
+    for i in range(reads):
+        hx.readyWaiter.wait()
+        del gpio.events[:]
+        clockOut(hx)
+
+        events = gpio.events
+        edges = [(t, level) for (t, op, pin, level) in events if op == 'output' and pin == sck]
+        highTimes.append(max(edges[j + 1][0] - edges[j][0]
+                             for j in range(0, len(edges) - 1, 2)))
+        totalTimes.append(events[-1][0] - events[0][0])
+
+    highTimes.sort()
+    totalTimes.sort()
+    return {
+        'sckHighMedianUs': percentile(highTimes, 0.5) / 1000,
+        'sckHighP99Us': percentile(highTimes, 0.99) / 1000,
+        'sckHighMaxUs': highTimes[-1] / 1000,
+        'clockOutMedianUs': percentile(totalTimes, 0.5) / 1000,
+        'clockOutP99Us': percentile(totalTimes, 0.99) / 1000,
+        'powerDowns': chip.powerDownCount,
+    }
+
+
+def measureBuiltin(clockOut, reads):
+    hx = HX711(5, 6, gpio=BuiltinPins(5))
+    clock = time.perf_counter_ns
+
+    totalTimes = []
+    for i in range(reads):
+        start = clock()
+        clockOut(hx)
+        totalTimes.append(clock() - start)
+
+    totalTimes.sort()
+    return {
+        'clockOutMedianUs': percentile(totalTimes, 0.5) / 1000,
+        'clockOutP99Us': percentile(totalTimes, 0.99) / 1000,
+        'clockOutMaxUs': totalTimes[-1] / 1000,
+    }
+
+
+def main():
+    reads = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    print("Fake GPIO backend:")
+    for name, clockOut in (('per-bit calls', legacyClockOut), ('single loop', loopClockOut)):
+        result = measure(clockOut, reads)
+        print("%-14s SCK high median %6.2f us, p99 %6.2f us, max %7.2f us | clock-out median %7.2f us, p99 %7.2f us | power-downs %d" % (
+            name, result['sckHighMedianUs'], result['sckHighP99Us'], result['sckHighMaxUs'],
+            result['clockOutMedianUs'], result['clockOutP99Us'], result['powerDowns']))
+
+    print("C-builtin pin calls:")
+    for name, clockOut in (('per-bit calls', legacyClockOut), ('single loop', loopClockOut)):
+        result = measureBuiltin(clockOut, reads * 10)
+        print("%-14s clock-out median %6.2f us, p99 %6.2f us, max %7.2f us" % (
+            name, result['clockOutMedianUs'], result['clockOutP99Us'], result['clockOutMaxUs']))
+
+
+if __name__ == "__main__":
+    main()
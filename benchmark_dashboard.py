@@ -0,0 +1,100 @@
+import time
+import argparse
+
+from hx711_emulator import HX711
+from pedal_events import ACCELERATOR, BRAKE
+from pedal_dashboard import Dashboard, DashboardState, NullRenderer, PygameRenderer, THEMES, pygame
+
+'''
+Headless dashboard render loop against two emulated pedals converting at
+80 SPS on their acquisition threads.
+
+The accelerator is pressed for 1.5 s every 4 s and the brake for 1 s every
+6 s, released in between, so part of the run has nothing new to show.  The
+loop renders at --fps into an off-screen pygame surface (or, without pygame,
+a NullRenderer that only times the loop) and reports frames drawn, skipped
+because nothing visible changed, and dropped because the loop was late, the
+draw+present time per drawn frame, CPU use, and how many samples each frame
+coalesced.  A theme switch is timed after the run: it must not load any
+image.
+
+Usage: python benchmark_dashboard.py [--seconds 10] [--fps 30] [--null]
+'''
+
+REFERENCE_UNIT = 100000   # counts per kg
+
+
+def pressSignal(period, length, force):
+    def signal(times):
+        result = []
+        for t in times:
+            offset = float(t) % period
+            result.append(REFERENCE_UNIT * force * min(1.0, offset / 0.3, (length - offset) / 0.3)
+                          if offset < length else 0.0)
+        return result
+    return signal
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless dashboard frame time and frame counts")
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--null', action='store_true', help="use NullRenderer even if pygame is installed")
+    args = parser.parse_args()
+
+    if pygame is not None and not args.null:
+        renderer = PygameRenderer(headless=True)
+        name = "pygame off-screen"
+    else:
+        renderer = NullRenderer()
+        name = "NullRenderer" + ("" if pygame is not None else " (pygame not installed)")
+
+    state = DashboardState()
+    sensors = []
+    for pedal, signal, seed in ((ACCELERATOR, pressSignal(4.0, 1.5, 20.0), 1),
+                                (BRAKE, pressSignal(6.0, 1.0, 12.0), 2)):
+        hx = HX711(dataRate=80, seed=seed, signal=signal, noise=0.05 * REFERENCE_UNIT, spikeRate=0)
+        hx.setReferenceUnit(REFERENCE_UNIT)
+        hx.setOffset(0)
+        hx.startAcquisition()
+        state.attach(hx, pedal)
+        sensors.append(hx)
+
+    start = time.perf_counter()
+    dashboard = Dashboard(renderer, state, fps=args.fps)
+    setup = time.perf_counter() - start
+
+    firstUpdates = state.updateCount
+    cpuStart = time.process_time()
+    wallStart = time.perf_counter()
+    dashboard.run(seconds=args.seconds)
+    wall = time.perf_counter() - wallStart
+    cpu = time.process_time() - cpuStart
+    updates = state.updateCount - firstUpdates
+    for hx in sensors:
+        hx.stopAcquisition()
+
+    stats = dashboard.getStats()
+    frames = stats['drawn'] + stats['skipped'] + stats['dropped']
+    frameTime = stats['frameTime']
+    print("%s, %d fps for %.1f s (setup incl. image preload %.1f ms, %d images loaded)" % (
+        name, args.fps, wall, setup * 1000, stats['imageLoads']))
+    print("frames: %d drawn, %d skipped (unchanged), %d dropped (late) of %d" % (
+        stats['drawn'], stats['skipped'], stats['dropped'], frames))
+    print("draw+present: mean %.3f ms, p99 <= %.3f ms, max %.3f ms" % (
+        frameTime['meanNs'] / 1e6, frameTime['p99Ns'] / 1e6, frameTime['maxNs'] / 1e6))
+    print("samples: %d (%.1f per frame slot), CPU %.1f%% (sampling threads included)" % (
+        updates, updates / frames if frames else 0.0, cpu / wall * 100))
+
+    loads = dashboard.assets.loadCount
+    themes = list(THEMES)
+    start = time.perf_counter_ns()
+    for i in range(1000):
+        dashboard.setTheme(themes[i % len(themes)])
+    print("theme switch: %.2f us, %d images loaded from disk" % (
+        (time.perf_counter_ns() - start) / 1000 / 1000, dashboard.assets.loadCount - loads))
+    renderer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import sys
+import time
+
+from hx711_gpio import FakeHX711
+from hx711_gpiod import GpiodGPIO, FakeGpiod
+from hx711v0_5_1 import HX711
+
+'''
+Event-driven readiness over the GPIO character device.
+
+Runs hx711v0_5_1 background acquisition at 80 SPS with the gpiod backend and
+reports, per sample, the delay from the DRDY edge's kernel timestamp to the
+start of the clock-out, the CPU time spent per sample, and the dropped
+(line_seqno gaps), filtered (data-bit edges) and lost (missed conversion)
+counts.  Without a Pi the gpiod module is replaced by FakeGpiod; pass a chip
+path to run on the real device with an HX711 on BCM 5 (DOUT) / 6 (PD_SCK).
+
+Usage: python benchmark_gpiod.py [seconds] [/dev/gpiochip0]
+'''
+
+DOUT = 5
+PD_SCK = 6
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    if len(sys.argv) > 2:
+        gpio = GpiodGPIO(sys.argv[2])
+        chip = None
+    else:
+        fake = FakeGpiod()
+        chip = fake.attach(FakeHX711(value=-54321, dataRate=80.0), DOUT, PD_SCK)
+        gpio = GpiodGPIO(gpiod=fake)
+
+    hx = HX711(DOUT, PD_SCK, gpio=gpio)
+    clockOut = hx._clockOut
+    latencies = []
+
+    # 클럭 아웃 시작 시각과 에지의 커널 타임스탬프 차이를 기록
+    def timedClockOut(pulses):
+        latencies.append(time.monotonic_ns() - hx.readyWaiter.readyNs)
+        return clockOut(pulses)
+
+    hx._clockOut = timedClockOut
+    cpuStart = time.process_time()
+    hx.startAcquisition()
+    thread = hx.acquisitionThread
+    time.sleep(seconds)
+    hx.stopAcquisition()
+    cpu = time.process_time() - cpuStart
+
+    samples = hx.ring.seq
+    latencies.sort()
+    print("samples %d in %.1f s (%.1f SPS), CPU %.0f us per sample" % (
+        samples, seconds, samples / seconds, cpu / max(samples, 1) * 1e6))
+    print("edge-to-read latency: median %.1f us, p99 %.1f us, max %.1f us" % (
+        percentile(latencies, 0.5) / 1000, percentile(latencies, 0.99) / 1000, latencies[-1] / 1000))
+    print("dropped events %d, filtered data-bit edges %d, lost conversions %d, timeouts %d" % (
+        gpio.droppedEvents, gpio.filteredEvents, thread.lostCount, thread.timeoutCount))
+    if chip is not None:
+        print("fake chip: %d conversions, %d power-downs" % (chip.sampleCount, chip.powerDownCount))
+    gpio.cleanup()
+
+
+if __name__ == "__main__":
+    main()
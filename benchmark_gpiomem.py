@@ -0,0 +1,77 @@
+import sys
+import time
+
+from hx711_gpio import FakeHX711
+from hx711_gpiomem import GpioMemGPIO, GpioMemSimulator, GPSET0, GPCLR0
+from hx711 import HX711
+
+'''
+Toggle rate and clock-out time of the /dev/gpiomem register backend.
+
+Without a Pi, the register block is an mmap of an ordinary file, so the stores
+cost the same from Python as they would on the real registers (minus the bus
+latency of the GPIO peripheral).  The last section runs the HX711 driver
+against GpioMemSimulator to check the register offsets and bit math end to end.
+
+Usage: python benchmark_gpiomem.py [/dev/gpiomem]
+'''
+
+PD_SCK = 6
+DOUT = 5
+TOGGLES = 200000
+
+
+def main():
+    simulator = None
+    if len(sys.argv) > 1:
+        gpio = GpioMemGPIO(sys.argv[1])
+    else:
+        simulator = GpioMemSimulator()
+        gpio = GpioMemGPIO(simulator.path)
+    gpio.setmode(gpio.BCM)
+    gpio.setup(PD_SCK, gpio.OUT)
+    gpio.setup(DOUT, gpio.IN)
+
+    regs = gpio.regs
+    mask = 1 << PD_SCK
+    start = time.perf_counter()
+    for i in range(TOGGLES):
+        regs[GPSET0] = mask
+        regs[GPCLR0] = mask
+    elapsed = time.perf_counter() - start
+    print("register stores:   %8.0f pulses/s (%.3f us per pulse)" % (TOGGLES / elapsed, elapsed / TOGGLES * 1e6))
+
+    output = gpio.output
+    start = time.perf_counter()
+    for i in range(TOGGLES):
+        output(PD_SCK, True)
+        output(PD_SCK, False)
+    elapsed = time.perf_counter() - start
+    print("output() calls:    %8.0f pulses/s (%.3f us per pulse)" % (TOGGLES / elapsed, elapsed / TOGGLES * 1e6))
+
+    clockOut = gpio.makeClockOut(DOUT, PD_SCK)
+    reads = TOGGLES // 25
+    times = []
+    for i in range(reads):
+        start = time.perf_counter_ns()
+        clockOut(25)
+        times.append(time.perf_counter_ns() - start)
+    times.sort()
+    print("25 pulse clock-out: median %.2f us, p99 %.2f us, max %.2f us" % (
+        times[len(times) // 2] / 1000, times[int(len(times) * 0.99)] / 1000, times[-1] / 1000))
+    gpio.cleanup()
+
+    if simulator is None:
+        return
+
+    value = -54321
+    chip = simulator.attach(FakeHX711(value=value, dataRate=None), DOUT, PD_SCK)
+    hx = HX711(DOUT, PD_SCK, gpio=GpioMemGPIO(simulator=simulator))
+    values = [hx.read_long() for i in range(500)]
+    print("simulated HX711:   %d/%d reads correct, %d power-downs (SCK high > 60us)" % (
+        values.count(value), len(values), chip.powerDownCount))
+    simulator.close()
+
+
+if __name__ == "__main__":
+    main()
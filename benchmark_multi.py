@@ -0,0 +1,101 @@
+import sys
+import time
+
+from hx711_gpio import FakeGPIO, FakeHX711
+from hx711_multi import HX711Multi, makeMultiClockOut
+from hx711v0_5_1 import HX711
+
+'''
+Accelerator and brake read one after the other (two HX711 objects, each with
+its own PD_SCK) versus together on a shared PD_SCK (HX711Multi), at 80 SPS on
+the fake GPIO backend.  Reports the skew between the two sensors' samples and
+how long the clock-out takes as sensors are added, with and without a
+backend that reads the whole GPIO bank in one call.  The clock-out times use
+C-builtin pin calls like RPi.GPIO's, so they show the driver's own cost and
+not the cost of simulating the chips.
+
+Usage: python benchmark_multi.py [samples]
+'''
+
+PD_SCK = 16
+DOUTS = [20, 13, 21, 26]
+
+
+class BuiltinPins:
+    """핀 함수가 C 내장 함수인 백엔드 (RPi.GPIO처럼 핀마다 input()을 호출)"""
+
+    def __init__(self):
+        levels = dict.fromkeys(DOUTS, 0)
+        self.output = levels.__setitem__
+        self.input = levels.get
+
+
+class BuiltinBankPins(BuiltinPins):
+    """뱅크 전체를 한 번에 읽는 readLevels()도 C 내장 함수인 백엔드"""
+
+    def __init__(self):
+        super().__init__()
+        banks = {0: 0}
+        self.readLevels = banks.get
+
+
+def median(values):
+    return sorted(values)[len(values) // 2]
+
+
+def sequential(samples):
+    gpio = FakeGPIO()
+    gpio.attach(FakeHX711(value=1000, dataRate=80.0), 20, 16)
+    gpio.attach(FakeHX711(value=2000, dataRate=80.0), 13, 19)
+    accelerator = HX711(20, 16, gpio=gpio)
+    brake = HX711(13, 19, gpio=gpio)
+
+    skews = []
+    start = time.perf_counter()
+    for i in range(samples):
+        accelerator.getLong()
+        brake.getLong()
+        skews.append(abs(brake.lastReadyNs - accelerator.lastReadyNs))
+    return median(skews), samples / (time.perf_counter() - start)
+
+
+def shared(samples):
+    gpio = FakeGPIO()
+    gpio.attach(FakeHX711(value=1000, dataRate=80.0), 20, PD_SCK)
+    gpio.attach(FakeHX711(value=2000, dataRate=80.0), 13, PD_SCK)
+    hx = HX711Multi([20, 13], PD_SCK, gpio=gpio, names=['accelerator', 'brake'])
+
+    start = time.perf_counter()
+    for i in range(samples):
+        hx.readSample()
+    return 0, samples / (time.perf_counter() - start)
+
+
+def clockOutTime(gpioClass, count, reads):
+    gpio = gpioClass()
+    clockOut = makeMultiClockOut(gpio, DOUTS[:count], PD_SCK)
+
+    times = []
+    for i in range(reads):
+        start = time.perf_counter_ns()
+        clockOut(25)
+        times.append(time.perf_counter_ns() - start)
+    return median(times) / 1000
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 80
+
+    for name, run in (('sequential', sequential), ('shared PD_SCK', shared)):
+        skew, rate = run(samples)
+        print("%-14s accelerator/brake skew median %8.1f us, %5.1f sample pairs/s" % (
+            name, skew / 1000, rate))
+
+    for name, gpioClass in (('bank read', BuiltinBankPins), ('per-pin input', BuiltinPins)):
+        times = ["%d sensors %6.1f us" % (count, clockOutTime(gpioClass, count, samples * 10))
+                 for count in (1, 2, 4)]
+        print("%-14s clock-out median: %s" % (name, ", ".join(times)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+import time
+import random
+import argparse
+
+from hx711_time import SimulatedClock
+from hx711_emulator import HX711
+from hx711_capture import ReplaySource
+from pedal_events import (PedalEventDetector, ACCELERATOR, BRAKE,
+                          RAPID_ACCELERATION, HARD_BRAKE, NO_BRAKE, STOP)
+
+'''
+Detection latency and false positives of pedal_events.PedalEventDetector.
+
+Synthetic mode drives two emulated HX711s (accelerator and brake) on one
+SimulatedClock through a seeded sequence of manoeuvres, one per 8 s slot:
+idle, gentle presses of either pedal (must give no event), rapid accelerator
+presses, hard brakes, long accelerator presses without braking and long brake
+holds.  The emulator adds Gaussian noise and full-scale spikes.  Every
+manoeuvre has a known onset: the start of the press for RAPID_ACCELERATION
+and HARD_BRAKE, and the moment the hold condition has lasted long enough for
+NO_BRAKE and STOP.  An event matches the first unmatched expected event of
+the same kind whose onset is at most --match seconds earlier; latency is the
+event timestamp minus the onset.  Events that match nothing are false
+positives, expected events that get nothing are misses.
+
+Replay mode runs the detector over a capture written by hx711_capture
+(accelerator and brake as two sensor IDs) and reports the events found; a
+replay has no ground truth, so only the event rates are given.
+
+Usage: python benchmark_pedal_events.py [--minutes 60] [--rate 10|80] [--seed N] [--noise KG]
+       python benchmark_pedal_events.py --replay pedals.cap [--accelerator-id 1] [--brake-id 2]
+'''
+
+REFERENCE_UNIT = 100000   # counts per kg
+TARE_OFFSET = 80000       # counts with the pedal released
+SLOT = 8.0                # seconds per manoeuvre
+
+MANOEUVRES = ('idle', 'gentleAccelerator', 'gentleBrake', 'rapid', 'hardBrake', 'noBrake', 'stop')
+
+
+class PedalTrace:
+    """페달 하나의 힘(kg) 구간 목록. 구간은 (시작, 밟는 시간, 유지 시간, 떼는 시간, 힘)"""
+
+    def __init__(self):
+        self.presses = []
+        # 에뮬레이터의 변환 시각 0에 해당하는 시뮬레이션 시각 (초)
+        self.epoch = 0.0
+
+    def crossing(self, index, level):
+        """index번째 구간에서 힘이 처음 level에 닿는 시각"""
+        start, rise, hold, fall, force = self.presses[index]
+        return start + rise * level / force
+
+    def force(self, t):
+        index = int(t // SLOT)
+        if index >= len(self.presses) or self.presses[index] is None:
+            return 0.0
+        start, rise, hold, fall, force = self.presses[index]
+        offset = t - start
+        if offset < 0:
+            return 0.0
+        if offset < rise:
+            return force * offset / rise
+        offset -= rise + hold
+        if offset < 0:
+            return force
+        if offset < fall:
+            return force * (1.0 - offset / fall)
+        return 0.0
+
+    def __call__(self, times):
+        force = self.force
+        epoch = self.epoch
+        return [TARE_OFFSET + REFERENCE_UNIT * force(float(t) + epoch) for t in times]
+
+
+def makeScenario(slots, seed, detector):
+    """slots개 구간의 가속/브레이크 궤적과 기대 이벤트 [(종류, 시각)] 목록"""
+    rng = random.Random(seed)
+    accelerator = PedalTrace()
+    brake = PedalTrace()
+    expected = []
+    counts = dict.fromkeys(MANOEUVRES, 0)
+
+    for slot in range(slots):
+        kind = MANOEUVRES[rng.randrange(len(MANOEUVRES))]
+        counts[kind] += 1
+        start = slot * SLOT + rng.uniform(0.5, 1.5)
+        acceleratorPress = brakePress = None
+        if kind == 'gentleAccelerator':
+            acceleratorPress = (start, rng.uniform(1.0, 2.0), rng.uniform(0.5, 1.5),
+                                rng.uniform(0.5, 1.5), rng.uniform(4.0, 12.0))
+        elif kind == 'gentleBrake':
+            brakePress = (start, rng.uniform(0.5, 1.0), rng.uniform(0.5, 3.0),
+                          rng.uniform(0.3, 1.0), rng.uniform(2.5, 4.0))
+        elif kind == 'rapid':
+            acceleratorPress = (start, rng.uniform(0.1, 0.25), rng.uniform(0.5, 1.2),
+                                rng.uniform(0.3, 1.0), rng.uniform(15.0, 30.0))
+            expected.append((RAPID_ACCELERATION, start))
+        elif kind == 'hardBrake':
+            brakePress = (start, rng.uniform(0.08, 0.2), rng.uniform(0.2, 0.5),
+                          rng.uniform(0.3, 0.6), rng.uniform(30.0, 45.0))
+            expected.append((HARD_BRAKE, start))
+        elif kind == 'noBrake':
+            acceleratorPress = (start, rng.uniform(1.0, 1.5), rng.uniform(2.5, 4.0),
+                                rng.uniform(0.5, 1.0), rng.uniform(18.0, 25.0))
+        elif kind == 'stop':
+            brakePress = (start, rng.uniform(0.8, 1.5), rng.uniform(2.5, 4.0),
+                          rng.uniform(0.5, 1.0), rng.uniform(8.0, 15.0))
+        accelerator.presses.append(acceleratorPress)
+        brake.presses.append(brakePress)
+        if kind == 'noBrake':
+            expected.append((NO_BRAKE, accelerator.crossing(slot, detector.noBrakeForce) +
+                             detector.noBrakeSeconds))
+        elif kind == 'stop':
+            expected.append((STOP, brake.crossing(slot, detector.stopForce) + detector.stopSeconds))
+
+    return accelerator, brake, expected, counts
+
+
+def score(events, expected, match):
+    """이벤트를 기대 이벤트와 맞춰 (지연 시간 목록(초), 오탐 목록, 놓친 기대 이벤트 목록)"""
+    pending = sorted(expected, key=lambda item: item[1])
+    latencies = []
+    falsePositives = []
+    for event in events:
+        t = event.timestampNs / 1e9
+        for i, (kind, onset) in enumerate(pending):
+            if kind == event.kind and onset - 0.05 <= t <= onset + match:
+                latencies.append(t - onset)
+                del pending[i]
+                break
+        else:
+            falsePositives.append(event)
+    return latencies, falsePositives, pending
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+def simulate(minutes, rate, seed, noise, match):
+    clock = SimulatedClock()
+    detector = PedalEventDetector()
+    slots = int(minutes * 60 / SLOT)
+    accelerator, brake, expected, counts = makeScenario(slots, seed, detector)
+
+    noiseCounts = noise * REFERENCE_UNIT
+    spikes = (0, 0x7fffff, -0x800000)
+    acceleratorHx = HX711(5, 6, dataRate=rate, seed=seed, clock=clock, signal=accelerator,
+                          noise=noiseCounts, spikeRate=1.0 / 2000, spikeValues=spikes)
+    brakeHx = HX711(13, 19, dataRate=rate, seed=seed + 1, clock=clock, signal=brake,
+                    noise=noiseCounts, spikeRate=1.0 / 2000, spikeValues=spikes)
+    for hx, trace in ((acceleratorHx, accelerator), (brakeHx, brake)):
+        hx.setReferenceUnit(REFERENCE_UNIT)
+        hx.setOffset(TARE_OFFSET)
+        trace.epoch = hx.readyWaiter.epochNs / 1e9
+
+    events = []
+    update = detector.update
+    samples = int(slots * SLOT * rate)
+    start = time.perf_counter()
+    for i in range(samples):
+        # 두 센서는 같은 주기로 변환하므로 번갈아 읽으면 변환을 놓치지 않음
+        events.extend(update(ACCELERATOR, acceleratorHx.getWeight(), acceleratorHx.lastReadyNs))
+        events.extend(update(BRAKE, brakeHx.getWeight(), brakeHx.lastReadyNs))
+    wall = time.perf_counter() - start
+
+    latencies, falsePositives, missed = score(events, expected, match)
+    negatives = counts['idle'] + counts['gentleAccelerator'] + counts['gentleBrake']
+    perKind = {}
+    for kind in (RAPID_ACCELERATION, HARD_BRAKE, NO_BRAKE, STOP):
+        perKind[kind] = score([event for event in events if event.kind == kind],
+                              [item for item in expected if item[0] == kind], match)[0]
+    return {
+        'samples': samples * 2,
+        'usPerSample': wall / (samples * 2) * 1e6,
+        'manoeuvres': counts,
+        'expected': len(expected),
+        'detected': len(latencies),
+        'missed': missed,
+        'falsePositives': falsePositives,
+        'falsePositiveRate': len(falsePositives) / negatives if negatives else 0.0,
+        'falsePositivesPerHour': len(falsePositives) / (slots * SLOT / 3600),
+        'latencies': latencies,
+        'perKind': perKind,
+        'lostConversions': acceleratorHx.readyWaiter.lostCount + brakeHx.readyWaiter.lostCount,
+    }
+
+
+def replay(path, acceleratorId, brakeId):
+    detector = PedalEventDetector()
+    sources = {}
+    for pedal, sensorId in ((ACCELERATOR, acceleratorId), (BRAKE, brakeId)):
+        source = ReplaySource(path, speed=None, sensorId=sensorId)
+        source.setReferenceUnit(REFERENCE_UNIT)
+        source.setOffset(TARE_OFFSET)
+        sources[pedal] = source
+
+    # 두 센서의 레코드를 타임스탬프 순서로 섞어서 넣음
+    events = []
+    firstNs = lastNs = None
+    while True:
+        pending = [(source.peek()[0], pedal) for pedal, source in sources.items() if not source.finished]
+        if not pending:
+            break
+        timestampNs, pedal = min(pending)
+        source = sources[pedal]
+        events.extend(detector.update(pedal, source.getWeight(), source.lastReadyNs))
+        if firstNs is None:
+            firstNs = timestampNs
+        lastNs = timestampNs
+    for source in sources.values():
+        source.close()
+    hours = (lastNs - firstNs) / 3.6e12 if firstNs is not None and lastNs > firstNs else 0.0
+    return events, hours
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pedal event detection latency and false positives")
+    parser.add_argument('--minutes', type=float, default=60.0)
+    parser.add_argument('--rate', type=int, default=80, choices=HX711.DATA_RATES)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--noise', type=float, default=0.05, help="noise standard deviation (kg)")
+    parser.add_argument('--match', type=float, default=1.0,
+                        help="longest delay (s) for an event to count as a detection")
+    parser.add_argument('--replay', help="capture file to run instead of the synthetic trace")
+    parser.add_argument('--accelerator-id', type=int, default=1)
+    parser.add_argument('--brake-id', type=int, default=2)
+    args = parser.parse_args()
+
+    if args.replay:
+        events, hours = replay(args.replay, args.accelerator_id, args.brake_id)
+        print("%s: %.2f h replayed, %d events" % (args.replay, hours, len(events)))
+        for kind in (RAPID_ACCELERATION, HARD_BRAKE, NO_BRAKE, STOP):
+            count = sum(1 for event in events if event.kind == kind)
+            print("  %-18s %5d (%.1f/h)" % (kind, count, count / hours if hours else 0.0))
+        return
+
+    result = simulate(args.minutes, args.rate, args.seed, args.noise, args.match)
+    print("%.0f min at %d SPS, 2 pedals (%d samples), %.2f us/sample, lost conversions %d" % (
+        args.minutes, args.rate, result['samples'], result['usPerSample'], result['lostConversions']))
+    print("manoeuvres: %s" % ", ".join("%s %d" % item for item in result['manoeuvres'].items()))
+    print("expected %d, detected %d, missed %d" % (
+        result['expected'], result['detected'], len(result['missed'])))
+    print("false positives: %d (%.3f per non-event manoeuvre, %.1f/h)" % (
+        len(result['falsePositives']), result['falsePositiveRate'], result['falsePositivesPerHour']))
+    print("latency ms           p50     p95     max")
+    for kind, latencies in [('all', result['latencies'])] + list(result['perKind'].items()):
+        if latencies:
+            print("  %-18s %6.1f  %6.1f  %6.1f" % (kind, percentile(latencies, 0.5) * 1000,
+                                                  percentile(latencies, 0.95) * 1000,
+                                                  max(latencies) * 1000))
+    for kind, onset in result['missed']:
+        print("missed %s at %.2f s" % (kind, onset))
+    for event in result['falsePositives']:
+        print("false positive %s at %.2f s (%s %.1f kg, %.0f kg/s)" % (
+            event.kind, event.timestampNs / 1e9, event.pedal, event.force, event.rate))
+
+
+if __name__ == "__main__":
+    main()
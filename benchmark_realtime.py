@@ -0,0 +1,113 @@
+import sys
+import time
+import threading
+import multiprocessing
+
+from hx711_clockout import makeClockOut
+from hx711_realtime import RealtimeMode
+
+'''
+Clock-out duration jitter with and without RealtimeMode, under synthetic CPU
+load (one busy-looping process per CPU, plus a thread making cyclic garbage
+so the garbage collector keeps running).
+
+The clock-outs use C-builtin pin calls like RPi.GPIO's, so the spread comes
+from the scheduler and the interpreter, not from a simulated chip.  The tail
+matters: a clock-out that takes more than 60 us longer than usual may have
+powered the HX711 down.  Run as root (or with CAP_SYS_NICE and
+CAP_IPC_LOCK) to get SCHED_FIFO and mlockall; otherwise the report shows what
+was refused.
+
+Usage: python benchmark_realtime.py [clock-outs]
+'''
+
+
+class BuiltinPins:
+    def __init__(self):
+        levels = {5: 0}
+        self.output = levels.__setitem__
+        self.input = levels.get
+
+
+def burn(stopEvent):
+    while not stopEvent.is_set():
+        pass
+
+
+def makeGarbage(stopEvent):
+    while not stopEvent.is_set():
+        for i in range(1000):
+            node = []
+            node.append(node)
+        time.sleep(0.001)
+
+
+def measure(count, realtime):
+    result = {}
+
+    def run():
+        pins = BuiltinPins()
+        clockOut = makeClockOut(pins, 5, 6)
+        if realtime is not None:
+            result['report'] = realtime.enter()
+            if realtime.gcControl:
+                clockOut = realtime.pauseGC(clockOut)
+        clock = time.perf_counter_ns
+        durations = []
+        try:
+            for i in range(count):
+                start = clock()
+                clockOut(25)
+                durations.append(clock() - start)
+                # 80 SPS 수집처럼 변환 사이에는 잠듦
+                if i % 50 == 0:
+                    time.sleep(0.001)
+        finally:
+            if realtime is not None:
+                realtime.leave()
+        result['durations'] = durations
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return result
+
+
+def summary(durations):
+    durations = sorted(durations)
+    median = durations[len(durations) // 2]
+
+    def at(fraction):
+        return durations[min(len(durations) - 1, int(len(durations) * fraction))] / 1000
+
+    overruns = sum(1 for d in durations if d - median > 60000)
+    return "p50 %6.1f us, p99 %6.1f us, p99.9 %7.1f us, max %8.1f us, >60us over median: %d" % (
+        median / 1000, at(0.99), at(0.999), durations[-1] / 1000, overruns)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print("idle, normal thread:     %s" % summary(measure(count, None)['durations']))
+
+    stopEvent = multiprocessing.Event()
+    workers = [multiprocessing.Process(target=burn, args=(stopEvent,), daemon=True)
+               for i in range(multiprocessing.cpu_count())]
+    garbage = threading.Thread(target=makeGarbage, args=(stopEvent,), daemon=True)
+    for worker in workers:
+        worker.start()
+    garbage.start()
+    try:
+        print("loaded, normal thread:   %s" % summary(measure(count, None)['durations']))
+        result = measure(count, RealtimeMode(cpu=multiprocessing.cpu_count() - 1))
+        print("loaded, realtime thread: %s" % summary(result['durations']))
+        print("realtime report: %s" % result['report'])
+    finally:
+        stopEvent.set()
+        for worker in workers:
+            worker.join()
+        garbage.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import random
+import time
+
+import hx711_reduce
+from hx711_reduce import MedianReducer, TrimmedMeanReducer, WinsorizedMeanReducer, SlidingWindow
+
+'''
+Cost of the reducers for window sizes 5 to 1000.
+
+"one-shot" reduces a fresh batch (what read_average()/read_median() do for
+get_weight(times)); "legacy" is the old list-append, full sort and slice code
+of read_average() for comparison.  "sliding" feeds a stream one sample at a
+time through SlidingWindow and reports the cost per new sample, against
+re-sorting the whole window for every sample.
+
+The samples are 24-bit readings around a fixed load with a few spikes.
+Shows whether NumPy is used; without it every path is sorted()/bisect based.
+
+Usage: python benchmark_reducers.py
+'''
+
+SIZES = [5, 15, 50, 200, 1000]
+
+
+def samples(count, seed=1):
+    rng = random.Random(seed)
+    values = [int(rng.gauss(114000, 40)) for i in range(count)]
+    for i in range(0, count, 17):
+        values[i] = rng.choice((-8388608, 8388607))
+    return values
+
+
+def legacyTrimmedMean(values):
+    valueList = []
+    for value in values:
+        valueList += [value]
+    valueList.sort()
+    trimAmount = int(len(valueList) * 0.2)
+    if trimAmount:
+        valueList = valueList[trimAmount:-trimAmount]
+    return sum(valueList) / len(valueList)
+
+
+def timeit(function, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    print("numpy: %s" % ("yes" if hx711_reduce.numpy is not None else "no (sorted()/bisect fallback)"))
+    reducers = [('median', MedianReducer()), ('trimmed mean', TrimmedMeanReducer(0.2)),
+                ('winsorized mean', WinsorizedMeanReducer(0.2))]
+
+    print("one-shot, us per batch:")
+    for size in SIZES:
+        batch = samples(size)
+        repeat = max(20, 20000 // size)
+        line = ["legacy %8.2f" % timeit(lambda: legacyTrimmedMean(batch), repeat)]
+        for name, reducer in reducers:
+            line.append("%s %8.2f" % (name, timeit(lambda: reducer.reduce(batch), repeat)))
+        print("  n=%-5d %s" % (size, ", ".join(line)))
+
+    print("sliding window, us per new sample:")
+    for size in SIZES:
+        stream = samples(size * 4 + 2000, seed=2)
+        line = []
+        for name, reducer in reducers:
+            window = SlidingWindow(reducer, size)
+            for value in stream[:size]:
+                window.push(value)
+            rest = stream[size:]
+            start = time.perf_counter()
+            for value in rest:
+                window.push(value)
+            line.append("%s %8.2f" % (name, (time.perf_counter() - start) / len(rest) * 1e6))
+
+        # 샘플마다 창 전체를 다시 정렬하는 경우
+        reducer = MedianReducer()
+        rest = stream[size:size + 2000]
+        start = time.perf_counter()
+        for i in range(len(rest)):
+            reducer.fromSorted(sorted(stream[i + 1:i + 1 + size]), size)
+        line.append("re-sort median %8.2f" % ((time.perf_counter() - start) / len(rest) * 1e6))
+        print("  n=%-5d %s" % (size, ", ".join(line)))
+
+
+if __name__ == "__main__":
+    main()
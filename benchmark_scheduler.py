@@ -0,0 +1,77 @@
+import sys
+import time
+
+from hx711_gpio import FakeGPIO, FakeHX711
+from hx711_scheduler import ReadyScheduler
+from hx711v0_5_1 import HX711
+
+'''
+Round-robin readRawBytes() over N sensors versus ReadyScheduler, on the fake
+GPIO backend.  Every sensor has its own PD_SCK and runs at about 80 SPS with a
+slightly different oscillator, except the last one, which runs at 10 SPS (the
+HX711's RATE pin low) and so holds up every round of the round-robin loop.
+
+Reports the total samples per second, the conversions missed per sensor (as
+counted from each chip's conversion rate, not by the scheduler itself) and
+the CPU time used, for 2, 4 and 8 sensors.
+
+Usage: python benchmark_scheduler.py [seconds]
+'''
+
+
+def makeSensors(count):
+    gpio = FakeGPIO()
+    sensors = {}
+    for i in range(count):
+        dataRate = 10.0 if i == count - 1 else 80.0 * (1 + 0.01 * i)
+        dout, pd_sck = 2 + 2 * i, 3 + 2 * i
+        chip = gpio.attach(FakeHX711(value=1000 * i, dataRate=dataRate), dout, pd_sck)
+        sensors['cell%d' % i] = (HX711(dout, pd_sck, gpio=gpio), chip)
+    return sensors
+
+
+def missedConversions(sensors, counts, elapsed):
+    """각 칩이 elapsed초 동안 변환한 수에서 읽은 수를 뺀 값"""
+    return dict((name, max(0, int(elapsed * 1e9 / chip.periodNs()) - counts[name]))
+                for name, (hx, chip) in sensors.items())
+
+
+def roundRobin(sensors, seconds):
+    counts = dict.fromkeys(sensors, 0)
+    start = time.perf_counter()
+    end = start + seconds
+    while time.perf_counter() < end:
+        for name, (hx, chip) in sensors.items():
+            hx.readRawBytes()
+            counts[name] += 1
+    return sum(counts.values()), missedConversions(sensors, counts, time.perf_counter() - start)
+
+
+def scheduled(sensors, seconds):
+    scheduler = ReadyScheduler(dict((name, hx) for name, (hx, chip) in sensors.items()))
+    start = time.perf_counter()
+    scheduler.start()
+    time.sleep(seconds)
+    scheduler.stop()
+    elapsed = time.perf_counter() - start
+    stats = scheduler.getStats()
+    counts = dict((name, stats[name]['samples']) for name in sensors)
+    return scheduler.stream.seq, missedConversions(sensors, counts, elapsed)
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+
+    for count in (2, 4, 8):
+        for name, run in (('round-robin', roundRobin), ('scheduler', scheduled)):
+            sensors = makeSensors(count)
+            cpuStart = time.process_time()
+            samples, missed = run(sensors, seconds)
+            cpu = time.process_time() - cpuStart
+            print("%d sensors %-12s %6.1f samples/s, CPU %3.0f%%, missed per sensor: %s" % (
+                count, name, samples / seconds, cpu / seconds * 100,
+                " ".join(str(missed[key]) for key in sorted(missed))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import time
+import random
+import hashlib
+import argparse
+from array import array
+
+from hx711_time import SimulatedClock
+from hx711_emulator import HX711
+from hx711_filters import FilterChain, HampelFilter, EmaFilter
+
+'''
+Soak test: a day of accelerator-pedal use, emulated on a SimulatedClock and
+pushed through the same reading pipeline as on the car (getFilteredWeight()
+with a Hampel + EMA filter chain, then a press detector with hysteresis), as
+fast as the pipeline can go.
+
+PedalUsage drives three trips a day; while driving the pedal is pressed once
+in every 6 s segment with a seeded force and duration.  The emulator adds
+noise, drift and spikes.  The report gives the wall time, the number of
+presses detected against the number generated, and a digest of every filtered
+weight: the same seed must give the same digest on every run.
+
+Usage: python benchmark_soak.py [--hours 24] [--rate 10|80] [--seed N]
+'''
+
+REFERENCE_UNIT = 114      # counts per gram
+TARE_OFFSET = 80000       # counts with the pedal released
+PRESS_GRAMS = 2000        # detector thresholds
+RELEASE_GRAMS = 1000
+
+
+class PedalUsage:
+    """하루 동안의 가속 페달 사용 패턴 (변환 시각(초) 목록 -> 카운트 목록)"""
+
+    SEGMENT = 6.0
+    TRIPS = ((7.0 * 3600, 8.5 * 3600), (12.0 * 3600, 12.5 * 3600), (17.5 * 3600, 19.0 * 3600))
+    RAMP = 0.3
+
+    def __init__(self, seed):
+        self.seed = seed
+        self._segmentIndex = None
+        self._segment = None
+
+    def isDriving(self, t):
+        t %= 86400
+        for start, end in self.TRIPS:
+            if start <= t < end:
+                return True
+        return False
+
+    def segment(self, index):
+        """index번째 구간의 (밟기 시작, 길이, 힘(g))"""
+        if index != self._segmentIndex:
+            rng = random.Random(self.seed * 1000003 + index)
+            length = rng.uniform(0.8, 4.0)
+            start = rng.uniform(0.2, self.SEGMENT - length - 0.2)
+            self._segment = (start, length, rng.uniform(3000.0, 25000.0))
+            self._segmentIndex = index
+        return self._segment
+
+    def grams(self, t):
+        if not self.isDriving(t):
+            return 0.0
+        index = int(t // self.SEGMENT)
+        start, length, force = self.segment(index)
+        offset = t - index * self.SEGMENT - start
+        if offset < 0 or offset >= length:
+            return 0.0
+        # 밟을 때와 뗄 때 RAMP초에 걸쳐 힘이 바뀜
+        return force * min(1.0, offset / self.RAMP, (length - offset) / self.RAMP)
+
+    def pressCount(self, seconds):
+        """seconds초 동안 생성되는 밟기 횟수"""
+        segments = int(seconds // self.SEGMENT)
+        return sum(1 for index in range(segments) if self.isDriving(index * self.SEGMENT))
+
+    def __call__(self, times):
+        grams = self.grams
+        return [TARE_OFFSET + REFERENCE_UNIT * grams(float(t)) for t in times]
+
+
+def simulate(hours, rate, seed):
+    clock = SimulatedClock()
+    usage = PedalUsage(seed)
+    hx = HX711(5, 6, dataRate=rate, seed=seed, clock=clock, signal=usage,
+               noise=600.0, driftPerHour=1500.0, spikeRate=1.0 / 2000,
+               spikeValues=(0, 0x7fffff, -0x800000))
+    hx.setReferenceUnit(REFERENCE_UNIT)
+    hx.setOffset(TARE_OFFSET)
+    hx.setWeightFilter(FilterChain([HampelFilter(window=9, minDeviation=2000.0),
+                                    EmaFilter.fromTimeConstant(0.05, rate)]))
+
+    samples = int(hours * 3600 * rate)
+    digest = hashlib.sha256()
+    chunk = array('d')
+    getFilteredWeight = hx.getFilteredWeight
+    pressed = False
+    presses = 0
+    pressedSamples = 0
+    peak = 0.0
+
+    start = time.perf_counter()
+    for i in range(samples):
+        weight = getFilteredWeight()
+        chunk.append(weight)
+        if len(chunk) == 4096:
+            digest.update(chunk.tobytes())
+            del chunk[:]
+        if pressed:
+            pressedSamples += 1
+            if weight < RELEASE_GRAMS:
+                pressed = False
+        elif weight > PRESS_GRAMS:
+            pressed = True
+            presses += 1
+        if weight > peak:
+            peak = weight
+    digest.update(chunk.tobytes())
+    wall = time.perf_counter() - start
+
+    return {
+        'samples': samples,
+        'simulatedHours': clock.monotonic() / 3600,
+        'wallSeconds': wall,
+        'speedup': clock.monotonic() / wall,
+        'usPerSample': wall / samples * 1e6,
+        'pressesGenerated': usage.pressCount(samples / rate),
+        'pressesDetected': presses,
+        'pressedMinutes': pressedSamples / rate / 60,
+        'peakGrams': peak,
+        'spikes': hx.spikeCount,
+        'lostConversions': hx.readyWaiter.lostCount,
+        'digest': digest.hexdigest()[:16],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulated-time soak test of the reading pipeline")
+    parser.add_argument('--hours', type=float, default=24.0)
+    parser.add_argument('--rate', type=int, default=10, choices=HX711.DATA_RATES)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    result = simulate(args.hours, args.rate, args.seed)
+    print("%.1f h at %d SPS (%d samples) in %.1f s wall time: x%.0f real time, %.2f us/sample" % (
+        result['simulatedHours'], args.rate, result['samples'], result['wallSeconds'],
+        result['speedup'], result['usPerSample']))
+    print("presses: %d generated, %d detected; pressed %.1f min; peak %.0f g" % (
+        result['pressesGenerated'], result['pressesDetected'], result['pressedMinutes'],
+        result['peakGrams']))
+    print("spikes injected: %d, lost conversions: %d" % (result['spikes'], result['lostConversions']))
+    print("digest: %s" % result['digest'])
+
+
+if __name__ == "__main__":
+    main()
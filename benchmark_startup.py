@@ -0,0 +1,75 @@
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+'''
+Start-up time of the drivers: from `import` to the first valid sample, each
+run in a fresh interpreter.
+
+The child process imports hx711_gpio first (for FakeGPIO/FakeHX711, not
+timed), then times importing the driver module, constructing HX711 on a fake
+chip that has just powered up, and the first getLong()/read_long().  It also
+checks that the import touched no hardware: RPi.GPIO must not be imported
+and no pin may have been used before the constructor runs.  The fake chip
+has its first conversion ready one conversion period after power-up; a real
+HX711 needs about four (400 ms at 10 SPS, 50 ms at 80 SPS) to settle, which
+the first read simply waits for.  The drivers can't know which gain a
+previous program left the chip armed for, so the first read also throws one
+conversion away to set it.
+
+Usage: python benchmark_startup.py [--runs 5] [--gain 128|64|32]
+'''
+
+CHILD = r'''
+import sys, time, json
+from hx711_gpio import FakeGPIO, FakeHX711
+gpio = FakeGPIO()
+chip = FakeHX711(value=123456, dataRate=%(rate)s)
+gpio.attach(chip, 5, 6)
+start = time.perf_counter()
+import %(module)s as driver
+imported = time.perf_counter()
+hardwareTouched = 'RPi' in sys.modules or gpio.getmode() is not None or gpio.getStats()['calls'] > 0
+hx = driver.HX711(5, 6, gain=%(gain)d, gpio=gpio)
+constructed = time.perf_counter()
+value = hx.getLong() if hasattr(hx, 'getLong') else hx.read_long()
+first = time.perf_counter()
+print(json.dumps({'import': imported - start, 'construct': constructed - imported,
+                  'firstSample': first - constructed, 'total': first - start,
+                  'value': value, 'hardwareTouched': hardwareTouched}))
+'''
+
+
+def run(module, rate, gain):
+    wallStart = time.perf_counter()
+    output = subprocess.check_output([sys.executable, '-c', CHILD % {'module': module, 'rate': rate, 'gain': gain}])
+    result = json.loads(output)
+    result['process'] = time.perf_counter() - wallStart
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Driver import-to-first-sample time")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--gain', type=int, default=128, choices=(128, 64, 32))
+    args = parser.parse_args()
+
+    print("%-12s %4s  %9s %9s %9s %9s %9s  %s" % (
+        "module", "SPS", "import", "construct", "first", "total", "process", "import side effects"))
+    for module in ('hx711', 'hx711v0_5_1'):
+        for rate in (10, 80):
+            results = [run(module, rate, args.gain) for i in range(args.runs)]
+            median = lambda key: sorted(result[key] for result in results)[len(results) // 2] * 1000
+            valid = all(result['value'] == 123456 for result in results)
+            touched = any(result['hardwareTouched'] for result in results)
+            total = median('total')
+            print("%-12s %4d  %6.1f ms %6.1f ms %6.1f ms %6.1f ms %6.1f ms  %s%s%s" % (
+                module, rate, median('import'), median('construct'), median('firstSample'),
+                total, median('process'), "hardware accessed" if touched else "none",
+                "" if valid else ", WRONG first sample", "" if total < 1000 else ", OVER 1 s"))
+
+
+if __name__ == "__main__":
+    main()
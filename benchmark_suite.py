@@ -0,0 +1,268 @@
+import os
+import sys
+import json
+import time
+import types
+import random
+import platform
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+
+from hx711_gpio import FakeGPIO, FakeHX711
+
+'''
+End-to-end benchmark of hx711.py, hx711v0_5_1.py and hx711_emulator.py, so
+throughput claims and regressions can be compared across commits.
+
+A FakeGPIO with a FakeHX711 on DOUT=5/PD_SCK=6 is injected into sys.modules as
+RPi.GPIO, and the drivers are constructed exactly as on a Raspberry Pi (no
+gpio argument).  For each driver it measures:
+
+- import time, in a fresh interpreter, and construction time;
+- for each read method: calls and samples (conversions) per second, CPU time
+  per sample, the spread of call durations and of the 24+N pulse clock-out
+  (for the emulator, of producing the value), and the memory traced per
+  sample.
+
+The fake chip runs at --rate SPS (80 by default; 0 means every conversion is
+ready at once, which measures the drivers' own ceiling).  --output FILE
+also writes the results as JSON; --compare prints the ratio of each figure to
+an earlier run.
+
+Usage: python benchmark_suite.py [--samples N] [--rate SPS] [--output FILE] [--compare OLD.json]
+'''
+
+DOUT = 5
+PD_SCK = 6
+
+# 드라이버별 측정할 읽기 메소드: (이름, 호출 하나가 읽는 변환 수)
+METHODS = {
+    'hx711': [('read_long', 1), ('read_median', 3), ('read_average', 3), ('get_weight', 3)],
+    'hx711v0_5_1': [('getLong', 1), ('getWeight', 1)],
+    'hx711_emulator': [('getLong', 1), ('getWeight', 1)],
+}
+
+def installFakeGPIO(rate, seed):
+    gpio = FakeGPIO()
+    rng = random.Random(seed)
+    chip = FakeHX711(dataRate=rate or None,
+                     source=lambda gain: 114000 + rng.randrange(-300, 300))
+    gpio.attach(chip, DOUT, PD_SCK)
+
+    package = types.ModuleType('RPi')
+    package.GPIO = gpio
+    sys.modules['RPi'] = package
+    sys.modules['RPi.GPIO'] = gpio
+    return gpio
+
+
+def measureImport(moduleName, repeats=5):
+    code = ("import time; start = time.perf_counter(); import %s; "
+            "print(time.perf_counter() - start)" % moduleName)
+    here = os.path.dirname(os.path.abspath(__file__))
+    times = []
+    for i in range(repeats):
+        output = subprocess.run([sys.executable, '-c', code], cwd=here,
+                                capture_output=True, text=True, check=True).stdout
+        times.append(float(output.strip().splitlines()[-1]))
+    return min(times) * 1000
+
+
+def construct(moduleName, rate, seed):
+    installFakeGPIO(rate, seed)
+    module = __import__(moduleName)
+    if moduleName == 'hx711_emulator':
+        # 에뮬레이터는 10/80 SPS만 있으므로 그 밖의 속도는 주기 없이 바로 읽음
+        options = {'seed': seed, 'dataRate': rate if rate in (10, 80) else 80, 'paced': bool(rate)}
+    else:
+        options = {}
+    start = time.perf_counter()
+    hx = module.HX711(DOUT, PD_SCK, **options)
+    constructMs = (time.perf_counter() - start) * 1000
+    return hx, constructMs
+
+
+def percentileUs(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] / 1000
+
+
+def timeCalls(call, calls):
+    clock = time.perf_counter_ns
+    cpuStart = time.process_time()
+    wallStart = clock()
+    for i in range(calls):
+        call()
+    wallNs = clock() - wallStart
+    cpu = time.process_time() - cpuStart
+    return wallNs, cpu
+
+
+def measureJitter(hx, call, calls):
+    clock = time.perf_counter_ns
+    clockOutTimes = []
+    clockOut = getattr(hx, '_clockOut', None)
+    if clockOut is not None:
+        def timedClockOut(pulses):
+            start = clock()
+            value = clockOut(pulses)
+            clockOutTimes.append(clock() - start)
+            return value
+        hx._clockOut = timedClockOut
+
+    callTimes = []
+    try:
+        for i in range(calls):
+            start = clock()
+            call()
+            callTimes.append(clock() - start)
+    finally:
+        if clockOut is not None:
+            hx._clockOut = clockOut
+
+    result = {
+        'callP50Us': percentileUs(callTimes, 0.5),
+        'callP99Us': percentileUs(callTimes, 0.99),
+        'callStdevUs': statistics.pstdev(callTimes) / 1000,
+        'clockOutP50Us': None,
+        'clockOutP99Us': None,
+        'clockOutMaxUs': None,
+    }
+    if clockOutTimes:
+        result['clockOutP50Us'] = percentileUs(clockOutTimes, 0.5)
+        result['clockOutP99Us'] = percentileUs(clockOutTimes, 0.99)
+        result['clockOutMaxUs'] = max(clockOutTimes) / 1000
+    return result
+
+
+def measureMemory(call, calls, samplesPerCall):
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        for i in range(calls):
+            call()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    samples = calls * samplesPerCall
+    return {
+        'memPeakBytesPerSample': (peak - baseline) / samples,
+        'memRetainedBytesPerSample': (current - baseline) / samples,
+    }
+
+
+def measureMethod(hx, name, samplesPerCall, samples):
+    method = getattr(hx, name)
+    if samplesPerCall > 1:
+        call = lambda: method(samplesPerCall)
+    else:
+        call = method
+    calls = max(1, samples // samplesPerCall)
+
+    # 대기 전략이 변환 주기를 익히도록 몇 번 미리 읽음
+    for i in range(3):
+        call()
+
+    wallNs, cpu = timeCalls(call, calls)
+    result = {
+        'calls': calls,
+        'samplesPerCall': samplesPerCall,
+        'callsPerSec': calls / (wallNs / 1e9),
+        'samplesPerSec': calls * samplesPerCall / (wallNs / 1e9),
+        'cpuUsPerSample': cpu / (calls * samplesPerCall) * 1e6,
+    }
+    result.update(measureJitter(hx, call, calls))
+    result.update(measureMemory(call, calls, samplesPerCall))
+    return result
+
+
+def runDriver(moduleName, rate, samples, seed):
+    result = {'importMs': measureImport(moduleName)}
+    hx, result['constructMs'] = construct(moduleName, rate, seed)
+    result['methods'] = {}
+    for name, samplesPerCall in METHODS[moduleName]:
+        result['methods'][name] = measureMethod(hx, name, samplesPerCall, samples)
+    return result
+
+
+def gitCommit():
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=here,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def printResults(results):
+    for driver, result in results['drivers'].items():
+        print("%s: import %.1f ms, construct %.1f ms" % (
+            driver, result['importMs'], result['constructMs']))
+        for name, method in result['methods'].items():
+            clockOut = ('clock-out p50 %6.1f us, p99 %6.1f us' % (
+                method['clockOutP50Us'], method['clockOutP99Us'])
+                if method['clockOutP50Us'] is not None else 'clock-out n/a')
+            print("  %-13s %7.1f samples/s, CPU %8.1f us/sample, call p99 %9.1f us, %s, mem %6.1f B/sample" % (
+                name, method['samplesPerSec'], method['cpuUsPerSample'], method['callP99Us'],
+                clockOut, method['memRetainedBytesPerSample']))
+
+
+def compare(results, oldResults):
+    print("Compared with %s (ratio new/old, >1 is better for rates, <1 for times):" % (
+        oldResults['meta'].get('commit') or 'previous run'))
+    for driver, result in results['drivers'].items():
+        old = oldResults['drivers'].get(driver)
+        if old is None:
+            continue
+        for name, method in result['methods'].items():
+            oldMethod = old['methods'].get(name)
+            if oldMethod is None:
+                continue
+            ratios = []
+            for key in ('samplesPerSec', 'cpuUsPerSample', 'callP99Us', 'clockOutP99Us'):
+                if method.get(key) and oldMethod.get(key):
+                    ratios.append("%s x%.2f" % (key, method[key] / oldMethod[key]))
+            print("  %s.%s: %s" % (driver, name, ', '.join(ratios)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HX711 driver benchmark suite")
+    parser.add_argument('--samples', type=int, default=100, help="conversions per method and pass")
+    parser.add_argument('--rate', type=float, default=80.0, help="fake HX711 data rate in SPS (0: always ready)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--drivers', default=','.join(METHODS), help="comma separated module names")
+    parser.add_argument('--output', help="JSON file to write the results to (not written by default)")
+    parser.add_argument('--compare', help="earlier JSON output to compare against")
+    args = parser.parse_args()
+
+    results = {
+        'meta': {
+            'commit': gitCommit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'samples': args.samples,
+            'rate': args.rate,
+            'seed': args.seed,
+        },
+        'drivers': {},
+    }
+    for driver in args.drivers.split(','):
+        results['drivers'][driver] = runDriver(driver, args.rate, args.samples, args.seed)
+
+    printResults(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print("Results written to %s" % args.output)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
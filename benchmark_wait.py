@@ -0,0 +1,84 @@
+import time
+import sys
+
+from hx711_gpio import FakeGPIO, FakeHX711
+from hx711_ready import ReadyWaiter
+from hx711v0_5_1 import HX711
+
+'''
+Compares the CPU cost of waiting for DOUT in readRawBytes().
+
+"spin" is the old `while not isReady(): pass` loop, "ready-waiter" is the
+learned sleep-then-poll strategy from hx711_ready.  Both run against the fake
+HX711 at its real data rates, so the wall time per sample is the same and only
+the CPU time changes.  "edge-to-SCK" is the time from DOUT falling to the first
+PD_SCK rising edge, i.e. the latency the wait strategy adds.
+
+Usage: python benchmark_wait.py [samples]
+'''
+
+
+class SpinWaiter:
+    def __init__(self, isReady):
+        self.isReady = isReady
+        # Same attribute as ReadyWaiter: when DOUT was last seen ready.
+        self.readyNs = 0
+
+    def reset(self):
+        pass
+
+    def wait(self, timeout=None):
+        while self.isReady() is not True:
+            pass
+        self.readyNs = time.monotonic_ns()
+
+
+def runCase(waiterClass, dataRate, samples):
+    gpio = FakeGPIO()
+    chip = gpio.attach(FakeHX711(value=114000, dataRate=dataRate), 5, 6)
+    hx = HX711(5, 6, gpio=gpio)
+    hx.readyWaiter = waiterClass(hx.isReady)
+
+    latencies = []
+
+    def source(gain):
+        latencies.append(time.perf_counter_ns() - chip.nextReadyNs())
+        return chip.value
+
+    chip.source = source
+
+    # A few samples to let the waiter learn the data rate.
+    for i in range(5):
+        hx.readRawBytes()
+    del latencies[:]
+
+    cpuStart = time.process_time()
+    wallStart = time.perf_counter()
+    for i in range(samples):
+        hx.readRawBytes()
+    cpu = time.process_time() - cpuStart
+    wall = time.perf_counter() - wallStart
+
+    latencies.sort()
+    return {
+        'samplesPerSec': samples / wall,
+        'cpuPerSampleMs': cpu / samples * 1000,
+        'cpuLoad': cpu / wall,
+        'edgeToSckMedianUs': latencies[len(latencies) // 2] / 1000,
+        'edgeToSckP99Us': latencies[int(len(latencies) * 0.99)] / 1000,
+    }
+
+
+def main():
+    samples = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+
+    for dataRate in (10, 80):
+        for name, waiterClass in (('spin', SpinWaiter), ('ready-waiter', ReadyWaiter)):
+            result = runCase(waiterClass, dataRate, samples)
+            print("%3d SPS %-13s %6.1f samples/s  cpu %7.3f ms/sample (%5.1f%% load)  edge-to-SCK median %7.1f us, p99 %7.1f us" % (
+                dataRate, name, result['samplesPerSec'], result['cpuPerSampleMs'],
+                result['cpuLoad'] * 100, result['edgeToSckMedianUs'], result['edgeToSckP99Us']))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import time
 import sys
-from emulated_hx711 import HX711
+from hx711_emulator import HX711
 
 
 def cleanAndExit():
@@ -10,13 +10,13 @@ def cleanAndExit():
     sys.exit()
 
 referenceUnit = 1
-hx = HX711(5, 6)
+hx = HX711(5, 6, dataRate=10, seed=1)
 
 
-hx.set_reading_format("MSB", "MSB")
+hx.setReadingFormat("MSB", "MSB")
 
-#hx.set_reference_unit(113)
-hx.set_reference_unit(referenceUnit)
+#hx.setReferenceUnit(113)
+hx.setReferenceUnit(referenceUnit)
 
 hx.reset()
 
@@ -26,11 +26,11 @@ print("Tare done! Add weight now...")
 
 while True:
     try:
-        val = hx.get_weight(5)
+        val = hx.getWeight()
         print(val)
 
-        hx.power_down()
-        hx.power_up()
+        hx.powerDown()
+        hx.powerUp()
         time.sleep(0.1)
 
     except (KeyboardInterrupt, SystemExit):
@@ -2,6 +2,7 @@ import time
 import sys
 import RPi.GPIO as GPIO
 from hx711v0_5_1 import HX711
+from hx711_calibration import ProfileStore
 
 '''
 About READ_MODE
@@ -66,10 +67,16 @@ shouldn't need to modify it.
 '''
 hx.setReadingFormat("MSB", "MSB")
 
-print("[INFO] Automatically setting the offset.")
-hx.autosetOffset()
-offsetValue = hx.getOffset()
-print(f"[INFO] Finished automatically setting the offset. The new value is '{offsetValue}'.")
+# A calibration profile saved with hx711_calibration gives weights from the first conversion.
+store = ProfileStore("calibration.json")
+profile = store.apply(hx)
+if profile is not None:
+    print(f"[INFO] Loaded the calibration profile: offset '{profile.offset}', referenceUnit '{profile.referenceUnit}'.")
+else:
+    print("[INFO] Automatically setting the offset.")
+    hx.autosetOffset()
+    offsetValue = hx.getOffset()
+    print(f"[INFO] Finished automatically setting the offset. The new value is '{offsetValue}'.")
 
 print("[INFO] You can add weight now!")
 
@@ -87,10 +94,11 @@ In my case, the longValueWithOffset was around 114000 so my reference unit is 11
 because if I used the 114000, I'd be getting milligrams instead of grams.
 '''
 
-referenceUnit = 114
-print(f"[INFO] Setting the 'referenceUnit' at {referenceUnit}.")
-hx.setReferenceUnit(referenceUnit)
-print(f"[INFO] Finished setting the 'referenceUnit' at {referenceUnit}.")
+if profile is None:
+    referenceUnit = 114
+    print(f"[INFO] Setting the 'referenceUnit' at {referenceUnit}.")
+    hx.setReferenceUnit(referenceUnit)
+    print(f"[INFO] Finished setting the 'referenceUnit' at {referenceUnit}.")
 
 if READ_MODE == READ_MODE_INTERRUPT_BASED:
     print("[INFO] Enabling the callback.")
@@ -1,10 +1,17 @@
-import RPi.GPIO as GPIO
 import time
 import threading
 
+from hx711_gpio import loadDefaultGPIO
+from hx711_ready import makeReadyWaiter, HX711TimeoutError
+from hx711_clockout import makeClockOut, makeTimedClockOut, makeBytesDecoder
+from hx711_reduce import MedianReducer, TrimmedMeanReducer
+from hx711_integrity import ReadChecker
+from hx711_stats import ReadStats
+from hx711_channels import readChannel
+
 class HX711:
 
-    def __init__(self, dout, pd_sck, gain=128):
+    def __init__(self, dout, pd_sck, gain=128, gpio=None):
         self.PD_SCK = pd_sck
 
         self.DOUT = dout
@@ -12,10 +19,16 @@ class HX711:
         # Mutex for reading from the HX711, in case multiple threads in client
         # software try to access get values from the class at the same time.
         self.readLock = threading.Lock()
-        
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.PD_SCK, GPIO.OUT)
-        GPIO.setup(self.DOUT, GPIO.IN)
+
+        # GPIO backend driving the pins.  Anything with the RPi.GPIO interface
+        # works here (see hx711_gpio.FakeGPIO); defaults to RPi.GPIO.
+        if gpio is None:
+            gpio = loadDefaultGPIO()
+        self.GPIO = gpio
+
+        self.GPIO.setmode(self.GPIO.BCM)
+        self.GPIO.setup(self.PD_SCK, self.GPIO.OUT)
+        self.GPIO.setup(self.DOUT, self.GPIO.IN)
 
         self.GAIN = 0
 
@@ -30,13 +43,51 @@ class HX711:
 
         self.DEBUG_PRINTING = False
 
+        # How long readRawBytes() waits for DOUT before raising
+        # HX711TimeoutError, e.g. when the sensor is disconnected.
+        self.readyTimeout = 1.0
+        self.readyWaiter = makeReadyWaiter(self.GPIO, self.DOUT, self.is_ready)
+
         self.byte_format = 'MSB'
         self.bit_format = 'MSB'
 
+        # Clock-out loop with the pin functions bound once, and the byte
+        # ordering picked by set_reading_format() so that nothing checks the
+        # reading format while PD_SCK is toggling.
+        self._clockOut = makeClockOut(self.GPIO, self.DOUT, self.PD_SCK)
+        self._bytesDecoder = makeBytesDecoder(self.byte_format, self.bit_format)
+
+        # Checks every clock-out for signs of corruption and makes
+        # readRawBytes() retry on the next conversion.  Set to None to disable.
+        self.readChecker = ReadChecker(self.GPIO, self.DOUT)
+
+        # Per-stage timing histograms, only kept while enable_stats() is on.
+        self.stats = None
+        self._untimedClockOut = None
+
+        # How read_average() and read_median() combine their samples.  Swap in
+        # e.g. hx711_reduce.WinsorizedMeanReducer() for a different estimator.
+        self.averageReducer = TrimmedMeanReducer(0.2)
+        self.medianReducer = MedianReducer()
+
+        # Number of gain pulses the HX711 will use for its next conversion, or
+        # None when unknown.  It powers up on channel A with a gain of 128 (one
+        # pulse), but a chip a previous program left running may be armed for
+        # anything, so the first read only sends our gain pulses.
+        self.chipGainPulses = None
+
+        # Gain pulses of the conversion readRawBytes() returned last
+        # (1: channel A/128, 2: channel B/32, 3: channel A/64).
+        self.lastGainPulses = 1
+
+        # Picks the channel of the next conversion on every read when set
+        # (see hx711_channels.ChannelScheduler); otherwise it's always GAIN.
+        self.channelSchedule = None
+
+        # Holding PD_SCK low also wakes a chip that was left powered down.  No
+        # need to wait here: the first read waits for DOUT like any other.
+        self.GPIO.output(self.PD_SCK, False)
         self.set_gain(gain)
-        
-        # Think about whether this is necessary.
-        time.sleep(1)
 
 
     def convertFromTwosComplement24bit(self, inputValue):
@@ -44,7 +95,7 @@ class HX711:
 
     
     def is_ready(self):
-        return GPIO.input(self.DOUT) == 0
+        return self.GPIO.input(self.DOUT) == 0
 
     
     def set_gain(self, gain):
@@ -55,10 +106,8 @@ class HX711:
         elif gain == 32:
             self.GAIN = 2
 
-        GPIO.output(self.PD_SCK, False)
-
-        # Read out a set of raw bytes and throw it away.
-        self.readRawBytes()
+        # The new gain reaches the chip with the pulses after the next read;
+        # readRawBytes() throws away the conversion made before that.
 
         
     def get_gain(self):
@@ -77,9 +126,9 @@ class HX711:
        # Clock HX711 Digital Serial Clock (PD_SCK).  DOUT will be
        # ready 1us after PD_SCK rising edge, so we sample after
        # lowering PD_SCL, when we know DOUT will be stable.
-       GPIO.output(self.PD_SCK, True)
-       GPIO.output(self.PD_SCK, False)
-       value = GPIO.input(self.DOUT)
+       self.GPIO.output(self.PD_SCK, True)
+       self.GPIO.output(self.PD_SCK, False)
+       value = self.GPIO.input(self.DOUT)
 
        # Convert Boolean to int and return it.
        return int(value)
@@ -102,36 +151,129 @@ class HX711:
        return byteValue 
         
 
-    def readRawBytes(self):
-        # Wait for and get the Read Lock, in case another thread is already
-        # driving the HX711 serial interface.
-        self.readLock.acquire()
-
-        # Wait until HX711 is ready for us to read a sample.
-        while not self.is_ready():
-           pass
+    def readRawBytes(self, timeout=None, next_gain_pulses=None):
+        # next_gain_pulses picks the channel and gain of the conversion after
+        # this one.  lastGainPulses tells which one this read returned.
+        if timeout is None:
+            timeout = self.readyTimeout
 
-        # Read three bytes of data from the HX711.
-        firstByte  = self.readNextByte()
-        secondByte = self.readNextByte()
-        thirdByte  = self.readNextByte()
+        stats = self.stats
 
-        # HX711 Channel and gain factor are set by number of bits read
-        # after 24 data bits.
-        for i in range(self.GAIN):
-           # Clock a bit out of the HX711 and throw it away.
-           self.readNextBit()
-
-        # Release the Read Lock, now that we've finished driving the HX711
-        # serial interface.
-        self.readLock.release()           
+        # Wait for and get the Read Lock, in case another thread is already
+        # driving the HX711 serial interface.
+        if stats is None:
+            self.readLock.acquire()
+        else:
+            clock = time.perf_counter_ns
+            startNs = clock()
+            self.readLock.acquire()
+            stats.lockWait.add(clock() - startNs)
+
+        try:
+            return self._readRawBytes(timeout, next_gain_pulses, True)
+        finally:
+            # Release the Read Lock, now that we've finished driving the HX711
+            # serial interface.
+            self.readLock.release()
+
+    def readReadyRawBytes(self):
+        # Read one conversion whose DOUT someone else (hx711_scheduler) has
+        # already seen low, without waiting.  Integrity checks, stats, the
+        # channel schedule and lastGainPulses work as in readRawBytes().
+        # Returns False if another thread holds the Read Lock, and None if
+        # the conversion was only read to set the gain or looked corrupt:
+        # read the next one instead.
+        if not self.readLock.acquire(False):
+            return False
+        try:
+            return self._readRawBytes(None, None, False)
+        finally:
+            self.readLock.release()
+
+    def _readRawBytes(self, timeout, next_gain_pulses, wait):
+        # The body of readRawBytes(), called with the Read Lock held.  Without
+        # wait, a conversion that has to be read again returns None.
+        stats = self.stats
+        clock = time.perf_counter_ns
+        checker = self.readChecker
+        retries = checker.maxRetries if checker is not None else 0
+
+        # Reads that pick their own pulses return conversions made with any
+        # gain: lastGainPulses says which one it was.
+        schedule = self.channelSchedule
+        plain = next_gain_pulses is None and schedule is None
+
+        attempt = 0
+        while True:
+            # Wait until HX711 is ready for us to read a sample.  The waiter
+            # sleeps through most of the conversion period and only polls DOUT
+            # tightly around the time it expects it to fall.
+            startNs = clock()
+            if wait:
+                try:
+                    self.readyWaiter.wait(timeout)
+                except HX711TimeoutError:
+                    if stats is not None:
+                        stats.timeouts += 1
+                    raise
+
+            # Read the 24 data bits and the 1-3 trailing pulses that set the
+            # HX711 channel and gain factor for the next conversion, in one
+            # tight loop.
+            if next_gain_pulses is not None:
+                pulses = next_gain_pulses
+            elif schedule is not None:
+                pulses = schedule.nextPulses()
+            else:
+                pulses = self.GAIN
+            # A conversion made with an unknown gain (after a corrupt read), or
+            # with another gain on a plain read (just after set_gain() or
+            # power_up()), is read only to send the new gain pulses, then
+            # dropped.
+            gainPulses = self.chipGainPulses
+            discard = gainPulses is None or (plain and gainPulses != self.GAIN)
+            readyNs = clock()
+            rawValue = self._clockOut(24 + pulses)
+            durationNs = clock() - readyNs
+            self.chipGainPulses = pulses
+            if stats is not None:
+                stats.wait.add(readyNs - startNs)
+                stats.clockOut.add(durationNs)
+                stats.reads += 1
+
+            if discard:
+                # The pulses only take hold if the chip stayed up during the
+                # read; otherwise the next conversion's gain is still unknown.
+                if (checker is not None and attempt < retries and
+                        checker.check(rawValue, durationNs) is not None):
+                    attempt += 1
+                    checker.retryCount += 1
+                    if pulses != 1:
+                        self.chipGainPulses = None
+                if not wait:
+                    return None
+                continue
+
+            # If the read looks corrupt, try again on the next conversion.
+            if checker is None or checker.check(rawValue, durationNs) is None:
+                break
+            # The chip may have powered down during that read, which puts it
+            # back on channel A with a gain of 128.
+            if pulses != 1:
+                self.chipGainPulses = None
+            if attempt == retries:
+                checker.failedCount += 1
+                break
+            attempt += 1
+            checker.retryCount += 1
+            if not wait:
+                return None
+
+        self.lastGainPulses = gainPulses
 
         # Depending on how we're configured, return an ordered list of raw byte
         # values.
-        if self.byte_format == 'LSB':
-           return [thirdByte, secondByte, firstByte]
-        else:
-           return [firstByte, secondByte, thirdByte]
+        return self._bytesDecoder(rawValue)
 
 
     def read_long(self):
@@ -141,7 +283,11 @@ class HX711:
 
         if self.DEBUG_PRINTING:
             print(dataBytes,)
-        
+
+        stats = self.stats
+        if stats is not None:
+            startNs = time.perf_counter_ns()
+
         # Join the raw bytes into a single 24bit 2s complement value.
         twosComplementValue = ((dataBytes[0] << 16) |
                                (dataBytes[1] << 8)  |
@@ -156,10 +302,53 @@ class HX711:
         # Record the latest sample value we've read.
         self.lastVal = signedIntValue
 
+        if stats is not None:
+            stats.decode.add(time.perf_counter_ns() - startNs)
+
         # Return the sample value we've read from the HX711.
         return int(signedIntValue)
 
     
+    def enable_stats(self):
+        # Start timing every read.  The clock-out switches to a loop that also
+        # times each PD_SCK high interval, so only turn this on when needed.
+        if self.stats is not None:
+            return
+        stats = ReadStats()
+        with self.readLock:
+            self._untimedClockOut = self._clockOut
+            self._clockOut = makeTimedClockOut(self.GPIO, self.DOUT, self.PD_SCK,
+                                               stats.sckHigh, time.perf_counter_ns)
+            self.stats = stats
+
+
+    def disable_stats(self):
+        if self.stats is None:
+            return
+        with self.readLock:
+            self._clockOut = self._untimedClockOut
+            self._untimedClockOut = None
+            self.stats = None
+
+
+    def get_stats(self):
+        # Snapshot of the timing histograms (if enabled) and of the corrupt
+        # read counters.
+        result = {'enabled': self.stats is not None}
+        if self.stats is not None:
+            result.update(self.stats.snapshot())
+        if self.readChecker is not None:
+            result['checks'] = self.readChecker.getStats()
+        return result
+
+
+    def reset_stats(self):
+        if self.stats is not None:
+            self.stats.reset()
+        if self.readChecker is not None:
+            self.readChecker.resetCounters()
+
+
     def read_average(self, times=3):
         # Make sure we've been asked to take a rational amount of samples.
         if times <= 0:
@@ -174,23 +363,9 @@ class HX711:
         if times < 5:
             return self.read_median(times)
 
-        # If we're taking a lot of samples, we'll collect them in a list, remove
-        # the outliers, then take the mean of the remaining set.
-        valueList = []
-
-        for x in range(times):
-            valueList += [self.read_long()]
-
-        valueList.sort()
-
-        # We'll be trimming 20% of outlier samples from top and bottom of collected set.
-        trimAmount = int(len(valueList) * 0.2)
-
-        # Trim the edge case values.
-        valueList = valueList[trimAmount:-trimAmount]
-
-        # Return the mean of remaining samples.
-        return sum(valueList) / len(valueList)
+        # If we're taking a lot of samples, remove the outliers (20% of the
+        # collected set from top and bottom) and take the mean of the rest.
+        return self.averageReducer.reduce([self.read_long() for x in range(times)])
 
 
     # A median-based read method, might help when getting random value spikes
@@ -203,21 +378,8 @@ class HX711:
        if times == 1:
           return self.read_long()
 
-       valueList = []
-
-       for x in range(times):
-          valueList += [self.read_long()]
-
-       valueList.sort()
-
-       # If times is odd we can just take the centre value.
-       if (times & 0x1) == 0x1:
-          return valueList[len(valueList) // 2]
-       else:
-          # If times is even we have to take the arithmetic mean of
-          # the two middle values.
-          midpoint = len(valueList) / 2
-          return sum(valueList[midpoint:midpoint+2]) / 2.0
+       # For an even count this is the arithmetic mean of the two middle values.
+       return self.medianReducer.reduce([self.read_long() for x in range(times)])
 
 
     # Compatibility function, uses channel A version
@@ -230,12 +392,14 @@ class HX711:
 
 
     def get_value_B(self, times=3):
-        # for channel B, we need to set_gain(32)
-        g = self.get_gain()
-        self.set_gain(32)
-        value = self.read_median(times) - self.get_offset_B()
-        self.set_gain(g)
-        return value
+        # Channel B is always converted with a gain of 32.  Its conversions
+        # are requested with the trailing pulses of the reads before them, and
+        # the last read asks for channel A again, so no conversion is thrown
+        # away on either switch.
+        values = readChannel(self, 'B', times)
+        if times == 1:
+            return values[0] - self.get_offset_B()
+        return self.medianReducer.reduce(values) - self.get_offset_B()
 
     # Compatibility function, uses channel A version
     def get_weight(self, times=3):
@@ -281,38 +445,31 @@ class HX711:
         backupReferenceUnit = self.get_reference_unit_B()
         self.set_reference_unit_B(1)
 
-        # for channel B, we need to set_gain(32)
-        backupGain = self.get_gain()
-        self.set_gain(32)
-
-        value = self.read_average(times)
+        # Pipelined channel B reads, combined like read_average() does.
+        values = readChannel(self, 'B', times)
+        if times == 1:
+            value = values[0]
+        elif times < 5:
+            value = self.medianReducer.reduce(values)
+        else:
+            value = self.averageReducer.reduce(values)
 
         if self.DEBUG_PRINTING:
             print("Tare B value:", value)
         
         self.set_offset_B(value)
 
-        # Restore gain/channel/reference unit settings.
-        self.set_gain(backupGain)
+        # Restore the reference unit, now that we've got our offset.
         self.set_reference_unit_B(backupReferenceUnit)
        
         return value
 
 
     def set_reading_format(self, byte_format="LSB", bit_format="MSB"):
-        if byte_format == "LSB":
-            self.byte_format = byte_format
-        elif byte_format == "MSB":
-            self.byte_format = byte_format
-        else:
-            raise ValueError("Unrecognised byte_format: \"%s\"" % byte_format)
-
-        if bit_format == "LSB":
-            self.bit_format = bit_format
-        elif bit_format == "MSB":
-            self.bit_format = bit_format
-        else:
-            raise ValueError("Unrecognised bitformat: \"%s\"" % bit_format)
+        # Validates both formats and picks the matching byte decoder.
+        self._bytesDecoder = makeBytesDecoder(byte_format, bit_format)
+        self.byte_format = byte_format
+        self.bit_format = bit_format
 
             
     # sets offset for channel A for compatibility reasons
@@ -378,8 +535,8 @@ class HX711:
         # Because a rising edge on HX711 Digital Serial Clock (PD_SCK).  We then
         # leave it held up and wait 100us.  After 60us the HX711 should be
         # powered down.
-        GPIO.output(self.PD_SCK, False)
-        GPIO.output(self.PD_SCK, True)
+        self.GPIO.output(self.PD_SCK, False)
+        self.GPIO.output(self.PD_SCK, True)
 
         time.sleep(0.0001)
 
@@ -394,7 +551,16 @@ class HX711:
         self.readLock.acquire()
 
         # Lower the HX711 Digital Serial Clock (PD_SCK) line.
-        GPIO.output(self.PD_SCK, False)
+        self.GPIO.output(self.PD_SCK, False)
+
+        # Conversions restart from scratch, so forget the learned timing.
+        self.readyWaiter.reset()
+
+        # HX711 will now be defaulted to Channel A with gain of 128.  If this
+        # isn't what client software has requested from us, the next read
+        # throws away one sample so that the one after it has the right
+        # channel/gain.
+        self.chipGainPulses = 1
 
         # Wait 100 us for the HX711 to power back up.
         time.sleep(0.0001)
@@ -403,20 +569,13 @@ class HX711:
         # serial interface.
         self.readLock.release()
 
-        # HX711 will now be defaulted to Channel A with gain of 128.  If this
-        # isn't what client software has requested from us, take a sample and
-        # throw it away, so that next sample from the HX711 will be from the
-        # correct channel/gain.
-        if self.get_gain() != 128:
-            self.readRawBytes()
-
 
     def reset(self):
         self.power_down()
         self.power_up()
 
 def hx711_add_event_detect(hx711_instance, event_callback):
-        GPIO.add_event_detect(self.DOUT, GPIO.FALLING, 
-            callback=event_callback)
+        hx711_instance.GPIO.add_event_detect(hx711_instance.DOUT,
+            hx711_instance.GPIO.FALLING, callback=event_callback)
 
 # EOF - hx711.py
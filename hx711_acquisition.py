@@ -0,0 +1,167 @@
+import threading
+from array import array
+
+from hx711_ready import HX711TimeoutError
+
+
+class SampleRing:
+    """미리 할당된 고정 크기 링 버퍼. 원시값(array 'i')과 타임스탬프(array 'q', ns)를 함께 보관"""
+
+    def __init__(self, size=1024):
+        if size <= 0:
+            raise ValueError("SampleRing() size must be greater than zero!")
+        self.size = size
+        self.values = array('i', [0]) * size
+        self.timestamps = array('q', [0]) * size
+        # 지금까지 기록된 샘플 수. 다음 샘플의 일련번호이기도 함
+        self.seq = 0
+        self.lock = threading.Lock()
+
+    def append(self, value, timestampNs):
+        """샘플 하나를 기록하고 그 일련번호를 반환"""
+        with self.lock:
+            seq = self.seq
+            index = seq % self.size
+            self.values[index] = value
+            self.timestamps[index] = timestampNs
+            self.seq = seq + 1
+        return seq
+
+    def _oldestSeq(self):
+        return max(0, self.seq - self.size)
+
+    def _copy(self, firstSeq, lastSeq):
+        """[firstSeq, lastSeq) 구간을 (일련번호, 타임스탬프, 값) 목록으로 복사"""
+        size = self.size
+        values = self.values
+        timestamps = self.timestamps
+        return [(seq, timestamps[seq % size], values[seq % size])
+                for seq in range(firstSeq, lastSeq)]
+
+    def latest(self):
+        """가장 최근 샘플 (일련번호, 타임스탬프, 값). 아직 없으면 None"""
+        with self.lock:
+            if self.seq == 0:
+                return None
+            seq = self.seq - 1
+            index = seq % self.size
+            return (seq, self.timestamps[index], self.values[index])
+
+    def since(self, seq):
+        """일련번호 seq 이후의 샘플 목록. 이미 덮어쓴 샘플은 건너뜀"""
+        with self.lock:
+            return self._copy(max(seq, self._oldestSeq()), self.seq)
+
+    def snapshot(self, n):
+        """최근 n개 샘플 목록 (오래된 것부터)"""
+        with self.lock:
+            return self._copy(max(self.seq - n, self._oldestSeq()), self.seq)
+
+
+class TaggedSampleRing(SampleRing):
+    """센서 번호(array 'i')를 함께 보관하는 링 버퍼. 여러 센서의 샘플을 하나의 스트림으로 합칠 때 사용"""
+
+    def __init__(self, size=1024):
+        super().__init__(size)
+        self.tags = array('i', [0]) * size
+
+    def append(self, value, timestampNs, tag=0):
+        """샘플 하나를 센서 번호와 함께 기록하고 그 일련번호를 반환"""
+        with self.lock:
+            seq = self.seq
+            index = seq % self.size
+            self.values[index] = value
+            self.timestamps[index] = timestampNs
+            self.tags[index] = tag
+            self.seq = seq + 1
+        return seq
+
+    def _copy(self, firstSeq, lastSeq):
+        """[firstSeq, lastSeq) 구간을 (일련번호, 타임스탬프, 센서 번호, 값) 목록으로 복사"""
+        size = self.size
+        values = self.values
+        timestamps = self.timestamps
+        tags = self.tags
+        return [(seq, timestamps[seq % size], tags[seq % size], values[seq % size])
+                for seq in range(firstSeq, lastSeq)]
+
+    def latest(self):
+        """가장 최근 샘플 (일련번호, 타임스탬프, 센서 번호, 값). 아직 없으면 None"""
+        with self.lock:
+            if self.seq == 0:
+                return None
+            return self._copy(self.seq - 1, self.seq)[0]
+
+
+class AcquisitionThread(threading.Thread):
+    """DOUT이 LOW가 되는 즉시 모든 변환을 읽어 링 버퍼에 기록하는 전용 스레드"""
+
+    def __init__(self, hx, ring, callback=None, realtime=None):
+        """realtime: 스레드 시작 시 적용할 hx711_realtime.RealtimeMode (None이면 일반 스레드)"""
+        super().__init__(name="HX711-acquisition-%d" % hx.DOUT, daemon=True)
+        self.hx = hx
+        self.ring = ring
+        self.callbacks = [] if callback is None else [callback]
+        self.realtime = realtime
+        self.realtimeReport = None
+        self.timeoutCount = 0
+        self.lostCount = 0
+        # 예외를 낸 콜백 호출 수와 마지막 예외 (수집은 계속함)
+        self.callbackErrorCount = 0
+        self.lastCallbackError = None
+        self._stopEvent = threading.Event()
+
+    def stop(self):
+        """스레드 종료 요청 후 끝날 때까지 대기"""
+        self._stopEvent.set()
+        if self is not threading.current_thread():
+            self.join()
+
+    def run(self):
+        realtime = self.realtime
+        if realtime is None:
+            self._acquire()
+            return
+        self.realtimeReport = realtime.enter()
+        realtime.wrapClockOut(self.hx)
+        try:
+            self._acquire()
+        finally:
+            realtime.restoreClockOut(self.hx)
+            realtime.leave()
+
+    def _acquire(self):
+        hx = self.hx
+        ring = self.ring
+        append = ring.append
+        callbacks = self.callbacks
+        stopEvent = self._stopEvent
+        lastTimestampNs = None
+
+        while not stopEvent.is_set():
+            try:
+                rawBytes = hx.readRawBytes()
+            except HX711TimeoutError:
+                self.timeoutCount += 1
+                lastTimestampNs = None
+                continue
+
+            # 링에는 드라이버 Gain(채널)의 변환만 기록. ChannelScheduler가 섞어 읽는 다른 채널은 콜백으로만 전달
+            timestampNs = hx.lastReadyNs
+            if hx.lastReadMatchesGain():
+                append(hx.rawBytesToLong(rawBytes), timestampNs)
+
+            # 변환 주기보다 훨씬 늦게 읽었다면 그 사이 변환을 놓친 것
+            period = hx.readyWaiter.period
+            if lastTimestampNs is not None and period:
+                missed = round((timestampNs - lastTimestampNs) / (period * 1e9)) - 1
+                if missed > 0:
+                    self.lostCount += missed
+            lastTimestampNs = timestampNs
+
+            for callback in callbacks:
+                try:
+                    callback(rawBytes)
+                except Exception as error:
+                    self.callbackErrorCount += 1
+                    self.lastCallbackError = error
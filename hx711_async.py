@@ -0,0 +1,177 @@
+import asyncio
+
+'''
+asyncio interface to an HX711 driver (hx711v0_5_1.HX711, the emulator or a
+capture replay).
+
+The driver's acquisition thread is the only thread: it reads every conversion
+into its ring buffer as before and, through a ready callback, schedules one
+wake-up on the event loop.  Wake-ups that arrive while one is already pending
+are merged, so the acquisition thread does at most one
+call_soon_threadsafe() per conversion however many coroutines are waiting,
+and a busy loop is woken less often with more samples each time.
+
+Each wake-up copies the new samples out of the ring buffer once; every
+waiting coroutine awaits the same future (through asyncio.shield(), so one
+consumer can be cancelled or time out without affecting the others) and
+reads the samples from that shared batch, so thousands of consumers cost no extra threads and no extra
+locking.  A consumer that only needs the newest state should use batches(),
+which hands over all new samples in one step instead of one step per sample.
+
+Each stream keeps at most queueSize samples of backlog: a consumer that falls
+further behind skips the oldest samples and counts them in droppedCount
+instead of stalling the others or growing memory.
+
+Usage:
+    async def main():
+        async with AsyncHX711(HX711(5, 6)) as hx:
+            await hx.tare()
+            await hx.calibrate(1000.0)
+            async for timestampNs, weight in hx.streamWeights():
+                print(weight)
+'''
+
+
+class AsyncHX711:
+    """드라이버의 수집 스레드에서 샘플을 받아 이벤트 루프의 코루틴들에게 나눠주는 asyncio 인터페이스"""
+
+    def __init__(self, hx, bufferSize=1024):
+        """hx: hx711v0_5_1.HX711과 같은 API의 드라이버, bufferSize: 수집 링 버퍼 크기 (수집이 이미 시작됐으면 무시)"""
+        self.hx = hx
+        self.bufferSize = bufferSize
+        self.loop = None
+        self.running = False
+        # 밀려서 건너뛴 샘플 수 (모든 스트림 합계)
+        self.droppedCount = 0
+        self.wakeCount = 0
+        self._future = None
+        self._wakePending = False
+        # 마지막 깨우기 때 링 버퍼에서 가져온 샘플 목록과 그 첫 일련번호
+        self._batch = []
+        self._batchSeq = 0
+
+    def start(self):
+        """수집 스레드를 시작하고 샘플 알림을 등록. 이벤트 루프 안에서 호출해야 함"""
+        if self.running:
+            return
+        self.loop = asyncio.get_running_loop()
+        self._future = self.loop.create_future()
+        self._wakePending = False
+        self.hx.startAcquisition(self.bufferSize)
+        self._batch = []
+        self._batchSeq = self.hx.ring.seq
+        self.hx.enableReadyCallback(self._onSample)
+        self.running = True
+
+    def stop(self):
+        """샘플 알림을 해제하고 기다리던 스트림을 모두 끝냄. 수집 스레드는 멈추지 않음"""
+        if not self.running:
+            return
+        self.running = False
+        self.hx.disableReadyCallback(self._onSample)
+        self._wake()
+
+    async def __aenter__(self):
+        self.start()
+        return self
+
+    async def __aexit__(self, excType, excValue, traceback):
+        self.stop()
+
+    def _onSample(self, rawBytes):
+        """수집 스레드에서 변환마다 호출됨. 이미 깨우기가 예약돼 있으면 아무것도 하지 않음"""
+        if not self._wakePending:
+            self._wakePending = True
+            self.loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        """새 샘플을 한 번만 복사해 두고 기다리는 코루틴을 모두 깨운 뒤 다음 알림용 future를 준비"""
+        self._wakePending = False
+        self.wakeCount += 1
+        batch = self.hx.ring.since(self._batchSeq + len(self._batch))
+        if batch:
+            self._batch = batch
+            self._batchSeq = batch[0][0]
+        future = self._future
+        self._future = self.loop.create_future()
+        if not future.done():
+            future.set_result(None)
+
+    def _samplesSince(self, seq):
+        """일련번호 seq 이후의 샘플. 마지막 깨우기의 묶음 안이면 거기서, 더 밀렸으면 링 버퍼에서 가져옴"""
+        batchSeq = self._batchSeq
+        if seq >= batchSeq:
+            return self._batch[seq - batchSeq:]
+        return self.hx.ring.since(seq)
+
+    async def batches(self, queueSize=64):
+        """지금 이후의 샘플을 깨울 때마다 (일련번호, 타임스탬프 ns, 값) 목록으로 반환.
+        queueSize개보다 밀리면 오래된 샘플을 건너뜀"""
+        if queueSize <= 0:
+            raise ValueError("AsyncHX711::batches() queueSize must be greater than zero!")
+        self.start()
+        nextSeq = self._batchSeq + len(self._batch)
+        while self.running:
+            samples = self._samplesSince(nextSeq)
+            if not samples:
+                # 공유 future는 shield로 감싸 기다림. 이 코루틴이 취소되거나 시간 초과돼도
+                # 다른 코루틴이 기다리는 future는 그대로 남음
+                await asyncio.shield(self._future)
+                continue
+            # 링 버퍼가 덮어쓴 샘플과 queueSize를 넘는 샘플은 건너뜀
+            skipped = samples[0][0] - nextSeq + max(0, len(samples) - queueSize)
+            if skipped:
+                self.droppedCount += skipped
+                samples = samples[-queueSize:]
+            nextSeq = samples[-1][0] + 1
+            yield samples
+
+    async def stream(self, queueSize=64):
+        """지금 이후의 샘플 (일련번호, 타임스탬프 ns, 값)을 하나씩 차례로 반환"""
+        async for samples in self.batches(queueSize):
+            for sample in samples:
+                yield sample
+
+    async def streamWeights(self, queueSize=64):
+        """지금 이후의 샘플을 (타임스탬프 ns, 무게)로 하나씩 차례로 반환 (링에는 드라이버 Gain 채널의 변환만 있음)"""
+        longToWeight = self.hx.longToWeight
+        async for samples in self.batches(queueSize):
+            for seq, timestampNs, value in samples:
+                yield timestampNs, longToWeight(value)
+
+    async def readSamples(self, times):
+        """지금 이후의 샘플 times개의 값 목록"""
+        values = []
+        batches = self.batches(max(times, 1))
+        try:
+            async for samples in batches:
+                values.extend(value for seq, timestampNs, value in samples)
+                if len(values) >= times:
+                    break
+        finally:
+            await batches.aclose()
+        if len(values) < times:
+            raise RuntimeError("AsyncHX711::readSamples() stopped before %d samples were read" % times)
+        return values[:times]
+
+    async def read(self):
+        """다음 변환의 부호있는 값"""
+        return (await self.readSamples(1))[0]
+
+    async def readWeight(self):
+        """다음 변환의 무게"""
+        return self.hx.longToWeight(await self.read())
+
+    async def tare(self, times=15):
+        """다음 times개 변환의 중앙값을 오프셋으로 설정하고 반환"""
+        values = sorted(await self.readSamples(times))
+        offset = values[len(values) // 2]
+        self.hx.setOffset(offset)
+        return offset
+
+    async def calibrate(self, knownWeight, times=15):
+        """knownWeight를 올려 둔 상태의 다음 times개 변환 중앙값으로 기준 단위를 설정하고 반환"""
+        values = sorted(await self.readSamples(times))
+        referenceUnit = (values[len(values) // 2] - self.hx.getOffset()) / knownWeight
+        self.hx.setReferenceUnit(referenceUnit)
+        return referenceUnit
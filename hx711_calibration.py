@@ -0,0 +1,297 @@
+import os
+import json
+import math
+import time
+from collections import namedtuple
+
+from hx711_channels import readChannel
+
+'''
+Stored calibration profiles, so a driver gives weights from its first
+conversion instead of taring and calibrating at every start.
+
+A profile belongs to one sensor (hx.sensorId, or the "DOUT:PD_SCK" pins),
+gain and channel.  Calibrator fits it from readings taken with known weights
+on the load cell (0 included): a least-squares fit of
+
+    weight = (value - offset) / referenceUnit + quadratic * (value - offset)^2
+
+with quadratic = 0 unless asked for (it needs 3 or more distinct weights).
+offset is where the fitted curve crosses zero weight, so the profile drops
+straight into the drivers' setOffset()/setReferenceUnit() (and
+setQuadratic() on hx711v0_5_1, per channel).  The profile also records when it was made,
+the pooled standard deviation of the readings at each weight (noise, counts)
+and the RMS error of the fit (residual, weight units).
+
+ProfileStore keeps all profiles in one small JSON file, written atomically;
+loading a handful of profiles takes tens of microseconds.  attach(hx) checks
+the file's modification time from the acquisition thread every
+checkInterval seconds and applies a changed profile between two
+conversions, so a recalibration written by another process takes effect
+while streaming.
+
+Usage:
+    calibrator = Calibrator(sensorIdOf(hx), hx.getGain())
+    calibrator.measure(hx, 0.0)
+    calibrator.measure(hx, 1000.0)
+    calibrator.measure(hx, 5000.0)
+    store = ProfileStore('calibration.json')
+    store.put(calibrator.fit())
+    store.save()
+
+    # at boot
+    store = ProfileStore('calibration.json')
+    store.apply(hx)
+    store.attach(hx)
+    print(hx.getWeight())
+'''
+
+# sensorId: 센서 ID, gain: 128/64/32, channel: 'A' 또는 'B',
+# offset/referenceUnit/quadratic: 변환식 계수, createdAt: 만든 시각 (유닉스 시각, 초),
+# noise: 같은 무게에서 읽은 값의 표준편차 (카운트), residual: 맞춤 RMS 오차 (무게 단위), points: 보정 무게 수
+CalibrationProfile = namedtuple('CalibrationProfile', [
+    'sensorId', 'gain', 'channel', 'offset', 'referenceUnit', 'quadratic',
+    'createdAt', 'noise', 'residual', 'points'])
+
+FILE_VERSION = 1
+
+
+def sensorIdOf(hx):
+    """드라이버의 센서 ID. sensorId 속성이 없으면 'DOUT:PD_SCK' 핀 번호"""
+    sensorId = getattr(hx, 'sensorId', None)
+    if sensorId is None:
+        sensorId = "%s:%s" % (hx.DOUT, hx.PD_SCK)
+    return str(sensorId)
+
+
+def profileKey(sensorId, gain, channel='A'):
+    """프로파일 저장 키"""
+    return "%s/%d/%s" % (sensorId, gain, channel)
+
+
+def profileToWeight(profile, value):
+    """프로파일로 부호있는 원시값을 무게로 변환"""
+    x = value - profile.offset
+    return x / profile.referenceUnit + profile.quadratic * x * x
+
+
+def _solve(matrix, vector):
+    """작은 선형 방정식 (부분 피벗 가우스 소거)"""
+    n = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(n)]
+    for column in range(n):
+        pivot = max(range(column, n), key=lambda row: abs(rows[row][column]))
+        if abs(rows[pivot][column]) < 1e-12:
+            raise ValueError("Calibrator::fit() calibration points do not determine the fit!")
+        rows[column], rows[pivot] = rows[pivot], rows[column]
+        for row in range(column + 1, n):
+            factor = rows[row][column] / rows[column][column]
+            for k in range(column, n + 1):
+                rows[row][k] -= factor * rows[column][k]
+    result = [0.0] * n
+    for row in range(n - 1, -1, -1):
+        result[row] = (rows[row][n] - sum(rows[row][k] * result[k] for k in range(row + 1, n))) / rows[row][row]
+    return result
+
+
+class Calibrator:
+    """알고 있는 무게에서 읽은 값들로 보정 프로파일을 맞춤"""
+
+    def __init__(self, sensorId, gain=128, channel='A', clock=time):
+        self.sensorId = str(sensorId)
+        # 채널 B는 항상 Gain 32로 변환됨
+        self.gain = 32 if channel == 'B' else gain
+        self.channel = channel
+        self.clock = clock
+        # (무게, 읽은 값 수, 평균, 분산) 목록
+        self.points = []
+
+    def addPoint(self, knownWeight, values):
+        """knownWeight를 올려 두고 읽은 원시값 목록을 추가"""
+        values = [float(value) for value in values]
+        if not values:
+            raise ValueError("Calibrator::addPoint() needs at least one value!")
+        mean = sum(values) / len(values)
+        variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1) if len(values) > 1 else 0.0
+        self.points.append((float(knownWeight), len(values), mean, variance))
+
+    def measure(self, hx, knownWeight, times=15):
+        """hx에서 이 프로파일 채널의 변환 times개를 읽어 knownWeight 점으로 추가"""
+        self.addPoint(knownWeight, readChannel(hx, self.channel, times))
+
+    def fit(self, quadratic=False):
+        """가중 최소제곱으로 맞춘 CalibrationProfile"""
+        weights = set(point[0] for point in self.points)
+        if len(weights) < (3 if quadratic else 2):
+            raise ValueError("Calibrator::fit() needs %d different weights!" % (3 if quadratic else 2))
+
+        # 수치 안정성을 위해 원시값을 평균과 폭으로 정규화한 u에 대해 weight = d0 + d1*u (+ d2*u^2)
+        total = sum(point[1] for point in self.points)
+        center = sum(point[1] * point[2] for point in self.points) / total
+        spread = max(abs(point[2] - center) for point in self.points) or 1.0
+        order = 3 if quadratic else 2
+        matrix = [[0.0] * order for i in range(order)]
+        vector = [0.0] * order
+        for weight, count, mean, variance in self.points:
+            u = (mean - center) / spread
+            powers = [u ** k for k in range(order)]
+            for i in range(order):
+                vector[i] += count * powers[i] * weight
+                for j in range(order):
+                    matrix[i][j] += count * powers[i] * powers[j]
+        d = _solve(matrix, vector) + [0.0] * (3 - order)
+
+        # 무게 0이 되는 u (오프셋). 2차면 가운데에 가까운 근
+        if d[2] == 0.0:
+            if d[1] == 0.0:
+                raise ValueError("Calibrator::fit() readings do not change with the weight!")
+            u0 = -d[0] / d[1]
+        else:
+            discriminant = d[1] * d[1] - 4 * d[2] * d[0]
+            if discriminant < 0:
+                raise ValueError("Calibrator::fit() the fitted curve never reaches zero weight!")
+            root = math.sqrt(discriminant)
+            u0 = min(((-d[1] + root) / (2 * d[2]), (-d[1] - root) / (2 * d[2])), key=abs)
+        offset = center + spread * u0
+        slope = (d[1] + 2 * d[2] * u0) / spread
+        if slope == 0.0:
+            raise ValueError("Calibrator::fit() readings do not change with the weight!")
+
+        profile = CalibrationProfile(self.sensorId, self.gain, self.channel, offset, 1.0 / slope,
+                                     d[2] / (spread * spread), self.clock.time(), 0.0, 0.0, len(weights))
+        squared = sum(count * (profileToWeight(profile, mean) - weight) ** 2
+                      for weight, count, mean, variance in self.points)
+        degrees = sum(point[1] - 1 for point in self.points)
+        noise = math.sqrt(sum((point[1] - 1) * point[3] for point in self.points) / degrees) if degrees else 0.0
+        return profile._replace(noise=noise, residual=math.sqrt(squared / total))
+
+
+def applyProfile(hx, profile):
+    """프로파일을 드라이버에 적용 (hx711v0_5_1.HX711 API 또는 hx711.HX711 API)"""
+    if hasattr(hx, 'setReferenceUnit'):
+        hx.setOffset(profile.offset, profile.channel)
+        hx.setReferenceUnit(profile.referenceUnit, profile.channel)
+        hx.setQuadratic(profile.quadratic, profile.channel)
+        return
+    if profile.quadratic:
+        raise ValueError("applyProfile() hx711.HX711 has no quadratic term!")
+    if profile.channel == 'B':
+        hx.set_offset_B(profile.offset)
+        hx.set_reference_unit_B(profile.referenceUnit)
+    else:
+        hx.set_offset_A(profile.offset)
+        hx.set_reference_unit_A(profile.referenceUnit)
+
+
+class ProfileStore:
+    """보정 프로파일 파일. 변경되면 다시 읽어 드라이버에 적용할 수 있음"""
+
+    def __init__(self, path, clock=time):
+        self.path = path
+        self.clock = clock
+        self.profiles = {}
+        # 마지막으로 읽은 파일의 (수정 시각 ns, 크기)
+        self.fileStamp = None
+        self.loadCount = 0
+        # attach()의 재읽기가 실패한 횟수와 마지막 예외 (반쯤 쓴 파일 등. 마지막으로 읽은 프로파일을 유지)
+        self.reloadErrorCount = 0
+        self.lastReloadError = None
+        self.load()
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def load(self):
+        """파일을 읽음. 없으면 빈 저장소. 읽은 프로파일 수를 반환"""
+        stamp = self._stamp()
+        profiles = {}
+        if stamp is not None:
+            with open(self.path, 'rb') as f:
+                data = json.loads(f.read())
+            if data.get('version') != FILE_VERSION:
+                raise ValueError("ProfileStore::load() unsupported calibration file version!")
+            for key, fields in data['profiles'].items():
+                sensorId, gain, channel = key.rsplit('/', 2)
+                profiles[key] = CalibrationProfile(sensorId, int(gain), channel, *fields)
+        self.profiles = profiles
+        self.fileStamp = stamp
+        self.loadCount += 1
+        return len(profiles)
+
+    def save(self):
+        """임시 파일에 쓴 뒤 바꿔치기 (읽는 쪽이 반쯤 쓴 파일을 보지 않음)"""
+        data = {
+            'version': FILE_VERSION,
+            'profiles': dict((key, list(profile[3:])) for key, profile in sorted(self.profiles.items())),
+        }
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump(data, f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.path)
+        self.fileStamp = self._stamp()
+
+    def put(self, profile):
+        """프로파일 추가 또는 교체 (save()해야 파일에 반영)"""
+        self.profiles[profileKey(profile.sensorId, profile.gain, profile.channel)] = profile
+
+    def get(self, sensorId, gain=128, channel='A'):
+        """프로파일. 없으면 None"""
+        return self.profiles.get(profileKey(sensorId, gain, channel))
+
+    def profileFor(self, hx, channel='A'):
+        """드라이버의 센서 ID와 현재 Gain (채널 B는 항상 32)에 맞는 프로파일. 없으면 None"""
+        if channel == 'B':
+            gain = 32
+        else:
+            gain = hx.getGain() if hasattr(hx, 'getGain') else hx.get_gain()
+        return self.get(sensorIdOf(hx), gain, channel)
+
+    def reloadIfChanged(self):
+        """파일이 바뀌었으면 다시 읽고 True"""
+        if self._stamp() == self.fileStamp:
+            return False
+        self.load()
+        return True
+
+    def apply(self, hx, channel='A'):
+        """hx에 맞는 프로파일을 적용하고 반환. 없으면 아무것도 하지 않고 None"""
+        profile = self.profileFor(hx, channel)
+        if profile is not None:
+            applyProfile(hx, profile)
+        return profile
+
+    def attach(self, hx, channel='A', checkInterval=1.0):
+        """수집 스레드에서 checkInterval초마다 파일 변경을 확인하고 바뀐 프로파일을 적용하는 콜백을 등록. 콜백을 반환.
+        읽을 수 없는 파일은 reloadErrorCount에 세고 다음 확인 때 다시 읽음"""
+        clock = self.clock
+        intervalNs = int(checkInterval * 1e9)
+        nextCheck = [clock.monotonic_ns() + intervalNs]
+        applied = [self.profileFor(hx, channel)]
+
+        def reload(rawBytes):
+            """주기가 되면 파일 변경을 확인"""
+            nowNs = clock.monotonic_ns()
+            if nowNs < nextCheck[0]:
+                return
+            nextCheck[0] = nowNs + intervalNs
+            try:
+                changed = self.reloadIfChanged()
+            except (OSError, ValueError) as error:
+                # 편집기가 쓰는 중이거나 지운 파일. fileStamp가 그대로이므로 다음 확인 때 다시 읽음
+                self.reloadErrorCount += 1
+                self.lastReloadError = error
+                return
+            if changed:
+                profile = self.profileFor(hx, channel)
+                if profile is not None and profile != applied[0]:
+                    applyProfile(hx, profile)
+                    applied[0] = profile
+
+        hx.enableReadyCallback(reload)
+        return reload
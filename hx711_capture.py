@@ -0,0 +1,355 @@
+import os
+import mmap
+import time
+import struct
+import threading
+from collections import deque
+
+from hx711_ready import HX711TimeoutError
+from hx711_emulator import VirtualHX711
+from hx711_channels import PULSE_CHANNELS, PULSE_GAINS
+
+'''
+Compact binary capture of raw HX711 samples and replay through the driver API.
+
+A capture file is a 16 byte header followed by fixed-width 16 byte records,
+appended as they arrive:
+
+    header: magic b'HX711CAP', version (uint16), record size (uint16), 0 (uint32)
+    record: timestamp ns (int64), signed 24-bit value (int32),
+            gain (uint8), channel (uint8, 0 = A, 1 = B), sensor ID (uint16)
+
+all little-endian.  CaptureWriter.append() only puts a tuple on a deque, so it
+is cheap enough to call from the acquisition thread (attach(hx) registers it
+as a ready callback); a writer thread packs the records into a preallocated
+buffer and writes them in large blocks.  If the disk falls behind by more
+than maxPending records, new records are dropped and counted rather than
+growing memory without bound.
+
+ReplaySource memory-maps a capture and is a hx711v0_5_1.HX711 whose
+conversions come from the file, so a capture of any size replays through the
+same getWeight()/startAcquisition()/filters code without being loaded into
+memory.  speed=1.0 replays in real time, 10.0 ten times faster and None as
+fast as it can be read; the timestamps (lastReadyNs, the ring buffer) are
+always the recorded ones.  records() iterates over the raw records directly.
+
+Usage:
+    writer = CaptureWriter('pedal.cap', sensorId=1)
+    writer.attach(hx)           # hx.startAcquisition() is called if needed
+    ...
+    writer.close()
+
+    replay = ReplaySource('pedal.cap', speed=None)
+    replay.setReferenceUnit(114)
+    while not replay.finished:
+        print(replay.getWeight())
+'''
+
+MAGIC = b'HX711CAP'
+VERSION = 1
+HEADER = struct.Struct('<8sHHI')
+RECORD = struct.Struct('<qiBBH')
+
+CHANNELS = {'A': 0, 'B': 1}
+
+
+class CaptureFormatError(ValueError):
+    """캡처 파일 헤더가 맞지 않을 때 발생"""
+
+
+def readHeader(data):
+    """파일 앞부분(bytes, mmap)의 헤더를 검사하고 레코드 크기를 반환"""
+    if len(data) < HEADER.size:
+        raise CaptureFormatError("Capture file is too short to have a header!")
+    magic, version, recordSize, reserved = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise CaptureFormatError("Not an HX711 capture file!")
+    if version != VERSION or recordSize != RECORD.size:
+        raise CaptureFormatError("Unsupported capture version %d (record size %d)!" % (version, recordSize))
+    return recordSize
+
+
+class CaptureWriter:
+    """원시 샘플을 캡처 파일 끝에 기록. 기록은 별도 스레드에서 큰 블록 단위로 이루어짐"""
+
+    def __init__(self, path, sensorId=0, bufferRecords=4096, flushInterval=0.5, maxPending=1 << 20):
+        """sensorId: 기본 센서 ID, bufferRecords: 한 번에 쓰는 최대 레코드 수,
+        flushInterval: 기록 스레드가 깨어나는 간격(초), maxPending: 쓰이지 않고 쌓일 수 있는 최대 레코드 수"""
+        self.path = path
+        self.sensorId = sensorId
+        self.flushInterval = flushInterval
+        self.maxPending = maxPending
+        # 파일에 쓰고 flush까지 끝난 레코드 수
+        self.writtenCount = 0
+        self.droppedCount = 0
+        # 대기열에서 꺼냈지만 아직 flush하지 않은 레코드 수 (_flushed 안에서 바꿈)
+        self._inFlight = 0
+
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0))
+            self._file.flush()
+        else:
+            with open(path, 'rb') as f:
+                readHeader(f.read(HEADER.size))
+
+        self._buffer = bytearray(RECORD.size * bufferRecords)
+        self._bufferRecords = bufferRecords
+        self._pending = deque()
+        self._callbacks = []
+        self._wakeEvent = threading.Event()
+        self._stopEvent = threading.Event()
+        self._flushed = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="HX711-capture", daemon=True)
+        self._thread.start()
+
+    def append(self, value, timestampNs, gain=128, channel=0, sensorId=None):
+        """레코드 하나를 기록 대기열에 넣음 (수집 스레드에서 호출해도 됨)"""
+        pending = self._pending
+        if len(pending) >= self.maxPending:
+            self.droppedCount += 1
+            return
+        pending.append((timestampNs, value, gain, channel,
+                        self.sensorId if sensorId is None else sensorId))
+
+    def attach(self, hx, sensorId=None, channel=None):
+        """hx의 변환을 각각 그 변환의 Gain과 채널 (hx.lastGainPulses)로 기록하도록 준비 콜백을 등록
+        (수집 스레드가 없으면 시작). channel: 'A' 또는 'B'면 그 채널의 변환만 기록. 등록한 콜백을 반환"""
+        append = self.append
+        rawBytesToLong = hx.rawBytesToLong
+        if channel is not None and channel not in CHANNELS:
+            raise ValueError("CaptureWriter::attach() channel must be 'A' or 'B'!")
+        if sensorId is None:
+            sensorId = self.sensorId
+
+        def capture(rawBytes):
+            """변환 하나를 캡처 대기열에 넣음"""
+            gainPulses = hx.lastGainPulses
+            sampleChannel = PULSE_CHANNELS[gainPulses]
+            if channel is None or sampleChannel == channel:
+                append(rawBytesToLong(rawBytes), hx.lastReadyNs, PULSE_GAINS[gainPulses],
+                       CHANNELS[sampleChannel], sensorId)
+
+        hx.enableReadyCallback(capture)
+        self._callbacks.append((hx, capture))
+        return capture
+
+    def detach(self, hx=None):
+        """attach()로 등록한 콜백 해제. hx가 None이면 모두"""
+        for entry in list(self._callbacks):
+            if hx is None or entry[0] is hx:
+                entry[0].disableReadyCallback(entry[1])
+                self._callbacks.remove(entry)
+
+    def _drain(self):
+        """대기열의 레코드를 블록 단위로 파일에 쓰고 flush한 뒤 writtenCount에 반영"""
+        pending = self._pending
+        buffer = self._buffer
+        packInto = RECORD.pack_into
+        size = RECORD.size
+        flushed = self._flushed
+        while pending:
+            count = 0
+            offset = 0
+            # 꺼낸 레코드는 flush할 때까지 _inFlight로 세어 flush()가 기다릴 수 있게 함
+            with flushed:
+                while pending and count < self._bufferRecords:
+                    packInto(buffer, offset, *pending.popleft())
+                    offset += size
+                    count += 1
+                self._inFlight += count
+            self._file.write(memoryview(buffer)[:offset])
+        if self._inFlight:
+            self._file.flush()
+            with flushed:
+                self.writtenCount += self._inFlight
+                self._inFlight = 0
+                flushed.notify_all()
+
+    def _run(self):
+        while not self._stopEvent.is_set():
+            self._wakeEvent.wait(self.flushInterval)
+            self._wakeEvent.clear()
+            self._drain()
+        self._drain()
+        with self._flushed:
+            self._flushed.notify_all()
+
+    def flush(self, timeout=None):
+        """지금까지 넣은 레코드가 파일에 쓰이고 flush될 때까지 대기. timeout 전에 끝났으면 True"""
+        with self._flushed:
+            target = self.writtenCount + self._inFlight + len(self._pending)
+            self._wakeEvent.set()
+            return self._flushed.wait_for(
+                lambda: self.writtenCount >= target or not self._thread.is_alive(), timeout)
+
+    def close(self):
+        """콜백을 해제하고 남은 레코드를 모두 쓴 뒤 파일을 닫음"""
+        if self._file.closed:
+            return
+        self.detach()
+        self._stopEvent.set()
+        self._wakeEvent.set()
+        self._thread.join()
+        self._file.close()
+
+    def getStats(self):
+        """기록한 레코드 수, 대기 중인 레코드 수, 버린 레코드 수"""
+        return {
+            'written': self.writtenCount,
+            'pending': len(self._pending),
+            'dropped': self.droppedCount,
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.close()
+
+
+class ReplayClock:
+    """캡처 레코드의 타임스탬프에 맞춰 변환을 내보내는 대기 객체 (ReadyWaiter와 같은 인터페이스)"""
+
+    def __init__(self, source, speed, clock):
+        self.source = source
+        self.speed = speed
+        self.clock = clock
+        self.period = None
+        self.readyNs = 0
+        self.waitCount = 0
+        self.sleepTime = 0.0
+        self._startNs = None
+        self._firstNs = None
+
+    def reset(self):
+        pass
+
+    def isReady(self):
+        """다음 레코드의 재생 시각이 지났는지 여부"""
+        record = self.source.peek()
+        if record is None:
+            return False
+        return self._delay(record[0]) <= 0
+
+    def _delay(self, timestampNs):
+        """timestampNs 레코드를 내보낼 때까지 남은 시간(초)"""
+        if self.speed is None:
+            return 0.0
+        nowNs = self.clock.monotonic_ns()
+        if self._startNs is None:
+            self._startNs = nowNs
+            self._firstNs = timestampNs
+        targetNs = self._startNs + (timestampNs - self._firstNs) / self.speed
+        return (targetNs - nowNs) / 1e9
+
+    def wait(self, timeout=None):
+        """다음 레코드의 재생 시각까지 잠듦. 파일 끝이면 timeout만큼 기다린 뒤 HX711TimeoutError 발생"""
+        self.waitCount += 1
+        record = self.source.peek()
+        if record is None:
+            if timeout:
+                self.clock.sleep(timeout)
+            raise HX711TimeoutError("HX711: end of capture %s" % self.source.path)
+        delay = self._delay(record[0])
+        if delay > 0:
+            if timeout is not None and delay > timeout:
+                self.clock.sleep(timeout)
+                raise HX711TimeoutError(
+                    "HX711: DOUT not ready after %.3f s, is the sensor connected?" % timeout)
+            self.clock.sleep(delay)
+            self.sleepTime += delay
+        previousNs = self.readyNs
+        self.readyNs = record[0]
+        if previousNs and self.readyNs > previousNs:
+            # 수집 스레드가 놓친 변환을 셀 수 있도록 관측된 간격을 주기로 씀
+            interval = (self.readyNs - previousNs) / 1e9
+            if self.period is None or interval < self.period:
+                self.period = interval
+
+
+class ReplaySource(VirtualHX711):
+    """캡처 파일을 메모리 매핑해 hx711v0_5_1.HX711과 같은 API로 재생"""
+
+    def __init__(self, path, speed=1.0, sensorId=None, channel=None, gain=128, clock=time, dout=5, pd_sck=6):
+        """speed: 재생 배속 (None이면 기다리지 않음), sensorId/channel: 이 센서와 채널의 레코드만 재생
+        (None이면 모두. 두 채널을 섞어 기록한 캡처는 채널을 지정),
+        clock: 시계 (time 모듈 또는 hx711_time.SimulatedClock)"""
+        self.path = path
+        self.sensorId = sensorId
+        self.channel = None if channel is None else CHANNELS[channel]
+        self.lastRecord = None
+
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size <= HEADER.size:
+            self._file.close()
+            raise CaptureFormatError("Capture file %s has no records!" % path)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        readHeader(self._map)
+        # 쓰는 도중 잘린 마지막 레코드는 버림
+        self.recordCount = (size - HEADER.size) // RECORD.size
+        self._position = 0
+        self._next = None
+
+        super().__init__(dout, pd_sck, gain, ReplayClock(self, speed, clock), self._replayClockOut, clock)
+
+    def __len__(self):
+        return self.recordCount
+
+    @property
+    def finished(self):
+        """더 재생할 레코드가 없는지 여부"""
+        return self.peek() is None
+
+    def _matches(self, record):
+        if self.sensorId is not None and record[4] != self.sensorId:
+            return False
+        if self.channel is not None and record[3] != self.channel:
+            return False
+        return True
+
+    def peek(self):
+        """다음에 재생할 레코드 (timestampNs, value, gain, channel, sensorId). 없으면 None"""
+        if self._next is None:
+            unpackFrom = RECORD.unpack_from
+            data = self._map
+            while self._position < self.recordCount:
+                record = unpackFrom(data, HEADER.size + self._position * RECORD.size)
+                self._position += 1
+                if self._matches(record):
+                    self._next = record
+                    break
+        return self._next
+
+    def rewind(self):
+        """처음부터 다시 재생"""
+        with self.readLock:
+            self._position = 0
+            self._next = None
+            self.readyWaiter = ReplayClock(self, self.readyWaiter.speed, self.clock)
+
+    def records(self, start=0, stop=None):
+        """start..stop 번째 레코드를 (timestampNs, value, gain, channel, sensorId)로 차례로 반환 (필터는 적용하지 않음)"""
+        stop = self.recordCount if stop is None else min(stop, self.recordCount)
+        if start >= stop:
+            return
+        view = memoryview(self._map)[HEADER.size + start * RECORD.size:HEADER.size + stop * RECORD.size]
+        try:
+            yield from RECORD.iter_unpack(view)
+        finally:
+            view.release()
+
+    def _replayClockOut(self, pulses):
+        """다음 레코드의 값을 24비트 원시값으로 반환"""
+        record = self.peek()
+        self._next = None
+        self.lastRecord = record
+        self.sampleCount += 1
+        return record[1] & 0xffffff
+
+    def close(self):
+        """메모리 매핑과 파일을 닫음"""
+        self.stopAcquisition()
+        self._map.close()
+        self._file.close()
@@ -0,0 +1,191 @@
+from hx711_acquisition import TaggedSampleRing
+
+'''
+Channel A/B interleaving on one HX711 through the trailing gain pulses.
+
+The 1-3 pulses PD_SCK gets after the 24 data bits of a read choose the
+channel and gain of the next conversion (1: A/128, 2: B/32, 3: A/64).
+Switching with setGain() only reaches the chip with the pulses of the
+following read, so the conversion in between still has the old channel: the
+drivers throw it away, and switching back costs another one.  Here every
+read sends the pulses for the conversion after it instead, and the driver
+records the pulses the conversion it returned was made with
+(hx.lastGainPulses), so each sample is tagged with its channel.  Only a
+ChannelScheduler that does all the reads drops nothing: readChannel() still
+reads out (and drops) the conversion already armed for the other channel
+first, so a B read between plain A reads (get_value_B(1) then read_long())
+costs one extra conversion, against two with setGain().
+
+ChannelScheduler repeats a pattern built from an A:B ratio ((1, 1) is
+A B A B ..., (3, 1) is A A A B ...), either one read at a time with
+read(hx) or, with attach(hx), on hx711v0_5_1's acquisition thread, keeping
+its own ring of (seq, timestampNs, channel, value).  Meanwhile the driver's
+own ring (hx.latest(), AsyncHX711) and its single-channel consumers (the
+weight filter, pedal_events, pedal_dashboard) only get the conversions made
+with the driver's gain (hx.lastReadMatchesGain()), and CaptureWriter records
+each conversion with its own channel and gain.  readChannel() reads a
+number of conversions of one channel and asks for the driver's own gain
+again with the last read; hx711.HX711.get_value_B() and tare_B() use it.
+
+A read the driver retries because it looked corrupt (hx711_integrity)
+returns a later conversion, so the order can slip by one; the tag always
+says which channel a sample is.  If the chip may have powered down during
+the corrupt read (and so gone back to channel A, gain 128), the driver
+throws the next conversion away rather than tag it wrongly.
+
+The datasheet quotes the same output settling time (4 conversions) for a
+channel or gain change as for power-up.  Sensors that show a step right
+after a switch should use longer runs of each channel, e.g. a ratio of
+(8, 8) instead of (1, 1).
+
+Usage:
+    scheduler = ChannelScheduler(ratio=(3, 1))
+    scheduler.attach(hx)
+    seq, timestampNs, channel, value = scheduler.latest('B')
+    print(hx.longToWeight(value, 'B'))
+'''
+
+# 트레일링 Gain 펄스 수별 채널과 Gain
+PULSE_CHANNELS = {1: 'A', 2: 'B', 3: 'A'}
+PULSE_GAINS = {1: 128, 2: 32, 3: 64}
+
+
+def channelPulses(hx, channel):
+    """channel을 변환하게 할 Gain 펄스 수. A는 드라이버 Gain (채널 B로 설정돼 있으면 128), B는 항상 2 (Gain 32)"""
+    if channel == 'B':
+        return 2
+    if channel != 'A':
+        raise ValueError("channelPulses() channel must be 'A' or 'B'!")
+    return hx.GAIN if hx.GAIN in (1, 3) else 1
+
+
+def _toLong(hx, rawBytes):
+    """읽은 3바이트를 부호있는 정수로 변환 (두 드라이버 공통)"""
+    return hx.convertFromTwosComplement24bit((rawBytes[0] << 16) | (rawBytes[1] << 8) | rawBytes[2])
+
+
+def readChannel(hx, channel, times=1, timeout=None):
+    """channel의 변환 times개를 버리는 변환 없이 읽어 목록으로 반환.
+    각 읽기의 Gain 펄스로 다음 변환을 예약하고, 마지막 읽기는 드라이버 Gain을 다시 예약함.
+    칩에 다른 채널이 예약돼 있었으면 그 변환 하나를 먼저 읽음 (반환값에는 없음)"""
+    if times <= 0:
+        raise ValueError("readChannel() times must be greater than zero!")
+    pulses = channelPulses(hx, channel)
+    values = []
+    while len(values) < times:
+        # 마지막으로 필요한 변환이 이미 예약돼 있으면 그 다음 변환은 드라이버 Gain으로
+        last = len(values) == times - 1 and hx.chipGainPulses == pulses
+        rawBytes = hx.readRawBytes(timeout, hx.GAIN if last else pulses)
+        if hx.lastGainPulses == pulses:
+            values.append(_toLong(hx, rawBytes))
+    return values
+
+
+class ChannelScheduler:
+    """A:B 비율대로 다음 변환의 채널을 고르고, 읽은 샘플마다 채널을 붙여 기록"""
+
+    def __init__(self, ratio=(1, 1), gainA=128, bufferSize=1024):
+        """ratio: 반복할 (A 변환 수, B 변환 수), gainA: 채널 A의 Gain (128 또는 64),
+        bufferSize: 채널별 샘플을 기록할 링 버퍼 크기"""
+        countA, countB = ratio
+        if countA < 0 or countB < 0 or countA + countB == 0:
+            raise ValueError("ChannelScheduler::__init__() ratio needs at least one conversion!")
+        if gainA == 128:
+            pulsesA = 1
+        elif gainA == 64:
+            pulsesA = 3
+        else:
+            raise ValueError("ChannelScheduler::__init__() channel A gain must be 128 or 64!")
+
+        # B를 주기 안에 고르게 퍼뜨림 ((3, 1)이면 A A A B, (2, 2)이면 A B A B)
+        total = countA + countB
+        self.pattern = tuple(2 if (i + 1) * countB // total > i * countB // total else pulsesA
+                             for i in range(total))
+        self.position = 0
+
+        self.ring = TaggedSampleRing(bufferSize)
+        # 채널별 마지막 샘플 (일련번호, 타임스탬프 ns, 채널, 값)
+        self.lastSamples = {'A': None, 'B': None}
+        self.counts = {'A': 0, 'B': 0}
+        self.switchCount = 0
+        self.lastChannel = None
+
+        self.hx = None
+        self._callback = None
+
+    def nextPulses(self):
+        """다음 변환에 보낼 Gain 펄스 수. 드라이버가 읽기 잠금 안에서 호출"""
+        pulses = self.pattern[self.position]
+        self.position = (self.position + 1) % len(self.pattern)
+        return pulses
+
+    def _record(self, gainPulses, value, timestampNs):
+        """채널을 붙여 샘플을 기록하고 (일련번호, 타임스탬프 ns, 채널, 값)을 반환"""
+        channel = PULSE_CHANNELS[gainPulses]
+        seq = self.ring.append(value, timestampNs, gainPulses)
+        sample = (seq, timestampNs, channel, value)
+        self.lastSamples[channel] = sample
+        self.counts[channel] += 1
+        if self.lastChannel is not None and channel != self.lastChannel:
+            self.switchCount += 1
+        self.lastChannel = channel
+        return sample
+
+    def read(self, hx, timeout=None):
+        """스케줄대로 변환 하나를 읽어 (일련번호, 타임스탬프 ns, 채널, 값)을 반환 (폴링용)"""
+        rawBytes = hx.readRawBytes(timeout, self.nextPulses())
+        return self._record(hx.lastGainPulses, _toLong(hx, rawBytes), hx.readyWaiter.readyNs)
+
+    def attach(self, hx):
+        """hx711v0_5_1 드라이버의 수집 스레드가 스케줄대로 채널을 바꿔 읽고 샘플을 채널과 함께 기록하도록 등록.
+        드라이버의 링 (hx.latest() 등)과 한 채널만 쓰는 콜백 (무게 필터, 페달 등)은 드라이버 Gain의 변환만 받음. 콜백을 반환"""
+        if self.hx is not None:
+            raise ValueError("ChannelScheduler::attach() already attached!")
+        hx.channelSchedule = self
+
+        def record(rawBytes):
+            """수집 스레드에서 읽은 변환을 채널과 함께 기록"""
+            self._record(hx.lastGainPulses, _toLong(hx, rawBytes), hx.lastReadyNs)
+
+        hx.enableReadyCallback(record)
+        self.hx = hx
+        self._callback = record
+        return record
+
+    def detach(self):
+        """attach() 해제. 이후 일반 읽기는 필요하면 변환 하나를 버리고 드라이버 Gain으로 돌아감"""
+        if self.hx is None:
+            return
+        self.hx.disableReadyCallback(self._callback)
+        self.hx.channelSchedule = None
+        self.hx = None
+        self._callback = None
+
+    def _tagged(self, samples):
+        return [(seq, timestampNs, PULSE_CHANNELS[tag], value) for seq, timestampNs, tag, value in samples]
+
+    def latest(self, channel=None):
+        """가장 최근 샘플 (일련번호, 타임스탬프 ns, 채널, 값). channel을 주면 그 채널의 최근 샘플. 없으면 None"""
+        if channel is not None:
+            return self.lastSamples[channel]
+        sample = self.ring.latest()
+        if sample is None:
+            return None
+        return self._tagged([sample])[0]
+
+    def since(self, seq):
+        """일련번호 seq 이후에 기록된 두 채널의 샘플 목록 (읽은 순서)"""
+        return self._tagged(self.ring.since(seq))
+
+    def snapshot(self, n):
+        """두 채널을 합친 최근 n개 샘플 목록"""
+        return self._tagged(self.ring.snapshot(n))
+
+    def getStats(self):
+        """채널별 샘플 수와 채널 전환 수"""
+        return {
+            'A': self.counts['A'],
+            'B': self.counts['B'],
+            'switches': self.switchCount,
+            'pattern': ''.join(PULSE_CHANNELS[pulses] for pulses in self.pattern),
+        }
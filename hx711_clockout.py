@@ -0,0 +1,83 @@
+# 각 바이트의 비트 순서를 뒤집은 값 (bit_format 'LSB'용)
+REVERSED_BITS = bytes(int('{:08b}'.format(i)[::-1], 2) for i in range(256))
+
+
+def makeClockOut(gpio, dout, pd_sck):
+    """24비트 데이터와 Gain 펄스를 한 루프에서 읽는 함수 생성. 핀 함수는 지역 변수로 묶어 둠"""
+    # 레지스터를 직접 다루는 백엔드 등은 자체 루프를 제공함
+    if hasattr(gpio, 'makeClockOut'):
+        return gpio.makeClockOut(dout, pd_sck)
+
+    setPin = gpio.output
+    getPin = gpio.input
+
+    def clockOut(pulses):
+        """PD_SCK를 pulses번 클럭해 24비트 원시값(MSB 우선, 2의 보수)을 반환"""
+        # PD_SCK 상승 후 1us 뒤 DOUT이 바뀌므로 PD_SCK를 내린 다음 읽음
+        value = 0
+        for i in range(pulses):
+            setPin(pd_sck, True)
+            setPin(pd_sck, False)
+            value = (value << 1) | getPin(dout)
+        # 24비트 뒤의 Gain 펄스에서 읽은 비트는 버림
+        return value >> (pulses - 24)
+
+    return clockOut
+
+
+def _msbBytes(word):
+    return [word >> 16, (word >> 8) & 0xff, word & 0xff]
+
+
+def _lsbBytes(word):
+    return [word & 0xff, (word >> 8) & 0xff, word >> 16]
+
+
+def _msbBytesReversedBits(word):
+    return [REVERSED_BITS[word >> 16], REVERSED_BITS[(word >> 8) & 0xff],
+            REVERSED_BITS[word & 0xff]]
+
+
+def _lsbBytesReversedBits(word):
+    return [REVERSED_BITS[word & 0xff], REVERSED_BITS[(word >> 8) & 0xff],
+            REVERSED_BITS[word >> 16]]
+
+
+def makeBytesDecoder(byteFormat, bitFormat):
+    """읽기 형식에 맞는 24비트 값 -> 3바이트 목록 변환 함수 선택. 읽기 루프 밖에서 한 번만 적용됨"""
+    decoders = {
+        ('MSB', 'MSB'): _msbBytes,
+        ('LSB', 'MSB'): _lsbBytes,
+        ('MSB', 'LSB'): _msbBytesReversedBits,
+        ('LSB', 'LSB'): _lsbBytesReversedBits,
+    }
+    if byteFormat not in ('MSB', 'LSB'):
+        raise ValueError("Unrecognised byte_format: \"%s\"" % byteFormat)
+    if bitFormat not in ('MSB', 'LSB'):
+        raise ValueError("Unrecognised bitformat: \"%s\"" % bitFormat)
+    return decoders[(byteFormat, bitFormat)]
+
+
+def makeTimedClockOut(gpio, dout, pd_sck, sckHigh, clock):
+    """PD_SCK HIGH 구간마다 시간을 재서 가장 긴 값을 sckHigh 히스토그램에 기록하는 읽기 루프 (통계용).
+    백엔드 자체 루프 대신 핀 함수를 직접 부르므로 통계를 켠 동안만 사용"""
+    setPin = gpio.output
+    getPin = gpio.input
+    add = sckHigh.add
+
+    def clockOut(pulses):
+        """PD_SCK를 pulses번 클럭해 24비트 원시값을 반환하고 가장 긴 HIGH 구간을 기록"""
+        value = 0
+        longest = 0
+        for i in range(pulses):
+            start = clock()
+            setPin(pd_sck, True)
+            setPin(pd_sck, False)
+            high = clock() - start
+            if high > longest:
+                longest = high
+            value = (value << 1) | getPin(dout)
+        add(longest)
+        return value >> (pulses - 24)
+
+    return clockOut
@@ -1,330 +1,273 @@
+import math
 import time
 import random
-import math
-import threading
-
 
-class HX711:
-    def __init__(self, dout, pd_sck, gain=128):
-        self.PD_SCK = pd_sck
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import hx711v0_5_1
+from hx711_ready import HX711TimeoutError
+from hx711_stats import ReadStats
+from hx711_channels import PULSE_GAINS
+
+'''
+HX711 emulator with the same API as hx711v0_5_1.HX711, so every stage after
+the driver (reducers, filters, acquisition, callbacks) can be run and
+load-tested without a sensor.
+
+The emulated chip converts at 10 or 80 SPS.  Conversion n happens at
+n / dataRate seconds after construction and its value depends only on the
+seed and n: a pedal-like |sin| waveform (or any `signal` function), plus
+Gaussian noise, a linear drift and, at a configurable rate, a spike taken from
+`spikeValues`.  Values are generated a block at a time with NumPy (or the
+random module when NumPy is not installed; the two give different, but each
+reproducible, sequences), and each block has its own RNG stream, so the same
+seed gives the same samples however they are read.
+
+With paced=True readRawBytes() sleeps until the next conversion and, like the
+real chip, a late read gets the latest conversion and the ones in between are
+lost.  With paced=False every read returns the next conversion at once, so the
+pipeline runs as fast as it can while the timestamps (lastReadyNs, the ring
+buffer) still advance by one conversion period per sample.
+
+With clock=hx711_time.SimulatedClock() the paced sleeps return at once, so
+hours of sensor time run in seconds with the real conversion timing.
+
+Usage:
+    hx = HX711(5, 6, dataRate=80, seed=1, noise=500.0, spikeRate=0.01)
+    hx.setReferenceUnit(114)
+    hx.tare()
+    print(hx.getWeight())
+'''
+
+
+class ConversionClock:
+    """에뮬레이터의 변환 시각 관리. 준비 대기 전략(ReadyWaiter)과 같은 인터페이스"""
+
+    def __init__(self, dataRate, paced, clock=time):
+        self.period = 1.0 / dataRate
+        self.periodNs = int(1e9 / dataRate)
+        self.paced = paced
+        self.clock = clock
+        self.epochNs = clock.monotonic_ns()
+        # 다음에 읽을 변환 번호와 마지막으로 읽은 변환 번호
+        self.nextIndex = 0
+        self.index = -1
+        # 마지막으로 읽은 변환의 완료 시각 (epochNs 기준으로 계산된 clock.monotonic_ns 값)
+        self.readyNs = 0
+        # 늦게 읽어 놓친 변환 수
+        self.lostCount = 0
+        self.waitCount = 0
+        self.sleepTime = 0.0
 
-        self.DOUT = dout
-
-        # Last time we've been read.
-        self.lastReadTime = time.time()
-        self.sampleRateHz = 80.0
-        self.resetTimeStamp = time.time()
+    def reset(self):
+        pass
+
+    def dueIndex(self, nowNs):
+        """nowNs까지 완료된 가장 최근 변환 번호"""
+        return (nowNs - self.epochNs) // self.periodNs
+
+    def isReady(self):
+        """다음 변환이 완료되었는지 여부"""
+        if not self.paced:
+            return True
+        return self.dueIndex(self.clock.monotonic_ns()) >= self.nextIndex
+
+    def wait(self, timeout=None):
+        """다음 변환까지 잠듦 (paced가 아니면 바로 반환). timeout(초)을 넘기면 HX711TimeoutError 발생"""
+        self.waitCount += 1
+        index = self.nextIndex
+        if self.paced:
+            nowNs = self.clock.monotonic_ns()
+            due = self.dueIndex(nowNs)
+            if due >= index:
+                self.lostCount += due - index
+                index = due
+            else:
+                delay = (self.epochNs + index * self.periodNs - nowNs) / 1e9
+                if timeout is not None and delay > timeout:
+                    self.clock.sleep(timeout)
+                    self.sleepTime += timeout
+                    raise HX711TimeoutError(
+                        "HX711: DOUT not ready after %.3f s, is the sensor connected?" % timeout)
+                self.clock.sleep(delay)
+                self.sleepTime += delay
+        self.index = index
+        self.nextIndex = index + 1
+        self.readyNs = self.epochNs + index * self.periodNs
+
+
+class VirtualHX711(hx711v0_5_1.HX711):
+    """GPIO 없는 hx711v0_5_1.HX711. readyWaiter와 clockOut 함수를 받아 변환을 만들어 내는 클래스의 기반"""
+
+    def __init__(self, dout, pd_sck, gain, readyWaiter, clockOut, clock=time):
+        """readyWaiter: wait()/reset()/isReady()와 readyNs, period를 가진 대기 객체,
+        clockOut: pulses를 받아 24비트 원시값을 반환하는 함수"""
+        self._initState(dout, pd_sck, clock)
+        self.GPIO = None
+
+        # 읽은 변환 수
         self.sampleCount = 0
-        self.simulateTare = False
-
-        # Mutex for reading from the HX711, in case multiple threads in client
-        # software try to access get values from the class at the same time.
-        self.readLock = threading.Lock()
-        
-        self.GAIN = 0
-        self.REFERENCE_UNIT = 1  # The value returned by the hx711 that corresponds to your reference unit AFTER dividing by the SCALE.
-        
-        self.OFFSET = 1
-        self.lastVal = long(0)
-
-        self.DEBUG_PRINTING = False
-        
-        self.byte_format = 'MSB'
-        self.bit_format = 'MSB'
-
-        self.set_gain(gain)
-
-
 
+        self._setClockOut(clockOut)
 
-        # Think about whether this is necessary.
-        time.sleep(1)
+        # 가상 칩의 읽기는 손상되지 않으므로 검사하지 않음
+        self.readChecker = None
 
-    def convertToTwosComplement24bit(self, inputValue):
-       # HX711 has saturating logic.
-       if inputValue >= 0x7fffff:
-          return 0x7fffff
+        self.readyWaiter = readyWaiter
+        self.setGain(gain)
 
-       # If it's a positive value, just return it, masked with our max value.
-       if inputValue >= 0:
-          return inputValue & 0x7fffff
+    def powerDown(self):
+        """가상 칩에서는 다른 스레드의 읽기가 끝나기만 기다림"""
+        with self.readLock:
+            pass
 
-       if inputValue < 0:
-          # HX711 has saturating logic.
-          if inputValue < -0x800000:
-             inputValue = -0x800000
+    def powerUp(self):
+        """가상 칩에서는 다른 스레드의 읽기가 끝나기만 기다림"""
+        with self.readLock:
+            pass
 
-          diff = inputValue + 0x800000
+    def isReady(self):
+        """다음 변환이 완료되었는지 여부"""
+        return self.readyWaiter.isReady()
 
-          return 0x800000 + diff
-
-        
-    def convertFromTwosComplement24bit(self, inputValue):
-        return -(inputValue & 0x800000) + (inputValue & 0x7fffff)
-
-    
-    def is_ready(self):
-        # Calculate how long we should be waiting between samples, given the
-        # sample rate.
-        sampleDelaySeconds = 1.0 / self.sampleRateHz
-
-        return time.time() >= self.lastReadTime + sampleDelaySeconds
-
-    
-    def set_gain(self, gain):
+    def setGain(self, gain):
+        """Gain 값 설정 (128, 64, 32 지원). 다음 변환부터 적용됨"""
         if gain == 128:
             self.GAIN = 1
         elif gain == 64:
             self.GAIN = 3
         elif gain == 32:
             self.GAIN = 2
-
-        # Read out a set of raw bytes and throw it away.
-        self.readRawBytes()
-
-        
-    def get_gain(self):
-        if self.GAIN == 1:
-            return 128
-        if self.GAIN == 3:
-            return 64
-        if self.GAIN == 2:
-            return 32
-
-        # Shouldn't get here.
-        return 0
-        
-
-    def readRawBytes(self):
-        # Wait for and get the Read Lock, incase another thread is already
-        # driving the virtual HX711 serial interface.
-        self.readLock.acquire()
-
-        # Wait until HX711 is ready for us to read a sample.
-        while not self.is_ready():
-           pass
-
-        self.lastReadTime = time.time()
-
-        # Generate a 24bit 2s complement sample for the virtual HX711.
-        rawSample = self.convertToTwosComplement24bit(self.generateFakeSample())
-        
-        # Read three bytes of data from the HX711.
-        firstByte  = (rawSample >> 16) & 0xFF
-        secondByte = (rawSample >> 8)  & 0xFF
-        thirdByte  = rawSample & 0xFF
-
-        # Release the Read Lock, now that we've finished driving the virtual HX711
-        # serial interface.
-        self.readLock.release()           
-
-        # Depending on how we're configured, return an orderd list of raw byte
-        # values.
-        if self.byte_format == 'LSB':
-           return [thirdByte, secondByte, firstByte]
         else:
-           return [firstByte, secondByte, thirdByte]
-
-
-    def read_long(self):
-        # Get a sample from the HX711 in the form of raw bytes.
-        dataBytes = self.readRawBytes()
-
-
-        if self.DEBUG_PRINTING:
-            print(dataBytes,)
-        
-        # Join the raw bytes into a single 24bit 2s complement value.
-        twosComplementValue = ((dataBytes[0] << 16) |
-                               (dataBytes[1] << 8)  |
-                               dataBytes[2])
-
-        if self.DEBUG_PRINTING:
-            print("Twos: 0x%06x" % twosComplementValue)
-        
-        # Convert from 24bit twos-complement to a signed value.
-        signedIntValue = self.convertFromTwosComplement24bit(twosComplementValue)
-
-        # Record the latest sample value we've read.
-        self.lastVal = signedIntValue
-
-        # Return the sample value we've read from the HX711.
-        return int(signedIntValue)
-
-    
-    def read_average(self, times=3):
-        # Make sure we've been asked to take a rational amount of samples.
-        if times <= 0:
-            print("HX711().read_average(): times must >= 1!!  Assuming value of 1.")
-            times = 1
-
-        # If we're only average across one value, just read it and return it.
-        if times == 1:
-            return self.read_long()
-
-        # If we're averaging across a low amount of values, just take an
-        # arithmetic mean.
-        if times < 5:
-            values = int(0)
-            for i in range(times):
-                values += self.read_long()
-
-            return values / times
-
-        # If we're taking a lot of samples, we'll collect them in a list, remove
-        # the outliers, then take the mean of the remaining set.
-        valueList = []
-
-        for x in range(times):
-            valueList += [self.read_long()]
-
-        valueList.sort()
-
-        # We'll be trimming 20% of outlier samples from top and bottom of collected set.
-        trimAmount = int(len(valueList) * 0.2)
-
-        # Trim the edge case values.
-        valueList = valueList[trimAmount:-trimAmount]
-
-        # Return the mean of remaining samples.
-        return sum(valueList) / len(valueList)
-
-    
-    def get_value(self, times=3):
-        return self.read_average(times) - self.OFFSET
-
-    
-    def get_weight(self, times=3):
-        value = self.get_value(times)
-        value = value / self.REFERENCE_UNIT
-        return value
-
-    
-    def tare(self, times=15):
-        # If we aren't simulating Taring because it takes too long, just skip it.
-        if not self.simulateTare:
-            return 0
-
-        # Backup REFERENCE_UNIT value
-        reference_unit = self.REFERENCE_UNIT
-        self.set_reference_unit(1)
-
-        value = self.read_average(times)
-
-        if self.DEBUG_PRINTING:
-            print("Tare value:", value)
-        
-        self.set_offset(value)
-
-        # Restore the reference unit, now that we've got our offset.
-        self.set_reference_unit(reference_unit)
-
-        return value;
-
-    
-    def set_reading_format(self, byte_format="LSB", bit_format="MSB"):
-
-        if byte_format == "LSB":
-            self.byte_format = byte_format
-        elif byte_format == "MSB":
-            self.byte_format = byte_format
-        else:
-            print("Unrecognised byte_format: \"%s\"" % byte_format)
-
-        if bit_format == "LSB":
-            self.bit_format = bit_format
-        elif bit_format == "MSB":
-            self.bit_format = bit_format
+            return False
+        # 가상 칩은 Gain을 바로 바꾸므로 버릴 변환이 없음
+        self.chipGainPulses = self.GAIN
+        return True
+
+    def enableStats(self):
+        """단계별 시간 통계 수집 시작. 가상 칩에는 PD_SCK가 없으므로 sckHigh는 비어 있음"""
+        if self.stats is None:
+            self.stats = ReadStats()
+
+    def disableStats(self):
+        """통계 수집을 멈춤"""
+        self.stats = None
+
+
+class HX711(VirtualHX711):
+    """hx711v0_5_1.HX711과 같은 API의 에뮬레이터. GPIO 없이 시드로 재현 가능한 샘플을 생성"""
+
+    DATA_RATES = (10, 80)
+
+    # 변환 값 블록 크기
+    BLOCK_SIZE = 1024
+
+    def __init__(self, dout=5, pd_sck=6, gain=128, dataRate=80, seed=None, paced=True,
+                 offset=0, amplitude=72000.0, signalPeriod=18.0, signal=None,
+                 noise=577.0, driftPerHour=0.0,
+                 spikeRate=1.0 / 142, spikeValues=(0, 40000, 70000, 150000, 280000, 580000),
+                 clock=time):
+        """dataRate: 10 또는 80 SPS, seed: 난수 시드 (None이면 임의), paced: 실제 변환 주기에 맞춰 읽을지 여부,
+        offset/amplitude/signalPeriod: 기본 파형 offset + amplitude*|sin(2*pi*t/signalPeriod)| (카운트, 초),
+        signal: 기본 파형 대신 쓸 함수 (변환 시각 배열(초) -> 같은 길이의 카운트 값),
+        noise: 가우시안 잡음 표준편차 (카운트), driftPerHour: 시간당 드리프트 (카운트),
+        spikeRate: 변환당 스파이크 확률, spikeValues: 스파이크로 넣을 값 (카운트),
+        clock: 시계 (time 모듈 또는 hx711_time.SimulatedClock)"""
+        if dataRate not in self.DATA_RATES:
+            raise ValueError("HX711::__init__() dataRate must be 10 or 80!")
+        self.dataRate = dataRate
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.offset = offset
+        self.amplitude = amplitude
+        self.signalPeriod = signalPeriod
+        self.signal = signal
+        self.noise = noise
+        self.driftPerHour = driftPerHour
+        self.spikeRate = spikeRate
+        self.spikeValues = list(spikeValues)
+
+        # 생성된 블록에 들어간 스파이크 수
+        self.spikeCount = 0
+        self._blockIndex = None
+        self._block = None
+
+        super().__init__(dout, pd_sck, gain, ConversionClock(dataRate, paced, clock),
+                         self._emulatedClockOut, clock)
+
+    def _signalTimes(self, firstIndex, count):
+        """변환 번호 firstIndex부터 count개의 변환 시각(초)"""
+        if numpy is not None:
+            return (numpy.arange(count, dtype=numpy.float64) + firstIndex) / self.dataRate
+        return [(firstIndex + i) / self.dataRate for i in range(count)]
+
+    def _unscaledBlock(self, firstIndex, count):
+        """변환 번호 firstIndex부터 count개의 Gain 128 기준 값 (실수, 포화 전). 스파이크는 여기서 셈"""
+        times = self._signalTimes(firstIndex, count)
+        drift = self.driftPerHour / 3600.0
+        omega = 2 * math.pi / self.signalPeriod
+
+        if numpy is not None:
+            rng = numpy.random.default_rng([self.seed, firstIndex])
+            if self.signal is not None:
+                values = numpy.asarray(self.signal(times), dtype=numpy.float64)
+            else:
+                values = self.offset + self.amplitude * numpy.abs(numpy.sin(omega * times))
+            values = values + drift * times + rng.normal(0.0, self.noise, count)
+            if self.spikeRate and self.spikeValues:
+                spikes = rng.random(count) < self.spikeRate
+                spikeCount = int(spikes.sum())
+                if spikeCount:
+                    values[spikes] = rng.choice(self.spikeValues, spikeCount)
+                    self.spikeCount += spikeCount
+            return values.tolist()
+
+        rng = random.Random((self.seed << 32) ^ firstIndex)
+        if self.signal is not None:
+            values = [float(value) for value in self.signal(times)]
         else:
-            print("Unrecognised bit_format: \"%s\"" % bit_format)
-
-            
-
-    def set_offset(self, offset):
-        self.OFFSET = offset
-
-        
-    def get_offset(self):
-        return self.OFFSET
-
-    
-    def set_reference_unit(self, reference_unit):
-        # Make sure we aren't asked to use an invalid reference unit.
-        if reference_unit == 0:
-            print("HX711().set_reference_unit(): Can't use 0 as a reference unit!!")
-            return
-
-        self.REFERENCE_UNIT = reference_unit
-
-
-    def power_down(self):
-        # Wait for and get the Read Lock, incase another thread is already
-        # driving the HX711 serial interface.
-        self.readLock.acquire()
-
-        # Wait 100us for the virtual HX711 to power down.
-        time.sleep(0.0001)
-
-        # Release the Read Lock, now that we've finished driving the HX711
-        # serial interface.
-        self.readLock.release()           
-
-
-    def power_up(self):
-        # Wait for and get the Read Lock, incase another thread is already
-        # driving the HX711 serial interface.
-        self.readLock.acquire()
-
-        # Wait 100 us for the virtual HX711 to power back up.
-        time.sleep(0.0001)
-
-        # Release the Read Lock, now that we've finished driving the HX711
-        # serial interface.
-        self.readLock.release()
-
-        # HX711 will now be defaulted to Channel A with gain of 128.  If this
-        # isn't what client software has requested from us, take a sample and
-        # throw it away, so that next sample from the HX711 will be from the
-        # correct channel/gain.
-        if self.get_gain() != 128:
-            self.readRawBytes()
-
-
-    def reset(self):
-        # self.power_down()
-        # self.power_up()
-
-        # Mark time when we were reset.  We'll use this for sample generation.
-        self.resetTimeStamp = time.time()
-
-
-    def generateFakeSample(self):
-       sampleTimeStamp = time.time() - self.resetTimeStamp
-
-       noiseScale = 1.0
-       noiseValue = random.randrange(-(noiseScale * 1000),(noiseScale * 1000)) / 1000.0
-       sample     = math.sin(math.radians(sampleTimeStamp * 20)) * 72.0
-
-       self.sampleCount += 1
-
-       if sample < 0.0:
-          sample = -sample
-
-       sample += noiseValue
-
-       BIG_ERROR_SAMPLE_FREQUENCY = 142
-       ###BIG_ERROR_SAMPLE_FREQUENCY = 15
-       BIG_ERROR_SAMPLES = [0.0, 40.0, 70.0, 150.0, 280.0, 580.0]
-
-       if random.randrange(0, BIG_ERROR_SAMPLE_FREQUENCY) == 0:
-          sample = random.sample(BIG_ERROR_SAMPLES, 1)[0]
-          print("Sample %d: Injecting %f as a random bad sample." % (self.sampleCount, sample))
-
-       sample *= 1000
-
-       sample *= self.REFERENCE_UNIT
-
-       return int(sample)
-
-
-# EOF - emulated_hx711.py
+            values = [self.offset + self.amplitude * abs(math.sin(omega * t)) for t in times]
+        gauss = rng.gauss
+        noise = self.noise
+        spikeRate = self.spikeRate if self.spikeValues else 0
+        result = []
+        for i, t in enumerate(times):
+            value = values[i] + drift * t + gauss(0.0, noise)
+            if spikeRate and rng.random() < spikeRate:
+                value = rng.choice(self.spikeValues)
+                self.spikeCount += 1
+            result.append(value)
+        return result
+
+    @staticmethod
+    def _scaled(value, gain):
+        """Gain 128 기준 값을 gain으로 변환한 부호있는 24비트 값 (포화)"""
+        value = round(value * gain / 128.0)
+        return min(max(value, -0x800000), 0x7fffff)
+
+    def generateBlock(self, firstIndex, count, gain=128):
+        """변환 번호 firstIndex부터 count개의 부호있는 24비트 값 목록.
+        같은 블록 안의 값은 (seed, firstIndex)만으로 정해지고 Gain은 비율로만 적용됨"""
+        scaled = self._scaled
+        return [scaled(value, gain) for value in self._unscaledBlock(firstIndex, count)]
+
+    def valueAt(self, index, gain=128):
+        """변환 번호 index의 부호있는 24비트 값. Gain 적용 전 값을 블록 단위로 생성해 보관하므로
+        채널을 바꿔 가며 읽어도 블록은 (스파이크 수도) 한 번만 만들어짐"""
+        blockSize = self.BLOCK_SIZE
+        blockIndex = index // blockSize
+        if blockIndex != self._blockIndex:
+            self._block = self._unscaledBlock(blockIndex * blockSize, blockSize)
+            self._blockIndex = blockIndex
+        return self._scaled(self._block[index - blockIndex * blockSize], gain)
+
+    def _emulatedClockOut(self, pulses):
+        """readyWaiter가 고른 변환을 그 변환의 Gain (앞선 읽기의 Gain 펄스)으로 읽은 24비트 원시값.
+        채널 B는 같은 신호를 Gain 32로 변환한 값"""
+        self.sampleCount += 1
+        return self.valueAt(self.readyWaiter.index, PULSE_GAINS[self.chipGainPulses]) & 0xffffff
+
+
+# EOF - hx711_emulator.py
@@ -0,0 +1,248 @@
+import math
+from bisect import bisect_left, insort
+
+'''
+Streaming filters for the weight output, O(1) time and memory per sample
+(HampelFilter: O(log w) comparisons, O(w) list maintenance per sample over a
+window of w samples).
+
+Every filter has update(value), which takes one new reading and returns the
+current estimate, plus reset().  They can be stacked with FilterChain, and
+hx711v0_5_1.HX711 applies one to every conversion through setWeightFilter().
+HampelFilter is an outlier-rejection stage meant to sit first in a chain, so
+single-conversion reads stay robust against spikes without median-of-N
+oversampling.
+'''
+
+
+class EmaFilter:
+    """지수 이동 평균. alpha가 클수록 새 샘플을 빨리 따라감"""
+
+    def __init__(self, alpha=0.2):
+        if not 0 < alpha <= 1:
+            raise ValueError("EmaFilter() alpha must be in (0, 1]!")
+        self.alpha = alpha
+        self.value = None
+
+    @classmethod
+    def fromTimeConstant(cls, timeConstant, dataRate):
+        """시정수(초)와 초당 변환 수로 alpha 계산"""
+        return cls(1.0 - math.exp(-1.0 / (timeConstant * dataRate)))
+
+    def reset(self):
+        self.value = None
+
+    def update(self, value):
+        """샘플 하나로 평균 갱신 후 반환"""
+        if self.value is None:
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+
+class RunningStats:
+    """Welford 방식의 누적 평균과 분산. update()는 평균을 반환"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value):
+        """샘플 하나로 평균과 분산 갱신 후 평균 반환"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        return self.mean
+
+    @property
+    def value(self):
+        return self.mean if self.count else None
+
+    @property
+    def variance(self):
+        """표본 분산 (샘플이 2개 미만이면 0)"""
+        if self.count < 2:
+            return 0.0
+        return self._m2 / (self.count - 1)
+
+    @property
+    def stddev(self):
+        return math.sqrt(self.variance)
+
+
+class KalmanFilter:
+    """상수 모델 1차원 칼만 필터. processNoise: 샘플당 실제 값 변화의 분산, measurementNoise: 측정 잡음 분산"""
+
+    def __init__(self, processNoise=1e-4, measurementNoise=1e-2, initialError=1.0):
+        if processNoise < 0 or measurementNoise <= 0:
+            raise ValueError("KalmanFilter() noise variances must be positive!")
+        self.processNoise = processNoise
+        self.measurementNoise = measurementNoise
+        self.initialError = initialError
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self.error = self.initialError
+        self.gain = 0.0
+
+    def update(self, value):
+        """측정값 하나로 추정치 갱신 후 반환"""
+        if self.value is None:
+            self.value = value
+            self.error = self.measurementNoise
+            return self.value
+        # 예측: 값은 그대로, 불확실성만 증가
+        error = self.error + self.processNoise
+        # 보정
+        gain = error / (error + self.measurementNoise)
+        self.value += gain * (value - self.value)
+        self.error = (1.0 - gain) * error
+        self.gain = gain
+        return self.value
+
+
+class FilterChain:
+    """여러 필터를 차례로 적용 (예: 이상치 제거 후 칼만 필터)"""
+
+    def __init__(self, filters):
+        self.filters = list(filters)
+        self.value = None
+
+    def reset(self):
+        self.value = None
+        for weightFilter in self.filters:
+            weightFilter.reset()
+
+    def update(self, value):
+        """샘플 하나를 모든 필터에 통과시킨 결과 반환. 중간 필터가 None을 돌려주면 거기서 멈춤"""
+        for weightFilter in self.filters:
+            value = weightFilter.update(value)
+            if value is None:
+                return self.value
+        self.value = value
+        return value
+
+
+class HampelFilter:
+    """슬라이딩 창의 중앙값과 MAD로 튀는 샘플을 걸러내는 필터. 걸러낸 샘플은 창의 중앙값으로 바꾸거나 버림"""
+
+    # MAD를 정규분포 표준편차로 바꾸는 계수
+    MAD_SCALE = 1.4826
+
+    def __init__(self, window=15, threshold=3.0, minDeviation=0.0, replace=True):
+        """window: 창 크기, threshold: 중앙값에서 몇 시그마 벗어나면 걸러낼지,
+        minDeviation: 잡음이 거의 없을 때(MAD가 0) 작은 변화까지 걸러내지 않도록 하는 최소 허용 편차,
+        replace: True면 걸러낸 샘플 대신 중앙값을, False면 None을 반환 (FilterChain이 거기서 멈춤)"""
+        if window < 3:
+            raise ValueError("HampelFilter() window must be at least 3!")
+        self.window = window
+        self.threshold = threshold
+        self.minDeviation = minDeviation
+        self.replace = replace
+        self.reset()
+
+    def reset(self):
+        self.value = None
+        self._ring = [0] * self.window
+        self._index = 0
+        self._sorted = []
+        self.acceptedCount = 0
+        self.rejectedCount = 0
+        self.lastRejected = False
+
+    @property
+    def rejectionRate(self):
+        """지금까지 걸러낸 샘플의 비율"""
+        total = self.acceptedCount + self.rejectedCount
+        return self.rejectedCount / total if total else 0.0
+
+    def getStats(self):
+        """통과/걸러낸 샘플 수와 비율"""
+        return {
+            'accepted': self.acceptedCount,
+            'rejected': self.rejectedCount,
+            'rejectionRate': self.rejectionRate,
+        }
+
+    def median(self):
+        """현재 창의 중앙값. 비어 있으면 None"""
+        values = self._sorted
+        count = len(values)
+        if count == 0:
+            return None
+        middle = count // 2
+        if count & 1:
+            return values[middle]
+        return (values[middle - 1] + values[middle]) / 2.0
+
+    def mad(self, median):
+        """현재 창의 중앙값 절대 편차 (median absolute deviation)"""
+        values = self._sorted
+        count = len(values)
+        middle = count // 2
+        if count & 1:
+            return self._kthDeviation(middle, median)
+        return (self._kthDeviation(middle - 1, median) + self._kthDeviation(middle, median)) / 2.0
+
+    def _kthDeviation(self, k, median):
+        """|x - median|의 k번째(0부터) 작은 값. 중앙값 아래/위 편차는 각각 이미 정렬된 두 배열이므로
+        두 배열의 k번째 원소 선택을 이분 탐색으로 O(log w)에 구함 (정렬된 창을 유지하는 insort/del은 샘플마다 O(w))"""
+        values = self._sorted
+        split = bisect_left(values, median)
+        # below[t] = median - values[split-1-t], above[t] = values[split+t] - median, 둘 다 오름차순
+        belowCount = split
+        aboveCount = len(values) - split
+
+        low = max(0, k + 1 - aboveCount)
+        high = min(k + 1, belowCount)
+        while low < high:
+            taken = (low + high) // 2
+            fromAbove = k + 1 - taken
+            if fromAbove > 0 and values[split + fromAbove - 1] - median > median - values[split - 1 - taken]:
+                low = taken + 1
+            else:
+                high = taken
+        fromAbove = k + 1 - low
+        result = None
+        if low > 0:
+            result = median - values[split - low]
+        if fromAbove > 0:
+            deviation = values[split + fromAbove - 1] - median
+            if result is None or deviation > result:
+                result = deviation
+        return result
+
+    def update(self, value):
+        """샘플 하나를 검사해 통과하면 그대로, 걸러내면 중앙값(또는 None)을 반환"""
+        sortedValues = self._sorted
+        rejected = False
+        median = None
+        if len(sortedValues) >= 3:
+            median = self.median()
+            limit = max(self.threshold * self.MAD_SCALE * self.mad(median), self.minDeviation)
+            rejected = abs(value - median) > limit
+
+        # 계단형 변화가 창의 절반을 넘으면 통과하도록 걸러낸 샘플도 창에는 넣음
+        if len(sortedValues) == self.window:
+            del sortedValues[bisect_left(sortedValues, self._ring[self._index])]
+        insort(sortedValues, value)
+        self._ring[self._index] = value
+        self._index = (self._index + 1) % self.window
+
+        self.lastRejected = rejected
+        if rejected:
+            self.rejectedCount += 1
+            if not self.replace:
+                return None
+            self.value = median
+            return median
+        self.acceptedCount += 1
+        self.value = value
+        return value
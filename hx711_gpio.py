@@ -0,0 +1,337 @@
+import time
+import threading
+
+
+def loadDefaultGPIO():
+    """기본 GPIO 백엔드(RPi.GPIO)를 불러옴. 라즈베리파이가 아닌 곳에서는 ImportError 발생"""
+    import RPi.GPIO as GPIO
+    return GPIO
+
+
+class FakeHX711:
+    """HX711 칩 동작을 흉내내는 모델. DOUT/PD_SCK 타이밍과 Gain 펄스를 따라감"""
+
+    # PD_SCK가 60us 이상 HIGH로 유지되면 HX711은 절전 모드로 들어감
+    POWER_DOWN_NS = 60000
+
+    # 마지막 PD_SCK 하강 이후 다음 변환을 준비 상태로 만들기까지의 최소 간격
+    READY_HOLDOFF_NS = 5000
+
+    # 읽기 도중 클럭이 이 시간 이상 멈추면 다음 변환이 덮어씀
+    STALE_READOUT_NS = 50000000
+
+    def __init__(self, value=0, dataRate=10.0, source=None):
+        """value: 출력할 부호있는 24비트 값, dataRate: 초당 변환 수 (None이면 즉시 준비)"""
+        self.value = value
+        self.dataRate = dataRate
+        self.source = source
+
+        # 전원 인가 직후에는 채널 A, Gain 128
+        self.gainPulses = 1
+        self.sampleCount = 0
+        self.powerDownCount = 0
+
+        now = time.perf_counter_ns()
+        self._sckHigh = False
+        self._sckHighSince = now
+        self._lastFallNs = now
+        self._poweredDown = False
+        self._bitIndex = 0
+        self._extraPulses = 0
+        self._word = 0
+        self._epochNs = now
+        self._readyAtNs = now + self.periodNs()
+
+    def periodNs(self):
+        """변환 주기(ns). dataRate가 None이면 0"""
+        if not self.dataRate:
+            return 0
+        return int(1e9 / self.dataRate)
+
+    def setValue(self, value):
+        """다음 변환부터 출력할 값 설정"""
+        self.value = value
+
+    def getGain(self):
+        """다음 변환에 적용될 Gain 값"""
+        return {1: 128, 2: 32, 3: 64}[self.gainPulses]
+
+    def nextSample(self):
+        """현재 Gain 설정으로 변환될 부호있는 값을 생성"""
+        if self.source is not None:
+            value = self.source(self.getGain())
+        else:
+            value = self.value
+
+        # HX711은 포화(saturating) 출력을 가짐
+        if value > 0x7fffff:
+            value = 0x7fffff
+        elif value < -0x800000:
+            value = -0x800000
+        return value & 0xffffff
+
+    def _nextReadyAfterReadout(self):
+        """마지막 읽기가 끝난 뒤 첫 번째 변환 완료 시각"""
+        readyNs = self._lastFallNs + self.READY_HOLDOFF_NS
+        period = self.periodNs()
+        if period:
+            # 변환 클럭은 읽기와 무관하게 일정한 주기로 돌아감
+            elapsed = readyNs - self._epochNs
+            readyNs = self._epochNs + (elapsed // period + 1) * period
+        return readyNs
+
+    def _finishReadout(self):
+        """24비트와 Gain 펄스가 끝난 뒤 다음 변환을 준비"""
+        self.gainPulses = min(max(self._extraPulses, 1), 3)
+        self._bitIndex = 0
+        self._extraPulses = 0
+        self.sampleCount += 1
+        self._readyAtNs = self._nextReadyAfterReadout()
+
+    def _powerDown(self):
+        """절전 모드 진입. 진행 중이던 읽기는 버려짐"""
+        self._poweredDown = True
+        self._bitIndex = 0
+        self._extraPulses = 0
+        self.powerDownCount += 1
+
+    def _powerUp(self, nowNs):
+        """절전 모드 해제. 채널 A, Gain 128로 초기화되고 안정화 시간 후 준비"""
+        self._poweredDown = False
+        self.gainPulses = 1
+        self._epochNs = nowNs
+        # 데이터시트: 출력 안정화 시간은 변환 4회 분량
+        self._readyAtNs = nowNs + max(4 * self.periodNs(), self.READY_HOLDOFF_NS)
+
+    def nextReadyNs(self):
+        """다음 변환이 준비될 (이미 지났으면 준비된) 시각 (perf_counter ns). 절전 중이거나 데이터 비트를 읽는 중이면 None"""
+        if self._poweredDown:
+            return None
+        if self._bitIndex >= 24:
+            return self._nextReadyAfterReadout()
+        if self._bitIndex > 0:
+            return None
+        return self._readyAtNs
+
+    def isReadyAt(self, nowNs):
+        """nowNs 시점에 DOUT이 LOW(데이터 준비)인지 여부"""
+        if self._poweredDown or self._sckHigh:
+            return False
+        if self._bitIndex >= 24:
+            # 다음 변환이 끝나기 전까지는 Gain 펄스가 더 올 수 있음 (펄스 사이의 짧은 멈춤으로 Gain이 바뀌지 않게)
+            if nowNs < self._nextReadyAfterReadout():
+                return False
+            self._finishReadout()
+        if self._bitIndex == 0:
+            return nowNs >= self._readyAtNs
+        return False
+
+    def sck(self, level, nowNs):
+        """PD_SCK 핀 변화 처리"""
+        if level:
+            if self._sckHigh:
+                return
+            ready = self.isReadyAt(nowNs)
+            self._sckHigh = True
+            self._sckHighSince = nowNs
+            if self._poweredDown:
+                return
+            if self._bitIndex == 0:
+                if not ready:
+                    # 준비되지 않은 상태의 클럭은 무시됨
+                    return
+                self._word = self.nextSample()
+            if self._bitIndex < 24:
+                self._bitIndex += 1
+            else:
+                self._extraPulses += 1
+        else:
+            if not self._sckHigh:
+                return
+            self._sckHigh = False
+            if nowNs - self._sckHighSince > self.POWER_DOWN_NS:
+                if not self._poweredDown:
+                    self._powerDown()
+                self._lastFallNs = nowNs
+                self._powerUp(nowNs)
+                return
+            self._lastFallNs = nowNs
+            if self._poweredDown:
+                self._powerUp(nowNs)
+
+    def dout(self, nowNs):
+        """DOUT 핀 레벨"""
+        if self._sckHigh and nowNs - self._sckHighSince > self.POWER_DOWN_NS:
+            return 1
+        if self._poweredDown:
+            return 1
+        if self._bitIndex > 0 and nowNs - max(self._lastFallNs, self._sckHighSince) > self.STALE_READOUT_NS:
+            self._finishReadout()
+        if 0 < self._bitIndex < 24 or (self._bitIndex == 24 and self._extraPulses == 0):
+            return (self._word >> (24 - self._bitIndex)) & 1
+        return 0 if self.isReadyAt(nowNs) else 1
+
+
+class FakeGPIO:
+    """RPi.GPIO와 같은 인터페이스를 가진 순수 파이썬 GPIO 백엔드. 핀 호출 수와 시간을 기록함"""
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+
+    def __init__(self, recordEvents=False):
+        self.recordEvents = recordEvents
+        self.mode = None
+        self._levels = {}
+        self._directions = {}
+        self._doutChips = {}
+        self._sckChips = {}
+        self._watchers = {}
+        self._detected = {}
+        self.resetCounters()
+
+    def attach(self, chip, dout, pd_sck):
+        """가짜 HX711 칩을 DOUT/PD_SCK 핀에 연결. 여러 칩이 PD_SCK를 공유할 수 있음"""
+        self._doutChips[dout] = chip
+        self._sckChips.setdefault(pd_sck, []).append(chip)
+        return chip
+
+    def resetCounters(self):
+        """핀 호출 카운터와 기록된 이벤트 초기화"""
+        self.outputCount = 0
+        self.inputCount = 0
+        self.callTimeNs = 0
+        self.events = []
+
+    def getStats(self):
+        """핀 호출 통계 반환"""
+        calls = self.outputCount + self.inputCount
+        return {
+            'output': self.outputCount,
+            'input': self.inputCount,
+            'calls': calls,
+            'callTimeNs': self.callTimeNs,
+            'meanCallNs': self.callTimeNs / calls if calls else 0.0,
+        }
+
+    def setmode(self, mode):
+        self.mode = mode
+
+    def getmode(self):
+        return self.mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, channel, direction, pull_up_down=None, initial=None):
+        self._directions[channel] = direction
+        if initial is not None:
+            self.output(channel, initial)
+
+    def output(self, channel, value):
+        startNs = time.perf_counter_ns()
+        level = 1 if value else 0
+        self._levels[channel] = level
+        chips = self._sckChips.get(channel)
+        if chips is not None:
+            for chip in chips:
+                chip.sck(level, startNs)
+        self.outputCount += 1
+        endNs = time.perf_counter_ns()
+        self.callTimeNs += endNs - startNs
+        if self.recordEvents:
+            self.events.append((startNs, 'output', channel, level))
+
+    def input(self, channel):
+        startNs = time.perf_counter_ns()
+        chip = self._doutChips.get(channel)
+        if chip is not None:
+            level = chip.dout(startNs)
+        else:
+            # 연결되지 않은 입력 핀은 풀업된 것처럼 HIGH로 읽힘
+            level = self._levels.get(channel, 1)
+        self.inputCount += 1
+        endNs = time.perf_counter_ns()
+        self.callTimeNs += endNs - startNs
+        if self.recordEvents:
+            self.events.append((startNs, 'input', channel, level))
+        return level
+
+    def readLevels(self, bank=0):
+        """한 뱅크(32핀)의 입력 레벨을 한 번의 호출로 반환 (GpioMemGPIO.readLevels와 같음)"""
+        startNs = time.perf_counter_ns()
+        word = 0
+        for pin, chip in self._doutChips.items():
+            if pin >> 5 == bank and chip.dout(startNs):
+                word |= 1 << (pin & 31)
+        self.inputCount += 1
+        endNs = time.perf_counter_ns()
+        self.callTimeNs += endNs - startNs
+        if self.recordEvents:
+            self.events.append((startNs, 'input', None, word))
+        return word
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None):
+        if channel in self._watchers:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        stopEvent = threading.Event()
+        callbacks = [callback] if callback is not None else []
+        thread = threading.Thread(target=self._watch,
+                                  args=(channel, stopEvent, callbacks),
+                                  daemon=True)
+        self._watchers[channel] = (thread, stopEvent, callbacks)
+        thread.start()
+
+    def add_event_callback(self, channel, callback):
+        self._watchers[channel][2].append(callback)
+
+    def remove_event_detect(self, channel):
+        watcher = self._watchers.pop(channel, None)
+        if watcher is not None:
+            watcher[1].set()
+            if watcher[0] is not threading.current_thread():
+                watcher[0].join()
+
+    def event_detected(self, channel):
+        return self._detected.pop(channel, False)
+
+    def _watch(self, channel, stopEvent, callbacks):
+        """DOUT 하강 에지를 감시해 콜백 호출. 칩 모델의 준비 시각까지 잠들었다가 확인"""
+        chip = self._doutChips.get(channel)
+        lastLevel = 1
+        while not stopEvent.is_set():
+            if chip is not None and not chip._sckHigh and chip._bitIndex == 0:
+                waitNs = chip._readyAtNs - time.perf_counter_ns()
+                if waitNs > 0:
+                    stopEvent.wait(waitNs / 1e9)
+                    continue
+            if chip is not None:
+                level = 0 if chip.isReadyAt(time.perf_counter_ns()) else 1
+            else:
+                level = self._levels.get(channel, 1)
+            if lastLevel == 1 and level == 0:
+                self._detected[channel] = True
+                for callback in list(callbacks):
+                    callback(channel)
+            lastLevel = level
+            stopEvent.wait(0.0002)
+
+    def cleanup(self, channel=None):
+        channels = list(self._watchers) if channel is None else [channel]
+        for pin in channels:
+            self.remove_event_detect(pin)
+        if channel is None:
+            self._levels.clear()
+            self._directions.clear()
+        else:
+            self._levels.pop(channel, None)
+            self._directions.pop(channel, None)
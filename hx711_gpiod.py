@@ -0,0 +1,425 @@
+import time
+import enum
+import threading
+from collections import deque
+from types import SimpleNamespace
+
+from hx711_ready import ReadyWaiter, HX711TimeoutError
+
+'''
+GPIO character-device backend (libgpiod v2 Python bindings).
+
+Every line is requested once in setup() and the request is kept for the life
+of the backend, so a PD_SCK toggle is a single set_value() ioctl with no
+open/close.  DOUT can be requested with falling-edge detection, in which case
+the kernel queues one event per DRDY falling edge stamped with
+CLOCK_MONOTONIC, the same clock as time.monotonic_ns().
+
+DOUT also shifts the data bits out during a readout, so every readout queues
+falling edges of its own.  Those are discarded by timestamp after each readout
+and counted in filteredEvents; only gaps in the kernel's line sequence numbers
+count as droppedEvents.
+'''
+
+
+def loadGpiod():
+    """libgpiod 파이썬 바인딩을 불러옴"""
+    import gpiod
+    return gpiod
+
+
+class GpiodGPIO:
+    """GPIO 캐릭터 디바이스 백엔드. RPi.GPIO와 같은 인터페이스에 커널 타임스탬프 에지 이벤트를 더함"""
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+
+    def __init__(self, chip='/dev/gpiochip0', consumer='hx711', gpiod=None):
+        """chip: GPIO 칩 디바이스 경로 (라즈베리파이에서는 라인 번호가 BCM 번호와 같음)
+        gpiod: libgpiod 모듈 또는 FakeGpiod 같은 대역. None이면 libgpiod를 불러옴"""
+        if gpiod is None:
+            gpiod = loadGpiod()
+        self.gpiod = gpiod
+        self.chip = chip
+        self.consumer = consumer
+        self.mode = None
+
+        line = gpiod.line
+        self._active = line.Value.ACTIVE
+        self._inactive = line.Value.INACTIVE
+        self._requests = {}
+        self._directions = {}
+        self._watchers = {}
+
+        # 에지 이벤트 통계
+        self.lastEdgeNs = {}
+        self.edgeCount = 0
+        self.droppedEvents = 0
+        self.filteredEvents = 0
+        self._lastSeqno = {}
+
+    def _lineSettings(self, direction, edge=False, initial=None):
+        line = self.gpiod.line
+        if direction == self.OUT:
+            value = self._active if initial else self._inactive
+            return self.gpiod.LineSettings(direction=line.Direction.OUTPUT,
+                                           output_value=value)
+        if edge:
+            return self.gpiod.LineSettings(direction=line.Direction.INPUT,
+                                           edge_detection=line.Edge.FALLING,
+                                           event_clock=line.Clock.MONOTONIC)
+        return self.gpiod.LineSettings(direction=line.Direction.INPUT)
+
+    def setmode(self, mode):
+        if mode != self.BCM:
+            raise ValueError("GpiodGPIO only supports BCM (line offset) numbering")
+        self.mode = mode
+
+    def getmode(self):
+        return self.mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, channel, direction, pull_up_down=None, initial=None):
+        settings = self._lineSettings(direction, initial=initial)
+        request = self._requests.get(channel)
+        if request is None:
+            self._requests[channel] = self.gpiod.request_lines(
+                self.chip, consumer=self.consumer, config={channel: settings})
+        else:
+            request.reconfigure_lines({channel: settings})
+        self._directions[channel] = direction
+
+    def output(self, channel, value):
+        self._requests[channel].set_value(channel, self._active if value else self._inactive)
+
+    def input(self, channel):
+        return 1 if self._requests[channel].get_value(channel) == self._active else 0
+
+    def makeClockOut(self, dout, pd_sck):
+        """보관 중인 라인 요청으로 24+N 비트를 읽는 루프 생성 (hx711_clockout.makeClockOut에서 사용)"""
+        setValue = self._requests[pd_sck].set_value
+        getValue = self._requests[dout].get_value
+        active = self._active
+        inactive = self._inactive
+
+        def clockOut(pulses):
+            """PD_SCK를 pulses번 클럭해 24비트 원시값(MSB 우선, 2의 보수)을 반환"""
+            value = 0
+            for i in range(pulses):
+                setValue(pd_sck, active)
+                setValue(pd_sck, inactive)
+                value = (value << 1) | (getValue(dout) == active)
+            return value >> (pulses - 24)
+
+        return clockOut
+
+    def makeReadyWaiter(self, dout, isReady):
+        """DOUT 하강 에지 이벤트를 기다리는 대기 전략 생성 (hx711_ready.makeReadyWaiter에서 사용)"""
+        self.enableEdgeEvents(dout)
+        return EdgeWaiter(self, dout, isReady)
+
+    def enableEdgeEvents(self, channel):
+        """DOUT 라인을 하강 에지 이벤트 라인으로 다시 설정"""
+        self._requests[channel].reconfigure_lines(
+            {channel: self._lineSettings(self.IN, edge=True)})
+
+    def readEdgeEvents(self, channel, timeout=0.0, afterNs=None):
+        """대기 중인 하강 에지 타임스탬프(ns) 목록. afterNs 이전 에지는 읽기 도중 생긴 것으로 보고 버림"""
+        request = self._requests[channel]
+        if not request.wait_edge_events(timeout):
+            return []
+        timestamps = []
+        for event in request.read_edge_events():
+            last = self._lastSeqno.get(channel)
+            if last is not None and event.line_seqno > last + 1:
+                self.droppedEvents += event.line_seqno - last - 1
+            self._lastSeqno[channel] = event.line_seqno
+            if afterNs is not None and event.timestamp_ns <= afterNs:
+                self.filteredEvents += 1
+                continue
+            timestamps.append(event.timestamp_ns)
+        if timestamps:
+            self.edgeCount += len(timestamps)
+            self.lastEdgeNs[channel] = timestamps[-1]
+        return timestamps
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None):
+        if channel in self._watchers:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        self.enableEdgeEvents(channel)
+        stopEvent = threading.Event()
+        callbacks = [callback] if callback is not None else []
+        thread = threading.Thread(target=self._watch,
+                                  args=(channel, stopEvent, callbacks),
+                                  daemon=True)
+        self._watchers[channel] = (thread, stopEvent, callbacks)
+        thread.start()
+
+    def add_event_callback(self, channel, callback):
+        self._watchers[channel][2].append(callback)
+
+    def remove_event_detect(self, channel):
+        watcher = self._watchers.pop(channel, None)
+        if watcher is not None:
+            watcher[1].set()
+            if watcher[0] is not threading.current_thread():
+                watcher[0].join()
+
+    def _watch(self, channel, stopEvent, callbacks):
+        """커널 에지 이벤트마다 콜백 호출. 콜백(읽기) 도중 생긴 에지는 버림"""
+        afterNs = None
+        while not stopEvent.is_set():
+            if not self.readEdgeEvents(channel, 0.1, afterNs):
+                continue
+            for callback in list(callbacks):
+                callback(channel)
+            afterNs = time.monotonic_ns()
+
+    def cleanup(self, channel=None):
+        channels = list(self._requests) if channel is None else [channel]
+        for pin in channels:
+            self.remove_event_detect(pin)
+            request = self._requests.pop(pin, None)
+            if request is not None:
+                request.release()
+            self._directions.pop(pin, None)
+
+
+class EdgeWaiter(ReadyWaiter):
+    """커널 DOUT 하강 에지 이벤트로 준비를 기다리는 대기 전략. 대기 중 CPU를 쓰지 않고 커널 타임스탬프를 남김"""
+
+    def __init__(self, gpio, dout, isReady):
+        super().__init__(isReady)
+        self.gpio = gpio
+        self.dout = dout
+
+    def wait(self, timeout=None):
+        """DOUT 하강 에지 이벤트를 기다림. timeout(초)을 넘기면 HX711TimeoutError 발생"""
+        gpio = self.gpio
+        self.waitCount += 1
+
+        # 직전 읽기 도중 데이터 비트가 만든 에지와 지난 에지는 버림
+        gpio.readEdgeEvents(self.dout, 0.0, time.monotonic_ns())
+
+        if self.isReady():
+            self._lastReadAtEdge = False
+            self.readyNs = time.monotonic_ns()
+            return
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise HX711TimeoutError(
+                        "HX711: no DOUT falling edge after %.3f s, is the sensor connected?" % timeout)
+            edges = gpio.readEdgeEvents(self.dout, remaining)
+            if edges and self.isReady():
+                break
+
+        self.readyNs = edges[-1]
+        self._learnEdge(self.readyNs / 1e9)
+
+
+class FakeGpiod:
+    """libgpiod 모듈 대역. 가짜 HX711 칩을 라인에 연결하고 에지 이벤트를 예정대로 내보냄"""
+
+    class Direction(enum.Enum):
+        AS_IS = 1
+        INPUT = 2
+        OUTPUT = 3
+
+    class Value(enum.Enum):
+        INACTIVE = 0
+        ACTIVE = 1
+
+    class Edge(enum.Enum):
+        NONE = 1
+        RISING = 2
+        FALLING = 3
+        BOTH = 4
+
+    class Clock(enum.Enum):
+        MONOTONIC = 1
+        REALTIME = 2
+        HTE = 3
+
+    class EdgeEventType(enum.Enum):
+        RISING_EDGE = 1
+        FALLING_EDGE = 2
+
+    def __init__(self, eventBufferSize=16):
+        """eventBufferSize: 라인 요청당 커널 이벤트 버퍼 크기. 넘치면 가장 오래된 이벤트가 버려짐"""
+        self.line = SimpleNamespace(Direction=self.Direction, Value=self.Value,
+                                    Edge=self.Edge, Clock=self.Clock)
+        self.eventBufferSize = eventBufferSize
+        self.requests = []
+        self.setValueCount = 0
+        self.getValueCount = 0
+        self._doutChips = {}
+        self._sckChips = {}
+        self._edgeRequests = {}
+        self._levels = {}
+        self._lineSeqno = {}
+        self._lock = threading.Condition()
+        self._scriptThreads = []
+        # FakeHX711은 perf_counter_ns, 커널 이벤트는 monotonic 시계를 씀
+        self._clockOffsetNs = time.monotonic_ns() - time.perf_counter_ns()
+
+    def LineSettings(self, direction=None, edge_detection=None, event_clock=None,
+                     output_value=None, **kwargs):
+        return SimpleNamespace(direction=direction or self.Direction.AS_IS,
+                               edge_detection=edge_detection or self.Edge.NONE,
+                               event_clock=event_clock or self.Clock.MONOTONIC,
+                               output_value=output_value or self.Value.INACTIVE)
+
+    def attach(self, chip, dout, pd_sck):
+        """가짜 HX711 칩(hx711_gpio.FakeHX711)을 DOUT/PD_SCK 라인에 연결"""
+        self._doutChips[dout] = chip
+        self._sckChips.setdefault(pd_sck, []).append(chip)
+        return chip
+
+    def request_lines(self, path, consumer=None, config=None, output_values=None):
+        request = FakeLineRequest(self, config)
+        self.requests.append(request)
+        return request
+
+    def _level(self, offset):
+        chip = self._doutChips.get(offset)
+        if chip is not None:
+            return chip.dout(time.perf_counter_ns())
+        return self._levels.get(offset, 1)
+
+    def _setLevel(self, offset, level):
+        self.setValueCount += 1
+        self._levels[offset] = level
+        chips = self._sckChips.get(offset)
+        if chips is None:
+            return
+        nowNs = time.perf_counter_ns()
+        for chip in chips:
+            chip.sck(level, nowNs)
+        # 클럭에 따라 DOUT으로 나오는 데이터 비트도 에지를 만듦
+        for dout, chip in self._doutChips.items():
+            if chip in chips and dout in self._edgeRequests:
+                self._track(dout, chip.dout(nowNs), nowNs + self._clockOffsetNs)
+
+    def _track(self, offset, level, timestampNs):
+        """라인 레벨 변화를 추적해 하강 에지면 이벤트 생성"""
+        previous = self._edgeRequests[offset][1]
+        self._edgeRequests[offset][1] = level
+        if previous == 1 and level == 0:
+            self.emitEdge(offset, timestampNs)
+
+    def emitEdge(self, offset, timestampNs=None, dropped=0):
+        """offset 라인에 하강 에지 이벤트를 하나 내보냄. dropped만큼 일련번호를 건너뛰어 유실을 흉내냄"""
+        if timestampNs is None:
+            timestampNs = time.monotonic_ns()
+        with self._lock:
+            seqno = self._lineSeqno.get(offset, 0) + 1 + dropped
+            self._lineSeqno[offset] = seqno
+            entry = self._edgeRequests.get(offset)
+            if entry is None:
+                return
+            queue = entry[0].events
+            if len(queue) >= self.eventBufferSize:
+                queue.popleft()
+            queue.append(SimpleNamespace(event_type=self.EdgeEventType.FALLING_EDGE,
+                                         timestamp_ns=timestampNs, line_offset=offset,
+                                         global_seqno=seqno, line_seqno=seqno))
+            self._lock.notify_all()
+
+    def playScript(self, offset, timestampsNs):
+        """지정된 monotonic 시각마다 하강 에지를 내보내는 스레드 시작"""
+        def play():
+            for timestampNs in timestampsNs:
+                delayNs = timestampNs - time.monotonic_ns()
+                if delayNs > 0:
+                    time.sleep(delayNs / 1e9)
+                self.emitEdge(offset, timestampNs)
+
+        thread = threading.Thread(target=play, daemon=True)
+        self._scriptThreads.append(thread)
+        thread.start()
+        return thread
+
+    def _enableEdges(self, request, offset):
+        self._edgeRequests[offset] = [request, self._level(offset)]
+        chip = self._doutChips.get(offset)
+        if chip is not None and request.drdyThread is None:
+            request.drdyThread = threading.Thread(target=self._drdy, args=(request, offset, chip),
+                                                  daemon=True)
+            request.drdyThread.start()
+
+    def _drdy(self, request, offset, chip):
+        """연결된 칩의 변환 완료 시각에 DRDY 하강 에지를 내보냄"""
+        while not request.released:
+            readyNs = chip.nextReadyNs()
+            if readyNs is not None:
+                waitNs = readyNs - time.perf_counter_ns()
+                if waitNs > 0:
+                    time.sleep(min(waitNs / 1e9, 0.1))
+                    continue
+                # 준비 확인이 끝난 읽기를 마무리하므로 에지 시각은 그 뒤의 준비 시각
+                if chip.isReadyAt(time.perf_counter_ns()):
+                    self._track(offset, 0, chip.nextReadyNs() + self._clockOffsetNs)
+            time.sleep(0.0002)
+
+
+class FakeLineRequest:
+    """FakeGpiod.request_lines()가 돌려주는 라인 요청"""
+
+    def __init__(self, fake, config):
+        self.fake = fake
+        self.events = deque()
+        self.released = False
+        self.drdyThread = None
+        self.reconfigure_lines(config)
+
+    def reconfigure_lines(self, config):
+        for offsets, settings in config.items():
+            if not isinstance(offsets, tuple):
+                offsets = (offsets,)
+            for offset in offsets:
+                if settings.direction == self.fake.Direction.OUTPUT:
+                    self.fake._setLevel(offset, settings.output_value.value)
+                elif settings.edge_detection != self.fake.Edge.NONE:
+                    self.fake._enableEdges(self, offset)
+
+    def set_value(self, offset, value):
+        self.fake._setLevel(offset, value.value)
+
+    def get_value(self, offset):
+        self.fake.getValueCount += 1
+        level = self.fake._level(offset)
+        if offset in self.fake._edgeRequests:
+            self.fake._edgeRequests[offset][1] = level
+        return self.fake.Value.ACTIVE if level else self.fake.Value.INACTIVE
+
+    def wait_edge_events(self, timeout=None):
+        with self.fake._lock:
+            if not self.events and timeout != 0:
+                self.fake._lock.wait(timeout)
+            return len(self.events) > 0
+
+    def read_edge_events(self, max_events=None):
+        with self.fake._lock:
+            events = list(self.events)
+            self.events.clear()
+        return events
+
+    def release(self):
+        self.released = True
@@ -0,0 +1,227 @@
+import os
+import mmap
+import time
+import tempfile
+
+'''
+Register-level GPIO backend for the BCM2835/2836/2837/2711 (Raspberry Pi 1-4).
+
+/dev/gpiomem exposes the GPIO register block to non-root users in the gpio
+group.  Mapping it and writing the SET/CLR registers directly skips the
+RPi.GPIO call overhead, so a PD_SCK pulse costs two memoryview stores instead
+of two C extension calls.  The Pi 5 GPIOs live behind the RP1 chip and are not
+reachable this way.
+'''
+
+# 32 bit 레지스터 인덱스 (바이트 오프셋 / 4)
+GPFSEL0 = 0x00 // 4
+GPSET0 = 0x1c // 4
+GPCLR0 = 0x28 // 4
+GPLEV0 = 0x34 // 4
+
+BLOCK_SIZE = 4096
+
+FSEL_INPUT = 0b000
+FSEL_OUTPUT = 0b001
+
+
+class GpioMemGPIO:
+    """/dev/gpiomem 레지스터를 mmap으로 직접 다루는 GPIO 백엔드. RPi.GPIO와 같은 인터페이스"""
+
+    BCM = 11
+    BOARD = 10
+    OUT = 0
+    IN = 1
+    LOW = 0
+    HIGH = 1
+    RISING = 31
+    FALLING = 32
+    BOTH = 33
+    PUD_OFF = 20
+    PUD_DOWN = 21
+    PUD_UP = 22
+
+    def __init__(self, path='/dev/gpiomem', simulator=None, settleReads=1):
+        """simulator가 있으면 그 파일을 mmap하고 레지스터 접근을 시뮬레이터에 알림.
+        settleReads: PD_SCK를 올린 뒤 HIGH 시간(최소 0.2us)을 확보하기 위한 LEV 더미 읽기 횟수"""
+        if simulator is not None and path == '/dev/gpiomem':
+            path = simulator.path
+        self.path = path
+        self.settleReads = settleReads
+        self.mode = None
+        self._pins = set()
+
+        fd = os.open(path, os.O_RDWR | os.O_SYNC)
+        try:
+            self._mmap = mmap.mmap(fd, BLOCK_SIZE, mmap.MAP_SHARED,
+                                   mmap.PROT_READ | mmap.PROT_WRITE)
+        finally:
+            os.close(fd)
+        self._view = memoryview(self._mmap).cast('I')
+
+        if simulator is not None:
+            self.regs = SimulatedRegisters(self._view, simulator)
+        else:
+            self.regs = self._view
+
+    def setmode(self, mode):
+        if mode != self.BCM:
+            raise ValueError("GpioMemGPIO only supports BCM pin numbering")
+        self.mode = mode
+
+    def getmode(self):
+        return self.mode
+
+    def setwarnings(self, flag):
+        pass
+
+    def setup(self, channel, direction, pull_up_down=None, initial=None):
+        # HX711의 DOUT은 푸시풀 출력이라 풀업/풀다운 설정은 하지 않음
+        if initial is not None and direction == self.OUT:
+            self.output(channel, initial)
+        index = GPFSEL0 + channel // 10
+        shift = (channel % 10) * 3
+        function = FSEL_OUTPUT if direction == self.OUT else FSEL_INPUT
+        regs = self.regs
+        regs[index] = (regs[index] & ~(0b111 << shift)) | (function << shift)
+        self._pins.add(channel)
+
+    def output(self, channel, value):
+        if value:
+            self.regs[GPSET0 + (channel >> 5)] = 1 << (channel & 31)
+        else:
+            self.regs[GPCLR0 + (channel >> 5)] = 1 << (channel & 31)
+
+    def input(self, channel):
+        return (self.regs[GPLEV0 + (channel >> 5)] >> (channel & 31)) & 1
+
+    def readLevels(self, bank=0):
+        """한 뱅크(32핀)의 레벨을 한 번의 레지스터 읽기로 반환"""
+        return self.regs[GPLEV0 + bank]
+
+    def makeClockOut(self, dout, pd_sck):
+        """레지스터 저장만으로 24+N 비트를 읽는 루프 생성 (hx711_clockout.makeClockOut에서 사용)"""
+        regs = self.regs
+        setIndex = GPSET0 + (pd_sck >> 5)
+        clrIndex = GPCLR0 + (pd_sck >> 5)
+        levIndex = GPLEV0 + (dout >> 5)
+        sckMask = 1 << (pd_sck & 31)
+        doutShift = dout & 31
+        settle = range(self.settleReads)
+
+        def clockOut(pulses):
+            """PD_SCK를 pulses번 클럭해 24비트 원시값(MSB 우선, 2의 보수)을 반환"""
+            value = 0
+            for i in range(pulses):
+                regs[setIndex] = sckMask
+                for j in settle:
+                    regs[levIndex]
+                regs[clrIndex] = sckMask
+                value = (value << 1) | ((regs[levIndex] >> doutShift) & 1)
+            return value >> (pulses - 24)
+
+        return clockOut
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None):
+        raise RuntimeError("GpioMemGPIO has no edge detection, use the gpiod backend for edge events")
+
+    def cleanup(self, channel=None):
+        channels = list(self._pins) if channel is None else [channel]
+        for pin in channels:
+            self.setup(pin, self.IN)
+            self._pins.discard(pin)
+        if channel is None:
+            self._view.release()
+            self._mmap.close()
+
+
+class SimulatedRegisters:
+    """파일을 mmap한 레지스터 블록 위에서 SET/CLR 쓰기와 LEV 읽기를 시뮬레이터에 전달"""
+
+    def __init__(self, view, simulator):
+        self.view = view
+        self.simulator = simulator
+
+    def __getitem__(self, index):
+        if GPLEV0 <= index <= GPLEV0 + 1:
+            self.simulator.updateLevels(self.view, index - GPLEV0)
+        return self.view[index]
+
+    def __setitem__(self, index, value):
+        self.view[index] = value
+        self.simulator.onWrite(self.view, index, value)
+
+
+class GpioMemSimulator:
+    """BCM GPIO 레지스터 블록 시뮬레이터. 가짜 HX711 칩(hx711_gpio.FakeHX711)을 핀에 연결해 LEV 읽기에 답함"""
+
+    def __init__(self, path=None):
+        """path: 레지스터 블록으로 쓸 일반 파일. None이면 임시 파일을 만듦"""
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix='gpiomem-')
+            os.close(fd)
+        with open(path, 'wb') as f:
+            f.write(bytes(BLOCK_SIZE))
+        self.path = path
+        self.levels = {}
+        self.setCount = 0
+        self.clearCount = 0
+        self.levReadCount = 0
+        self._doutChips = {}
+        self._sckChips = {}
+
+    def attach(self, chip, dout, pd_sck):
+        """가짜 HX711 칩을 DOUT/PD_SCK 핀에 연결"""
+        self._doutChips[dout] = chip
+        self._sckChips.setdefault(pd_sck, []).append(chip)
+        return chip
+
+    def functionOf(self, view, pin):
+        """GPFSEL 레지스터에 기록된 핀 기능 (0: 입력, 1: 출력)"""
+        return (view[GPFSEL0 + pin // 10] >> ((pin % 10) * 3)) & 0b111
+
+    def onWrite(self, view, index, value):
+        """SET/CLR 레지스터 쓰기를 핀 레벨 변화로 해석. 두 레지스터는 읽으면 0인 쓰기 전용"""
+        if GPSET0 <= index <= GPSET0 + 1:
+            level = 1
+            bank = index - GPSET0
+            self.setCount += 1
+        elif GPCLR0 <= index <= GPCLR0 + 1:
+            level = 0
+            bank = index - GPCLR0
+            self.clearCount += 1
+        else:
+            return
+        view[index] = 0
+
+        nowNs = time.perf_counter_ns()
+        bit = 0
+        while value:
+            if value & 1:
+                pin = bank * 32 + bit
+                if self.functionOf(view, pin) == FSEL_OUTPUT:
+                    self.levels[pin] = level
+                    for chip in self._sckChips.get(pin, ()):
+                        chip.sck(level, nowNs)
+            value >>= 1
+            bit += 1
+
+    def updateLevels(self, view, bank):
+        """LEV 레지스터에 현재 핀 레벨을 기록"""
+        self.levReadCount += 1
+        nowNs = time.perf_counter_ns()
+        word = 0
+        for pin, level in self.levels.items():
+            if pin >> 5 == bank and level:
+                word |= 1 << (pin & 31)
+        for pin, chip in self._doutChips.items():
+            if pin >> 5 == bank:
+                if chip.dout(nowNs):
+                    word |= 1 << (pin & 31)
+                else:
+                    word &= ~(1 << (pin & 31))
+        view[GPLEV0 + bank] = word
+
+    def close(self):
+        """임시 레지스터 파일 삭제"""
+        os.unlink(self.path)
@@ -0,0 +1,97 @@
+from bisect import bisect_left, insort
+from collections import deque
+
+'''
+Cheap checks for clock-outs that were probably corrupted, e.g. by the OS
+preempting the reading thread in the middle of the 24+N pulses.
+
+- DOUT must be high after the last gain pulse; if it is low, the chip did not
+  see every pulse and the bits are shifted.
+- If PD_SCK stays high for more than 60 us the HX711 powers down and the rest
+  of the bits read as garbage.  Timing each pulse would cost more than the
+  pulses themselves, so the whole clock-out is timed instead: if it took more
+  than 60 us longer than a normal clock-out, a stall long enough to power the
+  chip down may have hit while PD_SCK was high.  "Normal" is the 90th
+  percentile of the last 32 clock-outs, so the everyday jitter of a slower
+  backend (e.g. gpiod) does not count as a stall.
+
+The drivers retry a suspect read on the next conversion, at most maxRetries
+times, instead of returning it.  The saturation codes 0x7FFFFF/0x800000 are
+only counted: a real overload produces them on every conversion, so
+retrying would just cost conversions.
+'''
+
+
+class ReadChecker:
+    """클럭 아웃 결과가 손상되었을 가능성을 검사하고 원인별로 셈"""
+
+    # PD_SCK가 이보다 오래 HIGH면 HX711이 절전 모드로 들어감
+    SCK_HIGH_LIMIT_NS = 60000
+
+    # 정상 클럭 아웃 시간 기준값: 최근 WINDOW개 클럭 아웃 시간의 BASELINE_FRACTION 분위
+    WINDOW = 32
+    BASELINE_FRACTION = 0.9
+
+    SATURATED = (0x7fffff, 0x800000)
+
+    def __init__(self, gpio, dout, maxRetries=2):
+        self.getPin = gpio.input
+        self.dout = dout
+        self.maxRetries = maxRetries
+        # 정상 클럭 아웃에 걸리는 시간 (ns). 첫 읽기로 정해짐
+        self.baselineNs = None
+        # 최근 클럭 아웃 시간 (들어온 순서와 정렬된 사본)
+        self._recent = deque()
+        self._sorted = []
+        self.resetCounters()
+
+    def resetCounters(self):
+        """검사 카운터 초기화"""
+        self.checkedCount = 0
+        self.doutLowCount = 0
+        self.saturatedCount = 0
+        self.slowCount = 0
+        self.retryCount = 0
+        self.failedCount = 0
+
+    def _addDuration(self, durationNs):
+        """클럭 아웃 시간을 창에 넣고 기준값(분위)을 갱신"""
+        recent = self._recent
+        sortedNs = self._sorted
+        if len(recent) == self.WINDOW:
+            del sortedNs[bisect_left(sortedNs, recent.popleft())]
+        recent.append(durationNs)
+        insort(sortedNs, durationNs)
+        self.baselineNs = sortedNs[min(len(sortedNs) - 1, int(len(sortedNs) * self.BASELINE_FRACTION))]
+
+    def check(self, rawValue, durationNs):
+        """손상 의심 원인('doutLow', 'slow') 또는 정상이면 None. 포화 값은 세기만 하고 정상으로 봄"""
+        self.checkedCount += 1
+
+        # 마지막 Gain 펄스 뒤에는 다음 변환까지 DOUT이 HIGH여야 함
+        if not self.getPin(self.dout):
+            self.doutLowCount += 1
+            return 'doutLow'
+
+        # 느린 읽기도 창에 넣음: 백엔드 자체가 느려지면 기준값이 따라가고, 드문 멈춤은 분위를 거의 바꾸지 않음
+        baselineNs = self.baselineNs
+        self._addDuration(durationNs)
+        if baselineNs is not None and durationNs - baselineNs > self.SCK_HIGH_LIMIT_NS:
+            self.slowCount += 1
+            return 'slow'
+
+        if rawValue in self.SATURATED:
+            self.saturatedCount += 1
+        return None
+
+    def getStats(self):
+        """원인별 손상 의심 횟수, 재시도 횟수, 재시도 후에도 실패한 횟수"""
+        return {
+            'checked': self.checkedCount,
+            'doutLow': self.doutLowCount,
+            'saturated': self.saturatedCount,
+            'slow': self.slowCount,
+            'retries': self.retryCount,
+            'failed': self.failedCount,
+            'baselineNs': self.baselineNs,
+        }
@@ -0,0 +1,226 @@
+import time
+import threading
+
+from hx711_gpio import loadDefaultGPIO
+from hx711_ready import ReadyWaiter, HX711TimeoutError
+
+'''
+Several HX711 boards on one shared PD_SCK line.
+
+Every PD_SCK pulse shifts one bit out of every chip at once, so all DOUT pins
+are sampled after the same falling edge and N sensors are read in a single
+25-27 pulse pass with one timestamp.  When the GPIO backend can read a whole
+bank in one call (readLevels(), e.g. GpioMemGPIO), every pulse costs the same
+three pin calls whatever the number of sensors; otherwise each extra sensor
+adds one input() call per pulse.  The bits are split per sensor after PD_SCK
+is released, outside the timing-critical loop.
+
+All chips share the gain (the gain pulses go to every chip) and are powered
+down and up together, which also starts their conversions in step.
+'''
+
+
+def makeMultiClockOut(gpio, douts, pd_sck):
+    """공유 PD_SCK로 모든 DOUT을 함께 읽는 함수 생성. 24비트 원시값 목록(DOUT 순서)을 반환"""
+    setPin = gpio.output
+    banks = set(dout >> 5 for dout in douts)
+
+    if hasattr(gpio, 'readLevels') and len(banks) == 1:
+        # 펄스마다 뱅크 레벨을 한 번만 읽고, 비트 분리는 클럭이 끝난 뒤에 함
+        readLevels = gpio.readLevels
+        bank = banks.pop()
+        shifts = [dout & 31 for dout in douts]
+
+        def clockOut(pulses):
+            """PD_SCK를 pulses번 클럭해 센서별 24비트 원시값 목록을 반환"""
+            words = []
+            append = words.append
+            for i in range(pulses):
+                setPin(pd_sck, True)
+                setPin(pd_sck, False)
+                append(readLevels(bank))
+            values = []
+            for shift in shifts:
+                value = 0
+                for word in words[:24]:
+                    value = (value << 1) | ((word >> shift) & 1)
+                values.append(value)
+            return values
+
+        return clockOut
+
+    getPin = gpio.input
+    count = len(douts)
+
+    def clockOut(pulses):
+        """PD_SCK를 pulses번 클럭해 센서별 24비트 원시값 목록을 반환"""
+        values = [0] * count
+        for i in range(pulses):
+            setPin(pd_sck, True)
+            setPin(pd_sck, False)
+            for j, dout in enumerate(douts):
+                values[j] = (values[j] << 1) | getPin(dout)
+        # 24비트 뒤의 Gain 펄스에서 읽은 비트는 버림
+        shift = pulses - 24
+        return [value >> shift for value in values]
+
+    return clockOut
+
+
+class HX711Multi:
+    """PD_SCK를 공유하는 여러 HX711을 한 번의 클럭으로 함께 읽는 클래스"""
+
+    def __init__(self, douts, pd_sck, gain=128, gpio=None, names=None):
+        """douts: 센서별 DOUT 핀 목록. names: 센서 이름 목록 (예: ['accelerator', 'brake'])"""
+        if not douts:
+            raise ValueError("HX711Multi::__init__() needs at least one DOUT pin!")
+        if names is not None and len(names) != len(douts):
+            raise ValueError("HX711Multi::__init__() names and douts must have the same length!")
+        self.PD_SCK = pd_sck
+        self.DOUTS = list(douts)
+        self.names = list(names) if names is not None else ['%d' % dout for dout in douts]
+        self.readLock = threading.Lock()
+
+        if gpio is None:
+            gpio = loadDefaultGPIO()
+        self.GPIO = gpio
+
+        self.GPIO.setmode(self.GPIO.BCM)
+        self.GPIO.setup(self.PD_SCK, self.GPIO.OUT)
+        for dout in self.DOUTS:
+            self.GPIO.setup(dout, self.GPIO.IN)
+
+        self._clockOut = makeMultiClockOut(self.GPIO, self.DOUTS, self.PD_SCK)
+
+        # 센서별 보정값
+        self.offsets = [0] * len(self.DOUTS)
+        self.referenceUnits = [1] * len(self.DOUTS)
+        self.GAIN = None
+
+        # 모든 DOUT이 LOW가 될 때까지 대기. 에지 이벤트는 핀 하나만 보므로 학습 대기를 씀
+        self.readyTimeout = 1.0
+        self.readyWaiter = ReadyWaiter(self.isReady)
+        self.lastReadyNs = 0
+
+        # 칩들이 다음 변환에 쓸 Gain 펄스 수 (None이면 모름). 앞서 실행된 프로그램이 다른 Gain을
+        # 예약해 두었을 수 있으므로 첫 읽기는 Gain만 보내고 버림
+        self.chipGainPulses = None
+
+        # PD_SCK를 LOW로 두면 절전 중이던 칩도 깨어남. 첫 변환은 첫 읽기에서 기다림
+        self.GPIO.output(self.PD_SCK, False)
+        self.setGain(gain)
+
+    def powerDown(self):
+        """모든 HX711을 절전 모드로 전환"""
+        with self.readLock:
+            self.GPIO.output(self.PD_SCK, False)
+            self.GPIO.output(self.PD_SCK, True)
+            time.sleep(0.0001)
+
+    def powerUp(self):
+        """모든 HX711을 함께 다시 활성화. 변환도 같은 시점에 다시 시작됨"""
+        with self.readLock:
+            self.GPIO.output(self.PD_SCK, False)
+            self.readyWaiter.reset()
+            # 전원이 켜지면 Gain이 128로 돌아감. 다른 Gain이면 다음 읽기가 한 변환을 버림
+            self.chipGainPulses = 1
+            time.sleep(0.0001)
+
+    def reset(self):
+        """모듈 재설정"""
+        self.powerDown()
+        self.powerUp()
+
+    def isReady(self):
+        """모든 DOUT이 LOW(데이터 준비)인지 반환"""
+        input = self.GPIO.input
+        low = self.GPIO.LOW
+        for dout in self.DOUTS:
+            if input(dout) != low:
+                return False
+        return True
+
+    def setGain(self, gain):
+        """Gain 값 설정 (128, 64, 32 지원). 모든 칩에 함께 적용됨.
+        칩에는 다음 읽기의 Gain 펄스로 전달되고, 그 전에 변환된 값은 readRawValues()가 버림"""
+        if gain == 128:
+            self.GAIN = 1
+        elif gain == 64:
+            self.GAIN = 3
+        elif gain == 32:
+            self.GAIN = 2
+        else:
+            return False
+        return True
+
+    def getGain(self):
+        """현재 설정된 Gain 값을 반환"""
+        if self.GAIN == 1:
+            return 128
+        elif self.GAIN == 3:
+            return 64
+        elif self.GAIN == 2:
+            return 32
+        raise ValueError("HX711Multi::getGain() gain is invalid")
+
+    def readRawValues(self, timeout=None):
+        """모든 센서가 준비되면 한 번의 클럭으로 읽은 24비트 원시값 목록을 반환"""
+        if self.GAIN is None:
+            raise ValueError("HX711Multi::readRawValues() called without setting gain first!")
+        if timeout is None:
+            timeout = self.readyTimeout
+        self.readLock.acquire()
+
+        # 준비된 변환이 다른 Gain으로 만들어졌으면 (setGain() 또는 powerUp() 직후) 읽어서 Gain만 바꾸고 버림
+        for attempt in range(2 if self.chipGainPulses != self.GAIN else 1):
+            try:
+                self.readyWaiter.wait(timeout)
+            except HX711TimeoutError:
+                self.readLock.release()
+                raise
+            self.lastReadyNs = self.readyWaiter.readyNs
+
+            rawValues = self._clockOut(24 + self.GAIN)
+            self.chipGainPulses = self.GAIN
+
+        self.readLock.release()
+        return rawValues
+
+    def getLongs(self, timeout=None):
+        """센서별 부호있는 정수값 목록"""
+        return [-(value & 0x800000) + (value & 0x7fffff)
+                for value in self.readRawValues(timeout)]
+
+    def readSample(self, timeout=None):
+        """(타임스탬프 ns, 센서별 정수값 목록). 모든 값이 같은 클럭에서 샘플링됨"""
+        values = self.getLongs(timeout)
+        return (self.lastReadyNs, values)
+
+    def longsToWeights(self, longValues):
+        """센서별 정수값 목록을 무게 목록으로 변환"""
+        return [(value - offset) / referenceUnit
+                for value, offset, referenceUnit
+                in zip(longValues, self.offsets, self.referenceUnits)]
+
+    def getWeights(self, timeout=None):
+        """센서별 무게 목록"""
+        return self.longsToWeights(self.getLongs(timeout))
+
+    def getWeightsByName(self, timeout=None):
+        """센서 이름을 키로 하는 무게 딕셔너리"""
+        return dict(zip(self.names, self.getWeights(timeout)))
+
+    def setReferenceUnit(self, index, referenceUnit):
+        """index번째 센서의 기준 단위 설정"""
+        self.referenceUnits[index] = referenceUnit
+
+    def setOffset(self, index, offset):
+        """index번째 센서의 오프셋 설정"""
+        self.offsets[index] = offset
+
+    def tare(self, times=5):
+        """여러 번 읽은 값의 센서별 중앙값으로 모든 오프셋 설정"""
+        samples = [self.getLongs() for i in range(times)]
+        for index in range(len(self.DOUTS)):
+            values = sorted(sample[index] for sample in samples)
+            self.offsets[index] = values[len(values) // 2]
@@ -0,0 +1,138 @@
+import time
+
+
+class HX711TimeoutError(TimeoutError):
+    """정해진 시간 안에 DOUT이 LOW(데이터 준비)가 되지 않을 때 발생"""
+
+
+def makeReadyWaiter(gpio, dout, isReady):
+    """GPIO 백엔드에 맞는 대기 전략 생성. 에지 이벤트를 제공하는 백엔드는 자체 대기 전략을 씀"""
+    if hasattr(gpio, 'makeReadyWaiter'):
+        return gpio.makeReadyWaiter(dout, isReady)
+    return ReadyWaiter(isReady)
+
+
+class ReadyWaiter:
+    """DOUT 준비 대기 전략. 관측된 변환 주기를 학습해 대부분은 잠들고 예상 시각 근처에서만 바쁘게 폴링함"""
+
+    # 예상 준비 시각 앞에서 바쁜 폴링으로 전환하는 최소 여유 시간 (sleep 오차 흡수)
+    MIN_GUARD = 0.0015
+
+    # 주기를 모를 때 사용하는 폴링 간격
+    POLL_INTERVAL = 0.0005
+
+    # 주기 추정치 갱신 비율
+    PERIOD_ALPHA = 0.2
+
+    # 예상보다 늦게 깨어나 에지를 놓쳤을 때 주기 추정치에 곱하는 값
+    OVERSLEEP_SHRINK = 0.99
+
+    def __init__(self, isReady, dataRate=None):
+        """isReady: DOUT 준비 여부를 반환하는 함수, dataRate: 알고 있다면 초당 변환 수"""
+        self.isReady = isReady
+        self.period = 1.0 / dataRate if dataRate else None
+        self.lastEdge = None
+        # 마지막으로 DOUT 준비를 확인한 시각 (time.monotonic_ns)
+        self.readyNs = 0
+        # 직전 읽기가 관측된 하강 에지 바로 뒤에 이루어졌는지 여부
+        self._lastReadAtEdge = False
+
+        # 통계: 대기 횟수, 잠든 시간, 바쁜 폴링 횟수
+        self.waitCount = 0
+        self.sleepTime = 0.0
+        self.spinPolls = 0
+
+    def reset(self):
+        """학습된 준비 시각 기준점을 버림 (전원 재인가 등으로 변환 타이밍이 바뀐 경우)"""
+        self.lastEdge = None
+        self._lastReadAtEdge = False
+
+    def expectedReadyTime(self, now):
+        """now 이후 다음 변환 완료 예상 시각. 알 수 없으면 None"""
+        if self.period is None or self.lastEdge is None:
+            return None
+        periods = (now - self.lastEdge) // self.period + 1
+        return self.lastEdge + periods * self.period
+
+    def noteReady(self, now, atEdge, readyNs=None):
+        """대기 없이 외부(스케줄러 등)에서 준비를 확인했을 때 호출. atEdge: 직전 확인 때 준비되지 않았었는지 여부,
+        readyNs: 확인한 시각 (time.monotonic_ns, None이면 지금)"""
+        self.readyNs = time.monotonic_ns() if readyNs is None else readyNs
+        if atEdge:
+            self._learnEdge(now)
+        else:
+            self._lastReadAtEdge = False
+
+    def _learnEdge(self, edge):
+        """관측된 DOUT 하강 시각으로 주기와 기준점 갱신"""
+        # 직전 읽기가 에지 직후였고 이번 대기 시작 때 준비되지 않았다면 두 에지 사이는 정확히 한 주기
+        if self._lastReadAtEdge:
+            interval = edge - self.lastEdge
+            if self.period is None or interval < 0.75 * self.period:
+                self.period = interval
+            else:
+                # 변환을 건너뛰고 관측한 경우에도 주기 단위로 나눠 반영
+                periods = max(1, round(interval / self.period))
+                self.period += self.PERIOD_ALPHA * (interval / periods - self.period)
+        self.lastEdge = edge
+        self._lastReadAtEdge = True
+
+    def wait(self, timeout=None):
+        """DOUT이 LOW가 될 때까지 대기. timeout(초)을 넘기면 HX711TimeoutError 발생"""
+        isReady = self.isReady
+        self.waitCount += 1
+
+        if isReady():
+            # 이미 준비된 상태: 하강 시각을 알 수 없으므로 주기 학습에 쓰지 않음
+            self._lastReadAtEdge = False
+            self.readyNs = time.monotonic_ns()
+            return
+
+        clock = time.perf_counter
+        sleep = time.sleep
+        now = clock()
+        deadline = None if timeout is None else now + timeout
+        expected = self.expectedReadyTime(now)
+        spinning = False
+
+        while True:
+            if isReady():
+                break
+
+            now = clock()
+            if deadline is not None and now >= deadline:
+                raise HX711TimeoutError(
+                    "HX711: DOUT not ready after %.3f s, is the sensor connected?" % timeout)
+
+            if expected is not None:
+                guard = max(self.MIN_GUARD, 0.05 * self.period)
+                if now < expected - guard:
+                    # 예상 시각 직전까지 잠듦
+                    delay = expected - guard - now
+                elif now < expected + guard:
+                    # 예상 시각 근처: 하강 에지를 놓치지 않도록 바쁘게 폴링
+                    self.spinPolls += 1
+                    spinning = True
+                    continue
+                else:
+                    # 예상이 빗나감 (리셋, Gain 변경 등). 학습을 버리고 느린 폴링으로 전환
+                    self.reset()
+                    expected = None
+                    spinning = False
+                    delay = self.POLL_INTERVAL
+            else:
+                delay = self.POLL_INTERVAL
+
+            if deadline is not None:
+                delay = min(delay, deadline - now)
+            sleep(delay)
+            self.sleepTime += delay
+
+        self.readyNs = time.monotonic_ns()
+        edge = clock()
+        if spinning or expected is None:
+            self._learnEdge(edge)
+        else:
+            # 잠든 사이 에지가 지나감: 주기를 크게 잡았을 가능성이 높으므로 조금 줄임
+            self.period *= self.OVERSLEEP_SHRINK
+            self._lastReadAtEdge = False
@@ -0,0 +1,160 @@
+import os
+import gc
+import ctypes
+
+'''
+Opt-in real-time mode for the acquisition thread.
+
+The HX711 powers down if PD_SCK stays high for more than 60 us, so a reading
+thread that is preempted in the middle of a clock-out returns garbage.
+RealtimeMode reduces the chance of that:
+
+- pins the thread to one CPU (an isolated one, from isolcpus=, if the kernel
+  has any) with os.sched_setaffinity;
+- asks for SCHED_FIFO so ordinary processes cannot preempt it;
+- locks the process memory with mlockall() so a clock-out never waits on a
+  page fault;
+- freezes the objects that exist when acquisition starts (gc.freeze()) and
+  keeps the garbage collector from running during each clock-out.
+
+Every step that is not permitted (no root or CAP_SYS_NICE, no
+CAP_IPC_LOCK/memlock limit, non-Linux) is skipped, and enter() reports what
+was actually applied.
+'''
+
+# mlockall() 플래그 (linux/mman.h)
+MCL_CURRENT = 1
+MCL_FUTURE = 2
+
+
+def isolatedCpus():
+    """커널 isolcpus=로 분리된 CPU 번호 목록. 없거나 알 수 없으면 빈 목록"""
+    try:
+        with open('/sys/devices/system/cpu/isolated') as f:
+            text = f.read().strip()
+    except OSError:
+        return []
+    cpus = []
+    for part in text.split(','):
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.extend(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def _libc():
+    # ctypes.util은 subprocess 등을 끌어와 임포트가 수십 ms 걸리므로 필요할 때 임포트
+    import ctypes.util
+    return ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+
+
+class RealtimeMode:
+    """수집 스레드의 실시간 설정. enter()는 호출한 스레드에 적용하고 적용된 내용을 반환"""
+
+    def __init__(self, cpu=None, priority=50, lockMemory=True, gcControl=True):
+        """cpu: 고정할 CPU 번호 (None이면 분리된 CPU 중 마지막, 없으면 고정하지 않음),
+        priority: SCHED_FIFO 우선순위 (1~99, None이면 요청하지 않음),
+        lockMemory: mlockall() 사용 여부, gcControl: 클럭 아웃 중 가비지 컬렉터를 멈출지 여부"""
+        self.cpu = cpu
+        self.priority = priority
+        self.lockMemory = lockMemory
+        self.gcControl = gcControl
+        self.report = None
+        self._memoryLocked = False
+        self._gcFrozen = False
+
+    def enter(self):
+        """호출한 스레드에 가능한 설정을 모두 적용하고 결과 보고서(dict)를 반환"""
+        report = {
+            'cpu': None,
+            'scheduler': 'SCHED_OTHER',
+            'priority': 0,
+            'memoryLocked': False,
+            'gcFrozen': False,
+            'errors': {},
+        }
+        errors = report['errors']
+
+        cpu = self.cpu
+        if cpu is None:
+            isolated = isolatedCpus()
+            cpu = isolated[-1] if isolated else None
+        if cpu is not None:
+            try:
+                # pid 0은 리눅스에서 호출한 스레드를 뜻함
+                os.sched_setaffinity(0, {cpu})
+                report['cpu'] = cpu
+            except (OSError, AttributeError, ValueError) as e:
+                errors['affinity'] = str(e)
+
+        if self.priority is not None:
+            try:
+                os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(self.priority))
+                report['scheduler'] = 'SCHED_FIFO'
+                report['priority'] = self.priority
+            except (OSError, AttributeError) as e:
+                errors['scheduler'] = str(e)
+
+        if self.lockMemory:
+            try:
+                libc = _libc()
+                if libc.mlockall(MCL_CURRENT | MCL_FUTURE) != 0:
+                    raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+                self._memoryLocked = True
+                report['memoryLocked'] = True
+            except (OSError, AttributeError) as e:
+                errors['mlockall'] = str(e)
+
+        if self.gcControl and hasattr(gc, 'freeze'):
+            # 이미 있는 객체는 이후 수집 대상에서 빼서 수집 한 번의 비용을 줄임
+            gc.collect()
+            gc.freeze()
+            self._gcFrozen = True
+            report['gcFrozen'] = True
+
+        self.report = report
+        return report
+
+    def leave(self):
+        """프로세스 전체에 걸리는 설정(메모리 고정, gc freeze)을 되돌림. 스레드 설정은 스레드와 함께 사라짐"""
+        if self._memoryLocked:
+            try:
+                _libc().munlockall()
+            except (OSError, AttributeError):
+                pass
+            self._memoryLocked = False
+        if self._gcFrozen:
+            gc.unfreeze()
+            self._gcFrozen = False
+
+    def pauseGC(self, clockOut):
+        """clockOut을 가비지 컬렉터를 멈춘 채로 부르는 읽기 루프로 감싸 반환"""
+        isEnabled = gc.isenabled
+        disable = gc.disable
+        enable = gc.enable
+
+        def gcPausedClockOut(pulses):
+            """가비지 컬렉터를 멈춘 채로 클럭 아웃"""
+            enabled = isEnabled()
+            disable()
+            try:
+                return clockOut(pulses)
+            finally:
+                if enabled:
+                    enable()
+
+        return gcPausedClockOut
+
+    def wrapClockOut(self, hx):
+        """hx의 클럭 아웃 동안 가비지 컬렉터가 돌지 않도록 hx.setClockOutWrapper()로 감쌈. restoreClockOut()으로 되돌림"""
+        if self.gcControl:
+            hx.setClockOutWrapper(self.pauseGC)
+
+    def restoreClockOut(self, hx):
+        """wrapClockOut()으로 감싼 클럭 아웃을 되돌림"""
+        if self.gcControl:
+            hx.setClockOutWrapper(None)
@@ -0,0 +1,176 @@
+from array import array
+from operator import index as toIndex
+from bisect import bisect_left, insort
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+'''
+Robust reducers for a batch of HX711 readings: median, trimmed mean and
+winsorized mean.
+
+Each reducer only needs a few order statistics (the middle one or two for the
+median, the two trim cut points for the trimmed and winsorized means), so with
+NumPy the samples are copied into a preallocated buffer and numpy.partition()
+selects those positions in O(n) instead of sorting everything.  For small
+batches, or without NumPy, the C sorted() is faster than any selection written
+in Python, so that is used instead.
+
+SlidingWindow applies a reducer to the last `size` samples of a stream.  The
+samples live in a preallocated ring buffer; without NumPy a sorted copy of the
+window is kept up to date with bisect, so each new sample costs one removal
+and one insertion instead of a sort.  The window holds raw integer counts
+only: push() raises TypeError for a float, on both paths, rather than
+truncating it into the int64 buffer.
+'''
+
+
+def _total(values):
+    """리스트는 sum(), numpy 배열은 .sum()으로 합계"""
+    if numpy is not None and isinstance(values, numpy.ndarray):
+        return int(values.sum())
+    return sum(values)
+
+
+class Reducer:
+    """여러 샘플을 하나의 값으로 줄이는 기본 클래스. 필요한 순위 통계량만 골라 계산함"""
+
+    # 이보다 적은 샘플은 numpy를 써도 sorted()가 더 빠름
+    PARTITION_THRESHOLD = 64
+
+    def __init__(self):
+        self._buffer = None
+
+    def kth(self, count):
+        """count개 샘플에서 계산에 필요한 순위(0부터) 목록"""
+        raise NotImplementedError
+
+    def fromSorted(self, values, count):
+        """정렬된 값(앞의 kth 위치만 맞으면 됨)에서 결과 계산"""
+        raise NotImplementedError
+
+    def _partitioned(self, values, count):
+        """미리 할당된 numpy 버퍼에 복사하고 필요한 위치만 선택 정렬"""
+        buffer = self._buffer
+        if buffer is None or len(buffer) < count:
+            buffer = self._buffer = numpy.empty(max(count, 16), dtype=numpy.int64)
+        view = buffer[:count]
+        view[:] = values
+        view.partition(self.kth(count))
+        return view
+
+    def reduce(self, values):
+        """샘플 목록을 하나의 값으로 줄임"""
+        count = len(values)
+        if count == 0:
+            raise ValueError("Reducer::reduce() needs at least one value!")
+        if numpy is not None and count >= self.PARTITION_THRESHOLD:
+            return self.fromSorted(self._partitioned(values, count), count)
+        return self.fromSorted(sorted(values), count)
+
+    __call__ = reduce
+
+
+class MedianReducer(Reducer):
+    """중앙값. 짝수 개면 가운데 두 값의 평균"""
+
+    def kth(self, count):
+        middle = count // 2
+        if count & 1:
+            return [middle]
+        return [middle - 1, middle]
+
+    def fromSorted(self, values, count):
+        middle = count // 2
+        if count & 1:
+            return int(values[middle])
+        return (int(values[middle - 1]) + int(values[middle])) / 2.0
+
+
+class TrimmedMeanReducer(Reducer):
+    """위아래 trim 비율만큼 버린 나머지의 평균"""
+
+    def __init__(self, trim=0.2):
+        super().__init__()
+        if not 0 <= trim < 0.5:
+            raise ValueError("TrimmedMeanReducer() trim must be in [0, 0.5)!")
+        self.trim = trim
+
+    def trimCount(self, count):
+        """한쪽에서 버리는 샘플 수"""
+        return int(count * self.trim)
+
+    def kth(self, count):
+        cut = self.trimCount(count)
+        return [cut, count - cut - 1]
+
+    def fromSorted(self, values, count):
+        cut = self.trimCount(count)
+        # 선택 정렬 후에도 cut..count-cut 구간에는 그 구간의 값들만 모여 있으므로 합은 같음
+        return _total(values[cut:count - cut]) / (count - 2 * cut)
+
+
+class WinsorizedMeanReducer(TrimmedMeanReducer):
+    """위아래 trim 비율만큼을 경계값으로 바꾼 뒤의 평균"""
+
+    def fromSorted(self, values, count):
+        cut = self.trimCount(count)
+        total = _total(values[cut:count - cut])
+        total += cut * (int(values[cut]) + int(values[count - cut - 1]))
+        return total / count
+
+
+class SlidingWindow:
+    """스트림의 최근 size개 샘플에 reducer를 적용하는 고정 크기 창"""
+
+    def __init__(self, reducer, size):
+        if size <= 0:
+            raise ValueError("SlidingWindow() size must be greater than zero!")
+        self.reducer = reducer
+        self.size = size
+        self.count = 0
+        self._index = 0
+        self._usePartition = numpy is not None and size >= reducer.PARTITION_THRESHOLD
+        if self._usePartition:
+            self.values = numpy.zeros(size, dtype=numpy.int64)
+            self._scratch = numpy.empty(size, dtype=numpy.int64)
+        else:
+            self.values = array('q', [0]) * size
+            self._sorted = []
+
+    def reset(self):
+        """창을 비움"""
+        self.count = 0
+        self._index = 0
+        if not self._usePartition:
+            del self._sorted[:]
+
+    def push(self, value):
+        """정수 원시값 샘플 하나를 넣고 창 전체에 reducer를 적용한 값을 반환. 정수가 아니면 TypeError"""
+        value = toIndex(value)
+        index = self._index
+        if not self._usePartition:
+            # 정렬된 사본에서 밀려나는 값을 빼고 새 값을 끼워 넣음
+            if self.count == self.size:
+                sortedValues = self._sorted
+                del sortedValues[bisect_left(sortedValues, self.values[index])]
+            insort(self._sorted, value)
+        self.values[index] = value
+        self._index = (index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        return self.value()
+
+    def value(self):
+        """현재 창에 reducer를 적용한 값. 비어 있으면 None"""
+        count = self.count
+        if count == 0:
+            return None
+        if not self._usePartition:
+            return self.reducer.fromSorted(self._sorted, count)
+        scratch = self._scratch[:count]
+        scratch[:] = self.values[:count]
+        scratch.partition(self.reducer.kth(count))
+        return self.reducer.fromSorted(scratch, count)
@@ -0,0 +1,194 @@
+import time
+import threading
+
+from hx711_acquisition import TaggedSampleRing
+
+'''
+One thread servicing many HX711s that each have their own PD_SCK.
+
+Instead of blocking in readRawBytes() on one sensor at a time, the scheduler
+polls every DOUT in one pass and clocks out whichever sensors are ready, in
+the order they became ready.  Between passes it sleeps until the earliest
+conversion any sensor is expected to finish (each sensor's ReadyWaiter keeps
+learning its own period, so boards with different oscillators are fine) and
+only polls tightly around that moment.  A slow or disconnected sensor never
+holds up the others.  Ready sensors are read with the driver's
+readReadyRawBytes(), so integrity checks, stats, the read lock and channel
+schedules work as for readRawBytes(); a conversion the driver rejects is
+simply skipped.
+
+Samples from all sensors go into one TaggedSampleRing, tagged with the index
+of the sensor, and the callbacks get (sensorId, timestampNs, value).
+'''
+
+
+class SensorState:
+    """스케줄러가 센서마다 보관하는 상태와 통계"""
+
+    def __init__(self, tag, sensorId, hx):
+        self.tag = tag
+        self.sensorId = sensorId
+        self.hx = hx
+        self.isReady = hx.isReady if hasattr(hx, 'isReady') else hx.is_ready
+        # 마지막으로 읽은 변환의 완료 시각 (학습된 변환 주기 격자 위, perf_counter 초)
+        self.lastConversion = None
+        # 직전 폴링 시각과 그때의 준비 여부 (에지 관측 판정용)
+        self.lastPoll = None
+        self.lastPollReady = True
+        self.lastServiced = time.perf_counter()
+        self.lastTimeoutCheck = self.lastServiced
+
+        self.sampleCount = 0
+        self.missedCount = 0
+        self.timeoutCount = 0
+        self.busyCount = 0
+
+
+class ReadyScheduler(threading.Thread):
+    """여러 HX711의 DOUT을 한꺼번에 감시해 먼저 준비된 센서부터 읽는 스레드"""
+
+    def __init__(self, sensors, bufferSize=4096, callback=None):
+        """sensors: {센서 ID: HX711} 딕셔너리 또는 HX711 목록 (ID는 순번)"""
+        super().__init__(name="HX711-scheduler", daemon=True)
+        if not isinstance(sensors, dict):
+            sensors = dict(enumerate(sensors))
+        if not sensors:
+            raise ValueError("ReadyScheduler::__init__() needs at least one sensor!")
+        self.states = [SensorState(tag, sensorId, hx)
+                       for tag, (sensorId, hx) in enumerate(sensors.items())]
+        self.ids = [state.sensorId for state in self.states]
+        self.stream = TaggedSampleRing(bufferSize)
+        self.callbacks = [] if callback is None else [callback]
+
+        # 통계: 폴링 횟수, 잠든 시간
+        self.passCount = 0
+        self.sleepTime = 0.0
+        self._stopEvent = threading.Event()
+
+    def stop(self):
+        """스레드 종료 요청 후 끝날 때까지 대기"""
+        self._stopEvent.set()
+        if self is not threading.current_thread():
+            self.join()
+
+    def _service(self, state, now, timestampNs):
+        """준비된 센서 하나를 읽어 스트림에 기록. 다른 스레드가 읽는 중이면 건너뜀"""
+        hx = state.hx
+        rawBytes = hx.readReadyRawBytes()
+        if rawBytes is False:
+            state.busyCount += 1
+            return
+        # Gain만 바꾸고 버렸거나 (setGain() 직후) 손상이 의심되는 변환, 또는 ChannelScheduler가 고른 다른 채널
+        if rawBytes is None or hx.lastGainPulses != hx.GAIN:
+            state.lastServiced = now
+            return
+        value = hx.convertFromTwosComplement24bit(
+            (rawBytes[0] << 16) | (rawBytes[1] << 8) | rawBytes[2])
+
+        # 읽은 변환을 변환 주기 격자 위에 놓고, 직전에 읽은 변환과 두 칸 이상 떨어졌다면 그 사이를 놓친 것.
+        # 감지 시각끼리 비교하면 폴링 지연만으로도 놓친 것으로 셀 수 있음
+        waiter = hx.readyWaiter
+        conversion = None
+        if waiter.period and waiter.lastEdge is not None:
+            conversion = waiter.lastEdge + ((now - waiter.lastEdge) // waiter.period) * waiter.period
+            if state.lastConversion is not None:
+                missed = round((conversion - state.lastConversion) / waiter.period) - 1
+                if missed > 0:
+                    state.missedCount += missed
+        state.lastConversion = conversion
+        state.lastServiced = now
+        state.sampleCount += 1
+
+        self.stream.append(value, timestampNs, state.tag)
+        for callback in self.callbacks:
+            callback(state.sensorId, timestampNs, value)
+
+    def _nextDelay(self, now):
+        """다음 폴링까지 잠들 시간. 0이면 예상 시각 근처라 바로 다시 폴링"""
+        delay = 0.1
+        for state in self.states:
+            waiter = state.hx.readyWaiter
+            expected = waiter.expectedReadyTime(now)
+            if expected is None:
+                delay = min(delay, waiter.POLL_INTERVAL)
+                continue
+            guard = max(waiter.MIN_GUARD, 0.05 * waiter.period)
+            previous = expected - waiter.period
+            if previous > state.lastServiced:
+                # 마지막으로 읽은 뒤 끝났어야 할 변환을 아직 보지 못함
+                if now < previous + guard:
+                    return 0.0
+                # 예상이 빗나감 (리셋, 분리 등). 이 센서는 느린 폴링으로 전환
+                waiter.reset()
+                delay = min(delay, waiter.POLL_INTERVAL)
+            elif now < expected - guard:
+                delay = min(delay, expected - guard - now)
+            else:
+                return 0.0
+        return delay
+
+    def run(self):
+        states = self.states
+        clock = time.perf_counter
+        sleep = time.sleep
+        stopEvent = self._stopEvent
+
+        while not stopEvent.is_set():
+            self.passCount += 1
+            now = clock()
+            timestampNs = time.monotonic_ns()
+            ready = []
+            for state in states:
+                if state.isReady():
+                    # 직전 폴링이 바로 앞이었고 그때 준비되지 않았다면 지금이 하강 에지
+                    waiter = state.hx.readyWaiter
+                    atEdge = (not state.lastPollReady and state.lastPoll is not None and
+                              now - state.lastPoll < waiter.MIN_GUARD)
+                    waiter.noteReady(now, atEdge, timestampNs)
+                    ready.append(state)
+                    state.lastPollReady = True
+                else:
+                    state.lastPollReady = False
+                    # readyTimeout 동안 한 번도 준비되지 않았다면 분리 등을 의심
+                    if now - max(state.lastServiced, state.lastTimeoutCheck) > state.hx.readyTimeout:
+                        state.timeoutCount += 1
+                        state.lastTimeoutCheck = now
+                state.lastPoll = now
+
+            for state in ready:
+                self._service(state, now, timestampNs)
+                state.lastPollReady = False
+
+            delay = self._nextDelay(clock())
+            if delay > 0:
+                sleep(delay)
+                self.sleepTime += delay
+
+    def _tagged(self, samples):
+        ids = self.ids
+        return [(seq, timestampNs, ids[tag], value) for seq, timestampNs, tag, value in samples]
+
+    def latest(self):
+        """가장 최근 샘플 (일련번호, 타임스탬프 ns, 센서 ID, 값). 아직 없으면 None"""
+        sample = self.stream.latest()
+        if sample is None:
+            return None
+        return self._tagged([sample])[0]
+
+    def since(self, seq):
+        """일련번호 seq 이후에 수집된 모든 센서의 샘플 목록 (수집 순서)"""
+        return self._tagged(self.stream.since(seq))
+
+    def snapshot(self, n):
+        """모든 센서를 합친 최근 n개 샘플 목록"""
+        return self._tagged(self.stream.snapshot(n))
+
+    def getStats(self):
+        """센서 ID별 읽은 변환 수, 놓친 변환 수, 타임아웃 수"""
+        return dict((state.sensorId, {
+            'samples': state.sampleCount,
+            'missed': state.missedCount,
+            'timeouts': state.timeoutCount,
+            'busy': state.busyCount,
+            'period': state.hx.readyWaiter.period,
+        }) for state in self.states)
@@ -0,0 +1,104 @@
+from array import array
+from bisect import bisect_left
+
+'''
+Per-stage timing of every read, kept in fixed power-of-two histograms.
+
+The drivers keep a ReadStats in hx.stats only while stats are enabled
+(enable_stats()/enableStats()); when it is None the only cost per read is one
+attribute check.  Stages, all in nanoseconds:
+
+- lockWait: time spent acquiring readLock
+- wait: time waiting for DOUT to go low
+- clockOut: duration of the whole 24+N pulse clock-out
+- sckHigh: the longest single PD_SCK high interval of each clock-out
+  (over 60 us powers the HX711 down)
+- decode: time spent turning the raw bytes into a signed value
+
+Buckets are powers of two from 1 us to about 4 s, so the percentiles in a
+snapshot are upper bounds with 2x resolution.
+'''
+
+
+class Histogram:
+    """2의 거듭제곱 경계(ns)를 가진 고정 버킷 히스토그램"""
+
+    # 버킷 상한: 1us, 2us, 4us ... 약 4.2초. 마지막 버킷은 그 이상 전부
+    EDGES = [1000 << i for i in range(23)]
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = array('q', [0]) * (len(self.EDGES) + 1)
+        self.count = 0
+        self.totalNs = 0
+        self.minNs = None
+        self.maxNs = 0
+
+    def add(self, valueNs):
+        """값 하나를 기록"""
+        self.counts[bisect_left(self.EDGES, valueNs)] += 1
+        self.count += 1
+        self.totalNs += valueNs
+        if valueNs > self.maxNs:
+            self.maxNs = valueNs
+        if self.minNs is None or valueNs < self.minNs:
+            self.minNs = valueNs
+
+    def percentile(self, fraction):
+        """fraction 위치의 값이 들어 있는 버킷의 상한 (ns). 기록이 없으면 None"""
+        if self.count == 0:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target and count:
+                if index < len(self.EDGES):
+                    return min(self.EDGES[index], self.maxNs)
+                return self.maxNs
+        return self.maxNs
+
+    def snapshot(self):
+        """기록 요약 (개수, 최소/평균/최대, 백분위 상한, 0이 아닌 버킷 목록)"""
+        edges = self.EDGES
+        return {
+            'count': self.count,
+            'minNs': self.minNs,
+            'meanNs': self.totalNs / self.count if self.count else None,
+            'maxNs': self.maxNs if self.count else None,
+            'p50Ns': self.percentile(0.5),
+            'p99Ns': self.percentile(0.99),
+            'buckets': [(edges[index] if index < len(edges) else None, count)
+                        for index, count in enumerate(self.counts) if count],
+        }
+
+
+class ReadStats:
+    """읽기 단계별 시간 히스토그램과 카운터"""
+
+    STAGES = ('lockWait', 'wait', 'clockOut', 'sckHigh', 'decode')
+
+    def __init__(self):
+        self.lockWait = Histogram()
+        self.wait = Histogram()
+        self.clockOut = Histogram()
+        self.sckHigh = Histogram()
+        self.decode = Histogram()
+        self.reads = 0
+        self.timeouts = 0
+
+    def reset(self):
+        """모든 히스토그램과 카운터 초기화"""
+        for stage in self.STAGES:
+            getattr(self, stage).reset()
+        self.reads = 0
+        self.timeouts = 0
+
+    def snapshot(self):
+        """현재 값을 복사한 딕셔너리"""
+        result = dict((stage, getattr(self, stage).snapshot()) for stage in self.STAGES)
+        result['reads'] = self.reads
+        result['timeouts'] = self.timeouts
+        return result
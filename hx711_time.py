@@ -0,0 +1,67 @@
+'''
+Injectable clocks for time-dependent code.
+
+Code that takes a `clock` argument only calls the time module's own names
+(monotonic, monotonic_ns, perf_counter, perf_counter_ns, time, time_ns,
+sleep), so the time module itself is the real clock and is the default.
+SimulatedClock has the same names but its time only moves when something
+sleeps on it or calls advance(): a sleep returns at once, so hours of
+emulated sensor data (hx711_emulator.HX711(clock=SimulatedClock())) run as
+fast as the pipeline can process them, and every run gives the same
+timestamps.
+
+A simulated clock is meant to be driven from one thread.  Threads that sleep
+on it concurrently each move it forward, which is not a meaningful schedule.
+'''
+
+
+class SimulatedClock:
+    """sleep() 또는 advance()로만 흐르는 가상 시계. time 모듈과 같은 이름의 함수를 제공"""
+
+    def __init__(self, startNs=0, epoch=0.0):
+        """startNs: 시작 시각 (monotonic_ns 값), epoch: monotonic 0에 해당하는 time() 값 (유닉스 시각, 초)"""
+        self.nowNs = startNs
+        self.epoch = epoch
+        # sleep() 호출 수와 잠든 시간 합계 (ns)
+        self.sleepCount = 0
+        self.sleptNs = 0
+
+    def monotonic_ns(self):
+        return self.nowNs
+
+    perf_counter_ns = monotonic_ns
+
+    def monotonic(self):
+        return self.nowNs / 1e9
+
+    perf_counter = monotonic
+
+    def time(self):
+        return self.epoch + self.nowNs / 1e9
+
+    def time_ns(self):
+        return int(self.epoch * 1e9) + self.nowNs
+
+    def sleep(self, seconds):
+        """seconds만큼 시계를 앞당기고 바로 반환"""
+        if seconds < 0:
+            raise ValueError("sleep length must be non-negative")
+        self.sleepCount += 1
+        self.sleptNs += self.advance(seconds)
+
+    def advance(self, seconds):
+        """seconds만큼 시계를 앞당김. 실제로 앞당긴 시간(ns)을 반환"""
+        return self.advanceNs(round(seconds * 1e9))
+
+    def advanceNs(self, ns):
+        """ns만큼 시계를 앞당김"""
+        if ns < 0:
+            raise ValueError("SimulatedClock::advanceNs() can't go back in time!")
+        self.nowNs += ns
+        return ns
+
+    def advanceTo(self, nowNs):
+        """nowNs 시각까지 시계를 앞당김 (이미 지났으면 그대로)"""
+        if nowNs > self.nowNs:
+            self.nowNs = nowNs
+
@@ -1,47 +1,115 @@
-import RPi.GPIO as GPIO
 import time
 import threading
 
+from hx711_gpio import loadDefaultGPIO
+from hx711_ready import makeReadyWaiter, HX711TimeoutError
+from hx711_acquisition import SampleRing, AcquisitionThread
+from hx711_clockout import makeClockOut, makeTimedClockOut, makeBytesDecoder
+from hx711_integrity import ReadChecker
+from hx711_realtime import RealtimeMode
+from hx711_stats import ReadStats
+
 class HX711:
 
-    def __init__(self, dout, pd_sck, gain=128):
+    def __init__(self, dout, pd_sck, gain=128, gpio=None, clock=time):
         """HX711 초기화. Gain 값 설정, GPIO 핀 모드 설정, 참조 및 오프셋 값 초기화"""
+        self._initState(dout, pd_sck, clock)
+
+        # GPIO 백엔드 (RPi.GPIO와 같은 인터페이스, 기본값은 RPi.GPIO)
+        if gpio is None:
+            gpio = loadDefaultGPIO()
+        self.GPIO = gpio
+
+        # GPIO 초기화
+        self.GPIO.setmode(self.GPIO.BCM)
+        self.GPIO.setup(self.PD_SCK, self.GPIO.OUT)
+        self.GPIO.setup(self.DOUT, self.GPIO.IN)
+
+        # 핀 함수를 미리 묶어 둔 읽기 루프
+        self._setClockOut(makeClockOut(self.GPIO, self.DOUT, self.PD_SCK))
+
+        # 손상이 의심되는 읽기는 다음 변환에서 다시 읽음 (None이면 검사하지 않음)
+        self.readChecker = ReadChecker(self.GPIO, self.DOUT)
+
+        # DOUT 대기 전략. 센서가 분리되면 readyTimeout 뒤 HX711TimeoutError 발생
+        self.readyWaiter = makeReadyWaiter(self.GPIO, self.DOUT, self.isReady)
+
+        # PD_SCK를 LOW로 두면 절전 중이던 칩도 깨어남. 첫 변환은 DOUT 준비를 기다리는 첫 읽기에서 받음
+        self.GPIO.output(self.PD_SCK, False)
+        self.setGain(gain)         # 초기 이득(gain) 설정
+
+    def _initState(self, dout, pd_sck, clock):
+        """GPIO, 읽기 루프, 손상 검사, DOUT 대기 전략을 뺀 드라이버 상태 초기화 (에뮬레이터와 공유)"""
         self.PD_SCK = pd_sck  # SCK 핀
         self.DOUT = dout      # DOUT 핀
         self.readLock = threading.Lock()
 
-        # GPIO 초기화
-        GPIO.setmode(GPIO.BCM)
-        GPIO.setup(self.PD_SCK, GPIO.OUT)
-        GPIO.setup(self.DOUT, GPIO.IN)
+        # 시계 (time 모듈 또는 hx711_time.SimulatedClock). 시간 측정과 대기에 사용
+        self.clock = clock
+
+        # 읽기 형식별 바이트 변환 함수
+        self.byteFormat = 'MSB'
+        self.bitFormat = 'MSB'
+        self._bytesDecoder = makeBytesDecoder(self.byteFormat, self.bitFormat)
 
-        # 보정값 및 참조값 초기화
+        # 단계별 시간 통계 (enableStats()로 켬, None이면 꺼짐)
+        self.stats = None
+        self._untimedClockOut = None
+
+        # 읽기 루프를 감싸는 함수 (setClockOutWrapper(), None이면 그대로)와 감싸기 전 읽기 루프
+        self._clockOutWrapper = None
+        self._baseClockOut = None
+
+        # 채널별 보정값 및 참조값 초기화 (채널 B는 항상 Gain 32)
         self.REFERENCE_UNIT_A = 1  # 기준 단위
         self.OFFSET_A = 1          # 오프셋 값
+        self.QUADRATIC_A = 0.0     # 2차 보정 계수 (hx711_calibration 프로파일용, 0이면 선형)
+        self.REFERENCE_UNIT_B = 1
+        self.OFFSET_B = 1
+        self.QUADRATIC_B = 0.0
         self.GAIN = None
-        self.setGain(gain)         # 초기 이득(gain) 설정
-        time.sleep(1)
+
+        # DOUT 대기 타임아웃(초)
+        self.readyTimeout = 1.0
+        self.lastReadyNs = 0  # 마지막으로 DOUT 준비를 확인한 시각 (time.monotonic_ns)
+
+        # 백그라운드 수집 엔진 (startAcquisition()으로 시작)
+        self.ring = None
+        self.acquisitionThread = None
+
+        # 변환마다 무게에 적용할 스트리밍 필터 (hx711_filters)와 마지막 결과
+        self.weightFilter = None
+        self.filteredWeight = None
+
+        # 칩이 다음 변환에 쓸 Gain 펄스 수 (None이면 모름). 전원이 켜지면 채널 A, Gain 128이지만
+        # 앞서 실행된 프로그램이 다른 Gain을 예약해 두었을 수 있으므로 첫 읽기는 Gain만 보내고 버림
+        self.chipGainPulses = None
+        # 마지막으로 읽은 변환의 Gain 펄스 수 (1: A/128, 2: B/32, 3: A/64)
+        self.lastGainPulses = 1
+
+        # 읽을 때마다 다음 변환의 채널을 고르는 스케줄 (hx711_channels.ChannelScheduler, None이면 GAIN 고정)
+        self.channelSchedule = None
+
         self.lastVal = int(0)
 
     def powerDown(self):
         """HX711 모듈을 절전 모드로 전환"""
         self.readLock.acquire()
-        GPIO.output(self.PD_SCK, False)
-        GPIO.output(self.PD_SCK, True)
-        time.sleep(0.0001)
+        self.GPIO.output(self.PD_SCK, False)
+        self.GPIO.output(self.PD_SCK, True)
+        self.clock.sleep(0.0001)
         self.readLock.release()
 
     def powerUp(self):
         """HX711 모듈을 다시 활성화"""
         self.readLock.acquire()
-        GPIO.output(self.PD_SCK, False)
-        time.sleep(0.0001)
+        self.GPIO.output(self.PD_SCK, False)
+        self.readyWaiter.reset()
+        # 전원이 켜지면 Gain이 128로 돌아감. 다른 Gain이면 다음 읽기가 한 변환을 버림
+        self.chipGainPulses = 1
+        self.clock.sleep(0.0001)
         self.readLock.release()
 
-        # Gain이 128이 아닌 경우 다시 읽어들임
-        if self.getGain() != 128:
-            self.readRawBytes()
-
     def reset(self):
         """모듈 재설정"""
         self.powerDown()
@@ -49,10 +117,11 @@ class HX711:
 
     def isReady(self):
         """DOUT 핀 상태를 확인하여 데이터가 준비되었는지 반환"""
-        return GPIO.input(self.DOUT) == GPIO.LOW
+        return self.GPIO.input(self.DOUT) == self.GPIO.LOW
 
     def setGain(self, gain):
-        """Gain 값 설정 (128, 64, 32 지원)"""
+        """Gain 값 설정 (128, 64, 32 지원). 칩에는 다음 읽기의 Gain 펄스로 전달되고,
+        그 전에 변환된 값은 readRawBytes()가 버림"""
         if gain == 128:
             self.GAIN = 1
         elif gain == 64:
@@ -61,11 +130,14 @@ class HX711:
             self.GAIN = 2
         else:
             return False
-        self.reset()
-        GPIO.output(self.PD_SCK, False)
-        self.readRawBytes()
         return True
 
+    def setReadingFormat(self, byteFormat="MSB", bitFormat="MSB"):
+        """바이트 순서와 바이트 안의 비트 순서 설정 (데이터시트 기준은 MSB, MSB)"""
+        self._bytesDecoder = makeBytesDecoder(byteFormat, bitFormat)
+        self.byteFormat = byteFormat
+        self.bitFormat = bitFormat
+
     def getGain(self):
         """현재 설정된 Gain 값을 반환"""
         if self.GAIN == 1:
@@ -78,9 +150,9 @@ class HX711:
 
     def readNextBit(self):
         """1비트씩 읽어들임"""
-        GPIO.output(self.PD_SCK, True)
-        GPIO.output(self.PD_SCK, False)
-        bitValue = GPIO.input(self.DOUT)
+        self.GPIO.output(self.PD_SCK, True)
+        self.GPIO.output(self.PD_SCK, False)
+        bitValue = self.GPIO.input(self.DOUT)
         return int(bitValue)
 
     def readNextByte(self):
@@ -91,26 +163,112 @@ class HX711:
             byteValue |= self.readNextBit()
         return byteValue
 
-    def readRawBytes(self):
-        """데이터 준비 상태에서 3바이트의 원시 데이터를 읽어옴"""
+    def readRawBytes(self, timeout=None, nextGainPulses=None):
+        """데이터 준비 상태에서 3바이트의 원시 데이터를 읽어옴.
+        nextGainPulses: 다음 변환의 채널/Gain을 정할 펄스 수 (None이면 channelSchedule 또는 GAIN).
+        읽은 변환의 Gain 펄스 수는 lastGainPulses에 남음"""
         if self.GAIN is None:
             raise ValueError("HX711::readRawBytes() called without setting gain first!")
-        self.readLock.acquire()
+        if timeout is None:
+            timeout = self.readyTimeout
+        stats = self.stats
 
-        while self.isReady() is not True:
-            pass
-
-        # 3바이트의 원시 데이터 읽기
-        firstByte = self.readNextByte()
-        secondByte = self.readNextByte()
-        thirdByte = self.readNextByte()
-
-        # Gain에 맞춰 추가 비트 읽기
-        for i in range(self.GAIN):
-            self.readNextBit()
-
-        self.readLock.release()
-        return [firstByte, secondByte, thirdByte]
+        if stats is None:
+            self.readLock.acquire()
+        else:
+            clock = self.clock.perf_counter_ns
+            startNs = clock()
+            self.readLock.acquire()
+            stats.lockWait.add(clock() - startNs)
+        try:
+            return self._readRawBytes(timeout, nextGainPulses, True)
+        finally:
+            self.readLock.release()
+
+    def readReadyRawBytes(self):
+        """DOUT 준비를 이미 확인한 (readyWaiter.noteReady()) 변환 하나를 기다리지 않고 읽음 (hx711_scheduler용).
+        손상 검사, 통계, 채널 스케줄, lastGainPulses와 lastReadyNs는 readRawBytes()와 같음.
+        다른 스레드가 읽는 중이면 False, Gain만 바꾸고 버렸거나 손상이 의심되는 변환이면 None을 반환 (다음 변환을 다시 읽음)"""
+        if self.GAIN is None:
+            raise ValueError("HX711::readReadyRawBytes() called without setting gain first!")
+        if not self.readLock.acquire(False):
+            return False
+        try:
+            return self._readRawBytes(None, None, False)
+        finally:
+            self.readLock.release()
+
+    def _readRawBytes(self, timeout, nextGainPulses, wait):
+        """readLock을 쥔 채로 변환을 읽음. wait가 거짓이면 준비를 기다리지 않고, 다시 읽어야 하면 None을 반환"""
+        stats = self.stats
+        clock = self.clock.perf_counter_ns
+        checker = self.readChecker
+        retries = checker.maxRetries if checker is not None else 0
+
+        # 펄스를 직접 고르는 읽기는 채널을 lastGainPulses로 알려 주므로 다른 Gain의 변환도 그대로 반환
+        schedule = self.channelSchedule
+        plain = nextGainPulses is None and schedule is None
+
+        attempt = 0
+        while True:
+            # 변환 주기 대부분은 잠들고 준비 예상 시각 근처에서만 폴링
+            startNs = clock()
+            if wait:
+                try:
+                    self.readyWaiter.wait(timeout)
+                except HX711TimeoutError:
+                    if stats is not None:
+                        stats.timeouts += 1
+                    raise
+            self.lastReadyNs = self.readyWaiter.readyNs
+
+            # 24비트 데이터와 다음 변환의 채널/Gain을 정하는 펄스(1~3개)를 한 루프에서 읽기
+            if nextGainPulses is not None:
+                pulses = nextGainPulses
+            elif schedule is not None:
+                pulses = schedule.nextPulses()
+            else:
+                pulses = self.GAIN
+            # 변환의 Gain을 모르거나 (손상된 읽기 직후), 일반 읽기인데 Gain이 다르면 (setGain() 또는 powerUp() 직후)
+            # 읽어서 Gain만 바꾸고 버림
+            gainPulses = self.chipGainPulses
+            discard = gainPulses is None or (plain and gainPulses != self.GAIN)
+            readyNs = clock()
+            rawValue = self._clockOut(24 + pulses)
+            durationNs = clock() - readyNs
+            self.chipGainPulses = pulses
+            if stats is not None:
+                stats.wait.add(readyNs - startNs)
+                stats.clockOut.add(durationNs)
+                stats.reads += 1
+
+            if discard:
+                # 읽는 도중 칩이 절전됐다면 보낸 Gain 펄스가 적용되지 않았으므로 다음 변환의 Gain도 모름
+                if checker is not None and attempt < retries and checker.check(rawValue, durationNs) is not None:
+                    attempt += 1
+                    checker.retryCount += 1
+                    if pulses != 1:
+                        self.chipGainPulses = None
+                if not wait:
+                    return None
+                continue
+
+            # 손상이 의심되면 다음 변환에서 다시 읽음
+            if checker is None or checker.check(rawValue, durationNs) is None:
+                break
+            # 읽는 도중 칩이 절전됐다면 채널 A, Gain 128로 돌아갔으므로 다음 변환의 Gain을 알 수 없음
+            if pulses != 1:
+                self.chipGainPulses = None
+            if attempt == retries:
+                checker.failedCount += 1
+                break
+            attempt += 1
+            checker.retryCount += 1
+            if not wait:
+                return None
+
+        self.lastGainPulses = gainPulses
+        return self._bytesDecoder(rawValue)
 
     def convertFromTwosComplement24bit(self, inputValue):
         """2의 보수법을 사용하여 24비트 데이터를 부호있는 정수로 변환"""
@@ -120,7 +278,16 @@ class HX711:
         """읽은 바이트 배열을 정수값으로 변환"""
         if rawBytes is None:
             return None
-
+        if self.stats is not None:
+            clock = self.clock.perf_counter_ns
+            startNs = clock()
+            value = self._rawBytesToLong(rawBytes)
+            self.stats.decode.add(clock() - startNs)
+            return value
+        return self._rawBytesToLong(rawBytes)
+
+    def _rawBytesToLong(self, rawBytes):
+        """rawBytesToLong()의 변환 부분"""
         twosComplementValue = ((rawBytes[0] << 16) |
                                (rawBytes[1] << 8)  |
                                rawBytes[2])
@@ -129,6 +296,59 @@ class HX711:
         self.lastVal = signed_int_value
         return int(signed_int_value)
 
+    def enableStats(self):
+        """단계별 시간 통계 수집 시작. PD_SCK HIGH 구간도 재는 읽기 루프로 바뀜"""
+        if self.stats is not None:
+            return
+        stats = ReadStats()
+        with self.readLock:
+            self._untimedClockOut = self._baseClockOut
+            self._setClockOut(makeTimedClockOut(self.GPIO, self.DOUT, self.PD_SCK,
+                                                stats.sckHigh, self.clock.perf_counter_ns))
+            self.stats = stats
+
+    def disableStats(self):
+        """통계 수집을 멈추고 원래 읽기 루프로 되돌림"""
+        if self.stats is None:
+            return
+        with self.readLock:
+            self._setClockOut(self._untimedClockOut)
+            self._untimedClockOut = None
+            self.stats = None
+
+    def setClockOutWrapper(self, wrapper):
+        """읽기 루프를 감쌀 함수 (읽기 루프 -> 읽기 루프, 예: hx711_realtime의 GC 정지) 설정. None이면 해제.
+        enableStats()/disableStats()로 읽기 루프가 바뀌어도 유지됨"""
+        with self.readLock:
+            self._clockOutWrapper = wrapper
+            self._setClockOut(self._baseClockOut)
+
+    def _setClockOut(self, clockOut):
+        """감싸기 전 읽기 루프를 바꾸고, 감싸는 함수가 있으면 적용해 읽기에 쓸 함수로 설정 (readLock 안에서 호출)"""
+        self._baseClockOut = clockOut
+        wrapper = self._clockOutWrapper
+        self._clockOut = clockOut if wrapper is None else wrapper(clockOut)
+
+    def getStats(self):
+        """단계별 시간 히스토그램과 읽기 검사 카운터. 통계가 꺼져 있으면 검사 카운터만"""
+        result = {'enabled': self.stats is not None}
+        if self.stats is not None:
+            result.update(self.stats.snapshot())
+        if self.readChecker is not None:
+            result['checks'] = self.readChecker.getStats()
+        return result
+
+    def resetStats(self):
+        """통계와 읽기 검사 카운터 초기화"""
+        if self.stats is not None:
+            self.stats.reset()
+        if self.readChecker is not None:
+            self.readChecker.resetCounters()
+
+    def getRawBytes(self):
+        """다음 변환의 원시 바이트를 읽어옴 (readRawBytes와 같음)"""
+        return self.readRawBytes()
+
     def getLong(self):
         """원시 바이트 데이터를 정수로 반환"""
         rawBytes = self.readRawBytes()
@@ -136,35 +356,98 @@ class HX711:
             return None
         return self.rawBytesToLong(rawBytes)
 
-    def setOffset(self, offset):
-        """오프셋 값 설정"""
-        self.OFFSET_A = offset
+    def setOffset(self, offset, channel='A'):
+        """채널('A' 또는 'B')의 오프셋 값 설정"""
+        if channel == 'B':
+            self.OFFSET_B = offset
+        else:
+            self.OFFSET_A = offset
 
-    def getOffset(self):
-        """오프셋 값 반환"""
+    def getOffset(self, channel='A'):
+        """채널의 오프셋 값 반환"""
+        if channel == 'B':
+            return self.OFFSET_B
         return self.OFFSET_A
 
-    def setReferenceUnit(self, referenceUnit):
-        """기준 단위 설정"""
-        self.REFERENCE_UNIT_A = referenceUnit
+    def setReferenceUnit(self, referenceUnit, channel='A'):
+        """채널의 기준 단위 설정"""
+        if channel == 'B':
+            self.REFERENCE_UNIT_B = referenceUnit
+        else:
+            self.REFERENCE_UNIT_A = referenceUnit
 
-    def getReferenceUnit(self):
-        """기준 단위 반환"""
+    def getReferenceUnit(self, channel='A'):
+        """채널의 기준 단위 반환"""
+        if channel == 'B':
+            return self.REFERENCE_UNIT_B
         return self.REFERENCE_UNIT_A
 
-    def rawBytesToWeight(self, rawBytes=None):
-        """원시 바이트 데이터를 무게(kg)로 변환"""
+    def setQuadratic(self, quadratic, channel='A'):
+        """채널의 2차 보정 계수 설정 (무게에 계수 * (값 - 오프셋)^2을 더함)"""
+        if channel == 'B':
+            self.QUADRATIC_B = quadratic
+        else:
+            self.QUADRATIC_A = quadratic
+
+    def getQuadratic(self, channel='A'):
+        """채널의 2차 보정 계수 반환"""
+        if channel == 'B':
+            return self.QUADRATIC_B
+        return self.QUADRATIC_A
+
+    def rawBytesToLongWithOffset(self, rawBytes=None):
+        """원시 바이트 데이터를 오프셋이 적용된 정수값으로 변환"""
+        if rawBytes is None:
+            return None
+        return self.rawBytesToLong(rawBytes) - self.getOffset()
+
+    def rawBytesToWeight(self, rawBytes=None, channel='A'):
+        """원시 바이트 데이터를 채널의 보정값으로 무게(kg)로 변환"""
         if rawBytes is None:
             return None
+        return self.longToWeight(self.rawBytesToLong(rawBytes), channel)
 
+    def longToWeight(self, longValue, channel='A'):
+        """부호있는 정수값(링 버퍼의 값 등)을 채널의 보정값으로 무게(kg)로 변환"""
         # 오프셋을 적용한 후 참조 단위로 나눠 무게 계산
-        longWithOffset = self.rawBytesToLong(rawBytes) - self.getOffset()
-        referenceUnit = self.getReferenceUnit()
+        longWithOffset = longValue - self.getOffset(channel)
+        referenceUnit = self.getReferenceUnit(channel)
 
         # 무게를 kg 단위로 변환
         weight = longWithOffset / referenceUnit
+        quadratic = self.getQuadratic(channel)
+        if quadratic:
+            weight += quadratic * longWithOffset * longWithOffset
         return weight
 
+    def lastReadMatchesGain(self):
+        """마지막으로 읽은 변환이 설정된 Gain(채널)으로 만들어졌는지 여부.
+        ChannelScheduler가 채널을 바꿔 가며 읽는 동안 한 채널만 쓰는 콜백이 다른 채널 샘플을 거를 때 사용"""
+        return self.lastGainPulses == self.GAIN
+
+    def setWeightFilter(self, weightFilter):
+        """변환마다 무게에 적용할 필터 설정 (None이면 해제). 수집 중이면 모든 변환에 적용됨"""
+        if self.weightFilter is not None and self.acquisitionThread is not None:
+            self.disableReadyCallback(self.filterWeight)
+        self.weightFilter = weightFilter
+        self.filteredWeight = None
+        if weightFilter is not None and self.acquisitionThread is not None:
+            self.enableReadyCallback(self.filterWeight)
+
+    def filterWeight(self, rawBytes):
+        """원시 바이트를 무게로 바꿔 필터에 넣고 필터링된 무게를 반환. 다른 채널의 변환이면 필터를 건드리지 않음"""
+        if not self.lastReadMatchesGain():
+            return self.filteredWeight
+        weight = self.rawBytesToWeight(rawBytes)
+        if self.weightFilter is not None:
+            weight = self.weightFilter.update(weight)
+        self.filteredWeight = weight
+        return weight
+
+    def getFilteredWeight(self):
+        """변환 하나를 읽어 필터를 갱신하고 필터링된 무게를 반환"""
+        return self.filterWeight(self.readRawBytes())
+
     def getWeight(self):
         """현재 센서에서 측정한 무게를 반환"""
         rawBytes = self.readRawBytes()
@@ -178,6 +461,11 @@ class HX711:
         rawBytes = self.readRawBytes()
         self.setOffset(self.rawBytesToLong(rawBytes))
 
+    def autosetOffset(self, times=5):
+        """여러 번 읽은 값의 중앙값으로 오프셋 자동 설정"""
+        values = sorted(self.getLong() for i in range(times))
+        self.setOffset(values[len(values) // 2])
+
     def calibrate(self, knownWeight):
         """보정: 알고 있는 무게로 참조 단위를 설정"""
         rawBytes = self.readRawBytes()
@@ -187,19 +475,64 @@ class HX711:
         self.setReferenceUnit(measuredValue / knownWeight)
 
 
-# 예시 코드: 20kg 로드셀에서 무게 측정
-dout_pin = 5  # DOUT 핀 번호
-pd_sck_pin = 6  # SCK 핀 번호
-hx = HX711(dout_pin, pd_sck_pin)
+    def startAcquisition(self, bufferSize=1024, realtime=None):
+        """백그라운드 수집 스레드 시작. 모든 변환을 타임스탬프와 함께 링 버퍼에 기록.
+        realtime: True 또는 RealtimeMode면 수집 스레드를 실시간 모드로 실행 (getRealtimeReport()로 결과 확인)"""
+        if self.acquisitionThread is not None:
+            return
+        if realtime is True:
+            realtime = RealtimeMode()
+        elif realtime is False:
+            realtime = None
+        self.ring = SampleRing(bufferSize)
+        self.acquisitionThread = AcquisitionThread(self, self.ring, realtime=realtime)
+        if self.weightFilter is not None:
+            self.acquisitionThread.callbacks.append(self.filterWeight)
+        self.acquisitionThread.start()
+
+    def stopAcquisition(self):
+        """백그라운드 수집 스레드 종료"""
+        if self.acquisitionThread is None:
+            return
+        self.acquisitionThread.stop()
+        self.acquisitionThread = None
+
+    def getRealtimeReport(self):
+        """실시간 모드에서 실제로 적용된 설정 (CPU 고정, 스케줄러, 메모리 고정, gc). 실시간 모드가 아니면 None"""
+        if self.acquisitionThread is None:
+            return None
+        return self.acquisitionThread.realtimeReport
+
+    def enableReadyCallback(self, callback):
+        """변환이 준비될 때마다 수집 스레드에서 callback(rawBytes) 호출"""
+        self.startAcquisition()
+        self.acquisitionThread.callbacks.append(callback)
+
+    def disableReadyCallback(self, callback=None):
+        """등록된 콜백 해제. callback이 None이면 모두 해제"""
+        if self.acquisitionThread is None:
+            return
+        callbacks = self.acquisitionThread.callbacks
+        if callback is None:
+            del callbacks[:]
+        elif callback in callbacks:
+            callbacks.remove(callback)
+
+    def latest(self):
+        """가장 최근 샘플 (일련번호, 타임스탬프 ns, 값). 변환을 기다리지 않음"""
+        if self.ring is None:
+            return None
+        return self.ring.latest()
 
-# 초기 보정값 설정 (tare)
-hx.tare()
+    def since(self, seq):
+        """일련번호 seq 이후에 수집된 샘플 목록. 변환을 기다리지 않음"""
+        if self.ring is None:
+            return []
+        return self.ring.since(seq)
 
-# 알고 있는 무게로 기준 단위 설정 (예: 10kg 물체)
-known_weight = 10.0
-hx.calibrate(known_weight)
+    def snapshot(self, n):
+        """최근 n개 샘플 목록. 변환을 기다리지 않음"""
+        if self.ring is None:
+            return []
+        return self.ring.snapshot(n)
 
-while True:
-    weight = hx.getWeight()  # 현재 측정된 무게
-    print(f"현재 무게: {weight:.2f} kg")
-    time.sleep(1)  # 1초마다 측정값 출력
@@ -0,0 +1,475 @@
+import io
+import os
+import time
+import wave
+import heapq
+import threading
+from collections import OrderedDict, namedtuple
+
+from hx711_stats import Histogram
+from pedal_events import RAPID_ACCELERATION, HARD_BRAKE, NO_BRAKE, STOP
+
+try:
+    import miniaudio
+except ImportError:
+    miniaudio = None
+
+'''
+Voice alerts for pedal events, played from a worker thread.
+
+The clips that ship with the repository are MP3 files with ID3 tags, whatever
+their extension says, so the format of every clip is detected from its first
+bytes (detectFormat()).  Clips are decoded once, at start(), into 16-bit PCM
+held in a ClipCache bounded in bytes (least recently used clips are decoded
+again if they were evicted).  MP3 needs the optional `miniaudio` package;
+without it WAV clips still decode with the standard library and MP3 clips are
+reported in AlertPlayer.unavailable instead of failing at alert time.
+
+AlertPlayer.alert() only pushes onto a priority queue under a lock, so it can
+be called from the acquisition thread (AlertPlayer.onEvent is a
+PedalEventDetector listener).  The worker plays the highest priority alert
+first (0 is the highest), and
+
+- an alert of a kind that is already queued, or that started playing less
+  than dedupeWindow seconds ago, is dropped (deduplicated);
+- two clips start at least minGap seconds apart (rate limit), unless the
+  second has a higher priority than the first;
+- an alert still queued after maxAge seconds is dropped as stale;
+- with preempt=True a higher priority alert stops the clip that is playing;
+- at most maxQueue alerts wait; when full the lowest priority one is dropped.
+
+Sinks play one clip at a time: MiniaudioSink plays through the default output
+device, NullSink and RecordingSink play nothing (RecordingSink keeps what
+would have played and when, and can take as long as the clip would), so
+latency and ordering can be checked headless.  benchmark_alerts.py does that.
+
+Usage:
+    player = AlertPlayer(MiniaudioSink())
+    player.start()
+    detector.listeners.append(player.onEvent)
+'''
+
+# 이벤트 종류별 (우선순위, 클립 파일 목록). 같은 이벤트가 다시 나면 다음 클립을 재생
+DEFAULT_ALERTS = {
+    NO_BRAKE: (0, ('nobrake_1.wav', 'nobrake_2.wav', 'nobrake_3.wav')),
+    HARD_BRAKE: (1, ('speedless_1.wav', 'speedless_2.wav')),
+    RAPID_ACCELERATION: (2, ('rapid_acceleration.wav', 'rapidspeed_1.wav', 'rapidspeed_2.wav',
+                             'rapidspeed_3.wav', 'rapidspeed_4.wav')),
+    STOP: (3, ('carstop_1.wav', 'carstop_2.wav')),
+}
+
+SAMPLE_RATE = 24000
+CHANNELS = 1
+
+# MPEG 오디오 프레임 헤더 해석용 표 (Layer III만)
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {
+    3: (1, (44100, 48000, 32000)),    # MPEG 1
+    2: (2, (22050, 24000, 16000)),    # MPEG 2
+    0: (2, (11025, 12000, 8000)),     # MPEG 2.5
+}
+
+# name: 클립 이름, pcm: 부호있는 16비트 PCM (bytes), sampleRate/channels: 형식
+Clip = namedtuple('Clip', ['name', 'pcm', 'sampleRate', 'channels'])
+
+
+def clipDuration(clip):
+    """클립 재생 시간 (초)"""
+    return len(clip.pcm) / (2 * clip.channels * clip.sampleRate)
+
+
+class ClipFormatError(ValueError):
+    """클립 형식을 알 수 없거나 디코딩할 수 없을 때 발생"""
+
+
+def _id3Size(data):
+    """ID3v2 태그 길이 (태그가 없으면 0)"""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    # 푸터 플래그가 있으면 10바이트 더
+    return 10 + size + (10 if data[5] & 0x10 else 0)
+
+
+def _mp3Frame(data, position):
+    """position의 MPEG Layer III 프레임 헤더를 (길이, 샘플레이트, 채널 수, 프레임당 샘플 수)로. 아니면 None"""
+    if position + 4 > len(data) or data[position] != 0xff or data[position + 1] & 0xe0 != 0xe0:
+        return None
+    version = (data[position + 1] >> 3) & 3
+    layer = (data[position + 1] >> 1) & 3
+    bitrateIndex = data[position + 2] >> 4
+    rateIndex = (data[position + 2] >> 2) & 3
+    if version == 1 or layer != 1 or bitrateIndex in (0, 15) or rateIndex == 3:
+        return None
+    family, rates = _MP3_SAMPLE_RATES[version]
+    sampleRate = rates[rateIndex]
+    bitrate = _MP3_BITRATES[family][bitrateIndex] * 1000
+    padding = (data[position + 2] >> 1) & 1
+    channels = 1 if data[position + 3] >> 6 == 3 else 2
+    samples = 1152 if family == 1 else 576
+    return samples // 8 * bitrate // sampleRate + padding, sampleRate, channels, samples
+
+
+def detectFormat(data):
+    """파일 앞부분으로 실제 형식을 판별: 'wav', 'mp3', 'ogg', 'flac' 또는 None (확장자는 보지 않음)"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        return 'wav'
+    if data[:4] == b'OggS':
+        return 'ogg'
+    if data[:4] == b'fLaC':
+        return 'flac'
+    if _mp3Frame(data, _id3Size(data)) is not None:
+        return 'mp3'
+    return None
+
+
+def probeMp3(data):
+    """MP3 프레임 헤더만 읽어 (샘플레이트, 채널 수, 재생 시간(초))을 반환 (디코더 불필요)"""
+    position = _id3Size(data)
+    frames = samples = 0
+    sampleRate = channels = None
+    while True:
+        frame = _mp3Frame(data, position)
+        if frame is None:
+            break
+        length, sampleRate, channels, frameSamples = frame
+        frames += 1
+        samples += frameSamples
+        position += length
+    if not frames:
+        raise ClipFormatError("No MPEG audio frames found!")
+    return sampleRate, channels, samples / sampleRate
+
+
+def decodeClip(name, data, sampleRate=SAMPLE_RATE, channels=CHANNELS):
+    """클립 데이터를 실제 형식에 맞게 디코딩. miniaudio가 있으면 sampleRate/channels로 변환함"""
+    format = detectFormat(data)
+    if format is None:
+        raise ClipFormatError("%s: unknown audio format!" % name)
+    if miniaudio is not None:
+        decoded = miniaudio.decode(data, miniaudio.SampleFormat.SIGNED16, channels, sampleRate)
+        return Clip(name, decoded.samples.tobytes(), decoded.sample_rate, decoded.nchannels)
+    if format != 'wav':
+        raise ClipFormatError("%s: %s needs the miniaudio package to decode!" % (name, format))
+    with wave.open(io.BytesIO(data)) as reader:
+        if reader.getsampwidth() != 2:
+            raise ClipFormatError("%s: only 16-bit WAV can be decoded without miniaudio!" % name)
+        return Clip(name, reader.readframes(reader.getnframes()), reader.getframerate(),
+                    reader.getnchannels())
+
+
+class ClipCache:
+    """디코딩된 클립을 maxBytes 안에서 보관하는 LRU 캐시"""
+
+    def __init__(self, loader, maxBytes=32 << 20):
+        """loader: 클립 이름 -> Clip 함수, maxBytes: 보관할 PCM 최대 크기"""
+        self.loader = loader
+        self.maxBytes = maxBytes
+        self.size = 0
+        self.hitCount = 0
+        self.missCount = 0
+        self.evictCount = 0
+        self._clips = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, name):
+        """이름의 클립. 캐시에 없으면 디코딩해서 넣음"""
+        with self.lock:
+            clip = self._clips.get(name)
+            if clip is not None:
+                self._clips.move_to_end(name)
+                self.hitCount += 1
+                return clip
+        clip = self.loader(name)
+        with self.lock:
+            self.missCount += 1
+            self.put(clip)
+        return clip
+
+    def put(self, clip):
+        """클립을 넣고 maxBytes를 넘으면 오래 안 쓴 클립부터 버림 (lock을 잡은 상태로 호출)"""
+        old = self._clips.pop(clip.name, None)
+        if old is not None:
+            self.size -= len(old.pcm)
+        self._clips[clip.name] = clip
+        self.size += len(clip.pcm)
+        while self.size > self.maxBytes and len(self._clips) > 1:
+            name, evicted = self._clips.popitem(last=False)
+            self.size -= len(evicted.pcm)
+            self.evictCount += 1
+
+    def add(self, clip):
+        """이미 디코딩된 클립을 넣음"""
+        with self.lock:
+            self.put(clip)
+
+    def __contains__(self, name):
+        return name in self._clips
+
+    def __len__(self):
+        return len(self._clips)
+
+
+class NullSink:
+    """아무것도 재생하지 않는 출력"""
+
+    def play(self, clip):
+        pass
+
+    def stop(self):
+        pass
+
+
+class RecordingSink:
+    """재생했을 클립과 시각을 기록하는 출력. realtime이면 클립 길이/speed만큼 걸림 (stop()으로 중단)"""
+
+    def __init__(self, realtime=False, speed=1.0, clock=time):
+        self.realtime = realtime
+        self.speed = speed
+        self.clock = clock
+        # (클립 이름, 시작 ns, 끝 ns, 중단 여부)
+        self.played = []
+        self._stopEvent = threading.Event()
+
+    def play(self, clip):
+        self._stopEvent.clear()
+        startNs = self.clock.monotonic_ns()
+        stopped = False
+        if self.realtime:
+            stopped = self._stopEvent.wait(clipDuration(clip) / self.speed)
+        self.played.append((clip.name, startNs, self.clock.monotonic_ns(), stopped))
+
+    def stop(self):
+        self._stopEvent.set()
+
+
+class MiniaudioSink:
+    """miniaudio로 기본 출력 장치에서 재생. 재생이 끝나거나 stop()될 때까지 play()가 반환하지 않음"""
+
+    def __init__(self, deviceId=None):
+        if miniaudio is None:
+            raise RuntimeError("MiniaudioSink needs the miniaudio package!")
+        self.deviceId = deviceId
+        self._device = None
+        self._format = None
+        self._done = threading.Event()
+
+    def _stream(self, pcm, frameBytes):
+        """장치가 요청한 프레임 수만큼 PCM을 넘기는 miniaudio 생성기"""
+        offset = 0
+        frames = yield b''
+        while offset < len(pcm):
+            chunk = pcm[offset:offset + frames * frameBytes]
+            offset += len(chunk)
+            frames = yield chunk
+        self._done.set()
+        while True:
+            frames = yield b'\x00' * (frames * frameBytes)
+
+    def play(self, clip):
+        # 장치는 형식이 바뀔 때만 다시 엶
+        if self._format != (clip.sampleRate, clip.channels):
+            self.close()
+            self._device = miniaudio.PlaybackDevice(
+                output_format=miniaudio.SampleFormat.SIGNED16, nchannels=clip.channels,
+                sample_rate=clip.sampleRate, device_id=self.deviceId)
+            self._format = (clip.sampleRate, clip.channels)
+        self._done.clear()
+        stream = self._stream(clip.pcm, 2 * clip.channels)
+        next(stream)
+        self._device.start(stream)
+        self._done.wait(clipDuration(clip) + 1.0)
+        self._device.stop()
+
+    def stop(self):
+        self._done.set()
+
+    def close(self):
+        if self._device is not None:
+            self._device.close()
+            self._device = None
+            self._format = None
+
+
+class AlertPlayer:
+    """이벤트 알림을 우선순위 큐에 넣고 작업 스레드에서 하나씩 재생"""
+
+    def __init__(self, sink=None, alerts=None, directory=None, cacheBytes=32 << 20,
+                 dedupeWindow=3.0, minGap=0.3, maxAge=2.0, maxQueue=8, preempt=True,
+                 sampleRate=SAMPLE_RATE, channels=CHANNELS, clock=time):
+        """sink: 출력 (None이면 NullSink), alerts: {종류: (우선순위, 클립 파일 목록)},
+        directory: 클립 디렉터리 (None이면 이 모듈 옆), cacheBytes: PCM 캐시 크기,
+        dedupeWindow: 같은 종류를 다시 재생하지 않는 시간 (초), minGap: 클립 시작 최소 간격 (초),
+        maxAge: 이보다 오래 기다린 알림은 버림 (초), maxQueue: 대기 알림 최대 수,
+        preempt: 더 높은 우선순위 알림이 재생 중인 클립을 멈출지 여부"""
+        self.sink = sink if sink is not None else NullSink()
+        self.alerts = dict(DEFAULT_ALERTS if alerts is None else alerts)
+        self.directory = directory if directory is not None else os.path.dirname(os.path.abspath(__file__))
+        self.dedupeWindowNs = int(dedupeWindow * 1e9)
+        self.minGapNs = int(minGap * 1e9)
+        self.maxAgeNs = int(maxAge * 1e9)
+        self.maxQueue = maxQueue
+        self.preempt = preempt
+        self.sampleRate = sampleRate
+        self.channels = channels
+        self.clock = clock
+        self.cache = ClipCache(self._load, cacheBytes)
+
+        # 클립 이름 -> 판별한 형식, 디코딩할 수 없는 클립 이름 -> 이유
+        self.formats = {}
+        self.unavailable = {}
+        self.counts = dict.fromkeys(('queued', 'played', 'deduped', 'dropped', 'stale',
+                                     'preempted', 'failed'), 0)
+        # alert() 호출부터 재생 시작까지 (ns)
+        self.latency = Histogram()
+
+        self.running = False
+        self.thread = None
+        self.playing = None
+        self._queue = []
+        self._queuedKinds = set()
+        self._seq = 0
+        self._lastStartNs = {}
+        self._lastAnyStartNs = None
+        self._lastPriority = None
+        self._variant = {}
+        self._condition = threading.Condition()
+
+    def _load(self, name):
+        with open(os.path.join(self.directory, name), 'rb') as f:
+            data = f.read()
+        self.formats[name] = detectFormat(data)
+        return decodeClip(name, data, self.sampleRate, self.channels)
+
+    def preload(self):
+        """모든 알림 클립을 디코딩해 캐시에 넣음. 실패한 클립은 unavailable에 기록"""
+        for priority, names in self.alerts.values():
+            for name in names:
+                if name in self.cache or name in self.unavailable:
+                    continue
+                try:
+                    self.cache.get(name)
+                except (OSError, ValueError, RuntimeError) as e:
+                    self.unavailable[name] = str(e)
+
+    def start(self):
+        """클립을 미리 디코딩하고 작업 스레드를 시작"""
+        if self.running:
+            return
+        self.preload()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="pedal-alerts", daemon=True)
+        self.thread.start()
+
+    def stop(self, timeout=None):
+        """작업 스레드를 멈춤 (대기 중인 알림은 버림)"""
+        with self._condition:
+            if not self.running:
+                return
+            self.running = False
+            self._condition.notify_all()
+        self.sink.stop()
+        self.thread.join(timeout)
+        self.thread = None
+
+    def alert(self, kind, timestampNs=None):
+        """kind 알림을 큐에 넣음. 넣었으면 True, 중복이거나 버렸으면 False (막히지 않음)"""
+        priority = self.alerts[kind][0]
+        nowNs = self.clock.monotonic_ns()
+        with self._condition:
+            if kind in self._queuedKinds:
+                self.counts['deduped'] += 1
+                return False
+            lastNs = self._lastStartNs.get(kind)
+            if lastNs is not None and nowNs - lastNs < self.dedupeWindowNs:
+                self.counts['deduped'] += 1
+                return False
+            if len(self._queue) >= self.maxQueue:
+                # 가장 낮은 우선순위보다 높으면 그것을 버리고 넣음
+                lowest = max(self._queue)
+                if lowest[0] <= priority:
+                    self.counts['dropped'] += 1
+                    return False
+                self._queue.remove(lowest)
+                heapq.heapify(self._queue)
+                self._queuedKinds.discard(lowest[2])
+                self.counts['dropped'] += 1
+            self._seq += 1
+            heapq.heappush(self._queue, (priority, self._seq, kind, nowNs))
+            self._queuedKinds.add(kind)
+            self.counts['queued'] += 1
+            playing = self.playing
+            self._condition.notify()
+        if self.preempt and playing is not None and priority < playing[0]:
+            self.counts['preempted'] += 1
+            self.sink.stop()
+        return True
+
+    def onEvent(self, event):
+        """PedalEventDetector listener"""
+        if event.kind in self.alerts:
+            self.alert(event.kind)
+
+    def _next(self):
+        """재생할 다음 (우선순위, 일련번호, 종류, 넣은 ns). 멈추면 None"""
+        with self._condition:
+            while self.running:
+                if not self._queue:
+                    self._condition.wait()
+                    continue
+                nowNs = self.clock.monotonic_ns()
+                # 직전 클립보다 높은 우선순위는 간격 제한 없이 바로 재생
+                if self._lastAnyStartNs is not None and self._queue[0][0] >= self._lastPriority:
+                    delayNs = self._lastAnyStartNs + self.minGapNs - nowNs
+                    if delayNs > 0:
+                        # 기다리는 동안 더 높은 우선순위 알림이 올 수 있으므로 다시 고름
+                        self._condition.wait(delayNs / 1e9)
+                        continue
+                item = heapq.heappop(self._queue)
+                self._queuedKinds.discard(item[2])
+                if nowNs - item[3] > self.maxAgeNs:
+                    self.counts['stale'] += 1
+                    continue
+                self.playing = item
+                self._lastStartNs[item[2]] = nowNs
+                self._lastAnyStartNs = nowNs
+                self._lastPriority = item[0]
+                self.latency.add(nowNs - item[3])
+                return item
+        return None
+
+    def _run(self):
+        while True:
+            item = self._next()
+            if item is None:
+                break
+            kind = item[2]
+            names = self.alerts[kind][1]
+            index = self._variant.get(kind, 0)
+            self._variant[kind] = index + 1
+            name = names[index % len(names)]
+            try:
+                if name in self.unavailable:
+                    raise ClipFormatError(self.unavailable[name])
+                self.sink.play(self.cache.get(name))
+                self.counts['played'] += 1
+            except Exception:
+                self.counts['failed'] += 1
+            finally:
+                self.playing = None
+
+    def getStats(self):
+        """알림 카운터, 재생 지연 요약, 캐시 상태"""
+        with self._condition:
+            counts = dict(self.counts)
+            counts['waiting'] = len(self._queue)
+        return {
+            'counts': counts,
+            'latency': self.latency.snapshot(),
+            'cache': {'clips': len(self.cache), 'bytes': self.cache.size, 'hits': self.cache.hitCount,
+                      'misses': self.cache.missCount, 'evictions': self.cache.evictCount},
+            'unavailable': dict(self.unavailable),
+        }
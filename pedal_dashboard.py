@@ -0,0 +1,372 @@
+import os
+import time
+
+from hx711_stats import Histogram
+from pedal_events import ACCELERATOR, BRAKE
+
+try:
+    import pygame
+except ImportError:
+    pygame = None
+
+'''
+Live pedal dashboard drawn at a fixed frame rate.
+
+Samples only update a DashboardState (two floats and a counter, no drawing)
+from whatever thread reads the sensors, so 80 SPS per pedal costs nothing on
+the display side.  Dashboard.run() wakes fps times a second, takes the latest
+state and turns it into a frame key: the bar heights in pixels, the texts and
+the banner, i.e. only what is visible.  When the key is the same as the last
+drawn frame nothing is drawn or presented (skippedFrames); when the loop falls
+behind by whole frames it does not try to catch up but counts them in
+droppedFrames and waits for the next frame time.
+
+The pedal images of every theme are decoded and scaled to the panel size
+once, in AssetCache, at start-up (preload()), so switching themes is a
+dictionary lookup with no disk I/O.
+
+PygameRenderer draws with pygame (optional); headless=True draws into an
+off-screen pygame.Surface with no display.  NullRenderer draws nothing, for
+timing the loop itself.  benchmark_dashboard.py measures frame time, skipped
+and dropped frames.
+
+Usage:
+    state = DashboardState()
+    state.attach(acceleratorHx, ACCELERATOR)
+    state.attach(brakeHx, BRAKE)
+    detector.listeners.append(state.onEvent)
+    Dashboard(PygameRenderer(), state, theme='dark').run()
+'''
+
+# 테마별 페달 이미지와 색 (배경, 글자, 막대)
+THEMES = {
+    'normal': {
+        ACCELERATOR: 'newaccel_normal.png',
+        BRAKE: 'newbrake_normal.png',
+        'background': (255, 255, 255),
+        'text': (20, 20, 20),
+        'bar': (40, 160, 60),
+    },
+    'dark': {
+        ACCELERATOR: 'newaccel_dark.png',
+        BRAKE: 'newbrake_dark.png',
+        'background': (18, 18, 18),
+        'text': (235, 235, 235),
+        'bar': (70, 200, 90),
+    },
+    'classic': {
+        ACCELERATOR: 'accel_normal.png',
+        BRAKE: 'brake_normal.png',
+        'background': (255, 255, 255),
+        'text': (20, 20, 20),
+        'bar': (40, 160, 60),
+    },
+}
+
+# 이벤트 배너 문구
+EVENT_TEXTS = {
+    'rapidAcceleration': "RAPID ACCELERATION",
+    'hardBrake': "HARD BRAKE",
+    'noBrake': "NO BRAKE",
+    'stop': "STOP",
+}
+
+
+class DashboardState:
+    """샘플 스레드가 갱신하고 렌더 루프가 읽는 최신 페달 상태"""
+
+    def __init__(self, clock=time):
+        self.clock = clock
+        self.forces = {ACCELERATOR: 0.0, BRAKE: 0.0}
+        self.event = None
+        self.eventNs = 0
+        # 받은 샘플 수 (프레임당 몇 개가 합쳐졌는지 보기 위한 값)
+        self.updateCount = 0
+
+    def update(self, pedal, force):
+        """pedal의 최신 힘 (kg). 그리지는 않음"""
+        self.forces[pedal] = force
+        self.updateCount += 1
+
+    def onEvent(self, event):
+        """PedalEventDetector listener. 배너로 표시할 마지막 이벤트"""
+        self.event = event.kind
+        self.eventNs = self.clock.monotonic_ns()
+
+    def attach(self, hx, pedal):
+        """hx의 모든 변환을 pedal 상태로 반영하도록 준비 콜백을 등록. 등록한 콜백을 반환"""
+        update = self.update
+        rawBytesToWeight = hx.rawBytesToWeight
+
+        def onSample(rawBytes):
+            """변환 하나를 무게로 바꿔 상태에 씀 (ChannelScheduler가 섞어 읽는 다른 채널 변환은 무시)"""
+            if hx.lastReadMatchesGain():
+                update(pedal, rawBytesToWeight(rawBytes))
+
+        hx.enableReadyCallback(onSample)
+        return onSample
+
+
+class AssetCache:
+    """테마 이미지를 한 번만 디코딩하고 크기별로 한 번만 스케일해 보관"""
+
+    def __init__(self, renderer, directory=None):
+        self.renderer = renderer
+        self.directory = directory if directory is not None else os.path.dirname(os.path.abspath(__file__))
+        # 디스크에서 읽은 횟수와 스케일한 횟수
+        self.loadCount = 0
+        self.scaleCount = 0
+        self._decoded = {}
+        self._scaled = {}
+
+    def image(self, name, size):
+        """size (폭, 높이) 안에 비율을 유지해 맞춘 이미지"""
+        key = (name, size)
+        scaled = self._scaled.get(key)
+        if scaled is None:
+            decoded = self._decoded.get(name)
+            if decoded is None:
+                decoded = self.renderer.loadImage(os.path.join(self.directory, name))
+                self._decoded[name] = decoded
+                self.loadCount += 1
+            scaled = self.renderer.scaleImage(decoded, size)
+            self._scaled[key] = scaled
+            self.scaleCount += 1
+        return scaled
+
+    def theme(self, theme, size):
+        """테마의 페달별 이미지 {페달: 이미지}"""
+        images = THEMES[theme]
+        return {ACCELERATOR: self.image(images[ACCELERATOR], size),
+                BRAKE: self.image(images[BRAKE], size)}
+
+    def preload(self, size):
+        """모든 테마의 이미지를 미리 준비"""
+        for theme in THEMES:
+            self.theme(theme, size)
+
+
+class NullRenderer:
+    """아무것도 그리지 않는 렌더러 (렌더 루프 자체의 비용 측정용)"""
+
+    def __init__(self, size=(800, 480)):
+        self.size = size
+        self.drawCount = 0
+
+    def loadImage(self, path):
+        return path
+
+    def scaleImage(self, image, size):
+        return (image, size)
+
+    def draw(self, frame, images, colors):
+        self.drawCount += 1
+
+    def present(self):
+        pass
+
+    def poll(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class PygameRenderer:
+    """pygame 렌더러. headless면 화면 없이 오프스크린 Surface에 그림"""
+
+    # 렌더링해 둘 글자 이미지 최대 수
+    TEXT_CACHE = 256
+
+    def __init__(self, size=(800, 480), headless=False, fontSize=48):
+        if pygame is None:
+            raise RuntimeError("PygameRenderer needs the pygame package!")
+        self.size = size
+        self.headless = headless
+        if headless:
+            self.screen = pygame.Surface(size)
+        else:
+            pygame.display.init()
+            self.screen = pygame.display.set_mode(size)
+            pygame.display.set_caption("Pedals")
+        pygame.font.init()
+        self.font = pygame.font.Font(None, fontSize)
+        self._texts = {}
+
+    def loadImage(self, path):
+        image = pygame.image.load(path)
+        # 화면 형식으로 한 번 바꿔 두면 blit이 빨라짐
+        return image if self.headless else image.convert_alpha()
+
+    def scaleImage(self, image, size):
+        width, height = image.get_size()
+        scale = min(size[0] / width, size[1] / height)
+        return pygame.transform.smoothscale(image, (max(1, int(width * scale)), max(1, int(height * scale))))
+
+    def text(self, string, color):
+        """글자 이미지 (색과 문자열별로 캐시)"""
+        key = (string, color)
+        surface = self._texts.get(key)
+        if surface is None:
+            if len(self._texts) >= self.TEXT_CACHE:
+                self._texts.clear()
+            surface = self.font.render(string, True, color)
+            self._texts[key] = surface
+        return surface
+
+    def draw(self, frame, images, colors):
+        screen = self.screen
+        screen.fill(colors['background'])
+        for panel in frame['panels']:
+            x, y, width, height = panel['rect']
+            image = images[panel['pedal']]
+            screen.blit(image, (x + (width - image.get_width()) // 2, y))
+            barX = x + width - 24
+            barBottom = y + height
+            pygame.draw.rect(screen, colors['text'], (barX, y, 16, height), 1)
+            if panel['bar']:
+                pygame.draw.rect(screen, colors['bar'], (barX, barBottom - panel['bar'], 16, panel['bar']))
+            label = self.text(panel['text'], colors['text'])
+            screen.blit(label, (x + (width - label.get_width()) // 2, barBottom + 8))
+        if frame['banner']:
+            banner = self.text(frame['banner'], (220, 30, 30))
+            screen.blit(banner, ((self.size[0] - banner.get_width()) // 2, 8))
+
+    def present(self):
+        if not self.headless:
+            pygame.display.flip()
+
+    def poll(self):
+        """창 이벤트 처리. 창을 닫으면 False"""
+        if self.headless:
+            return True
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+        return True
+
+    def close(self):
+        if not self.headless:
+            pygame.display.quit()
+
+
+class Dashboard:
+    """고정 주기로 최신 상태만 그리는 렌더 루프. 보이는 것이 바뀌지 않으면 그리지 않음"""
+
+    def __init__(self, renderer, state, theme='normal', fps=30, fullScale=30.0, resolution=0.5,
+                 bannerSeconds=2.0, directory=None, clock=time):
+        """fullScale: 막대가 가득 차는 힘 (kg), resolution: 표시 힘 단위 (kg),
+        bannerSeconds: 이벤트 배너 표시 시간 (초), clock: 시계 (time 모듈 또는 hx711_time.SimulatedClock)"""
+        if fps <= 0:
+            raise ValueError("Dashboard::__init__() fps must be greater than zero!")
+        self.renderer = renderer
+        self.state = state
+        self.fps = fps
+        self.periodNs = int(1e9 / fps)
+        self.fullScale = fullScale
+        self.resolution = resolution
+        self.bannerNs = int(bannerSeconds * 1e9)
+        self.clock = clock
+        self.running = False
+
+        width, height = renderer.size
+        panelWidth = width // 2
+        self.imageSize = (panelWidth - 40, height - 140)
+        self.barHeight = self.imageSize[1]
+        self.panels = ((ACCELERATOR, (0, 60, panelWidth, self.barHeight)),
+                       (BRAKE, (panelWidth, 60, panelWidth, self.barHeight)))
+
+        self.assets = AssetCache(renderer, directory)
+        self.assets.preload(self.imageSize)
+        self.setTheme(theme)
+
+        self.drawnFrames = 0
+        self.skippedFrames = 0
+        self.droppedFrames = 0
+        # 그린 프레임의 그리기+표시 시간 (ns)
+        self.frameTime = Histogram()
+        self._lastKey = None
+
+    def setTheme(self, theme):
+        """테마 변경 (이미지는 캐시에서 가져오므로 디스크를 읽지 않음)"""
+        if theme not in THEMES:
+            raise ValueError("Dashboard::setTheme() unknown theme %s!" % theme)
+        self.theme = theme
+        self.images = self.assets.theme(theme, self.imageSize)
+        self.colors = THEMES[theme]
+
+    def frameKey(self):
+        """현재 상태에서 화면에 보이는 값만 모은 튜플"""
+        forces = self.state.forces
+        resolution = self.resolution
+        values = []
+        for pedal, rect in self.panels:
+            force = round(max(forces[pedal], 0.0) / resolution) * resolution
+            bar = int(min(force / self.fullScale, 1.0) * self.barHeight)
+            values.append((bar, "%.1f kg" % force))
+        banner = None
+        event = self.state.event
+        if event is not None and self.clock.monotonic_ns() - self.state.eventNs < self.bannerNs:
+            banner = EVENT_TEXTS.get(event, event)
+        return (self.theme, values[0], values[1], banner)
+
+    def renderFrame(self, force=False):
+        """바뀐 것이 있으면 한 프레임을 그리고 True, 없으면 False"""
+        key = self.frameKey()
+        if key == self._lastKey and not force:
+            self.skippedFrames += 1
+            return False
+        startNs = time.perf_counter_ns()
+        frame = {
+            'panels': [{'pedal': pedal, 'rect': rect, 'bar': value[0], 'text': value[1]}
+                       for (pedal, rect), value in zip(self.panels, key[1:3])],
+            'banner': key[3],
+        }
+        self.renderer.draw(frame, self.images, self.colors)
+        self.renderer.present()
+        self.frameTime.add(time.perf_counter_ns() - startNs)
+        self.drawnFrames += 1
+        self._lastKey = key
+        return True
+
+    def run(self, frames=None, seconds=None):
+        """fps 주기로 렌더링. frames개 프레임 시각이 지나거나 seconds초가 지나거나 stop()/창 닫기까지"""
+        clock = self.clock
+        periodNs = self.periodNs
+        self.running = True
+        startNs = clock.monotonic_ns()
+        endNs = startNs + int(seconds * 1e9) if seconds is not None else None
+        index = 0
+        self.renderFrame(force=True)
+        while self.running and (frames is None or index < frames - 1):
+            index += 1
+            targetNs = startNs + index * periodNs
+            nowNs = clock.monotonic_ns()
+            if nowNs > targetNs + periodNs:
+                # 밀린 프레임은 건너뛰고 다음 프레임 시각에 맞춤
+                late = (nowNs - targetNs) // periodNs
+                self.droppedFrames += late
+                index += late
+                targetNs += late * periodNs
+            if endNs is not None and targetNs > endNs:
+                break
+            if targetNs > nowNs:
+                clock.sleep((targetNs - nowNs) / 1e9)
+            if not self.renderer.poll():
+                break
+            self.renderFrame()
+        self.running = False
+
+    def stop(self):
+        """run()을 다음 프레임에서 끝냄 (다른 스레드에서 호출)"""
+        self.running = False
+
+    def getStats(self):
+        """그린/건너뛴/밀린 프레임 수와 프레임 시간 요약"""
+        return {
+            'drawn': self.drawnFrames,
+            'skipped': self.skippedFrames,
+            'dropped': self.droppedFrames,
+            'frameTime': self.frameTime.snapshot(),
+            'imageLoads': self.assets.loadCount,
+        }
@@ -0,0 +1,284 @@
+import threading
+from collections import namedtuple
+
+'''
+Streaming pedal event detection over the accelerator and brake load cells.
+
+Every sample is processed once, in O(1), as it arrives:
+
+- a median of the last 3 samples removes single-sample spikes (one sample of
+  delay);
+- a short EMA smooths the remaining noise;
+- the rate of change is the difference to the smoothed force RATE_WINDOW
+  seconds earlier, taken from a small ring of recent values;
+- a pedal counts as pressed above pressForce and released below
+  releaseForce (hysteresis), and the press duration is tracked.
+
+Events, each re-armed only after its condition has cleared and at most once
+per refractory period:
+
+- RAPID_ACCELERATION: accelerator force rising faster than rapidRate
+  (kg/s) for confirmSamples samples in a row;
+- HARD_BRAKE: brake force rising faster than hardBrakeRate, or above
+  hardBrakeForce;
+- NO_BRAKE: accelerator held above noBrakeForce for noBrakeSeconds with the
+  brake released (the driver may be pressing the wrong pedal);
+- STOP: brake held above stopForce for stopSeconds with the accelerator
+  released.
+
+At 80 SPS a sharp press is reported in about 4-6 samples (50-75 ms) after
+it starts.  benchmark_pedal_events.py measures the latency and the false
+positives on synthetic or replayed traces.
+
+Usage:
+    detector = PedalEventDetector()
+    detector.listeners.append(lambda event: print(event))
+    detector.attach(acceleratorHx, ACCELERATOR)
+    detector.attach(brakeHx, BRAKE)
+'''
+
+ACCELERATOR = 'accelerator'
+BRAKE = 'brake'
+
+RAPID_ACCELERATION = 'rapidAcceleration'
+HARD_BRAKE = 'hardBrake'
+NO_BRAKE = 'noBrake'
+STOP = 'stop'
+
+# kind: 이벤트 종류, timestampNs: 감지한 샘플의 시각, pedal: 페달,
+# force: 그때의 힘 (kg), rate: 힘의 변화율 (kg/s), duration: 페달을 밟고 있던 시간 (초)
+PedalEvent = namedtuple('PedalEvent', ['kind', 'timestampNs', 'pedal', 'force', 'rate', 'duration'])
+
+
+class PedalTracker:
+    """페달 하나의 힘, 변화율, 밟힘 여부와 밟은 시간을 샘플마다 갱신"""
+
+    # 변화율을 계산하는 구간 (초)
+    RATE_WINDOW = 0.05
+
+    # 변화율 계산용으로 보관하는 최근 샘플 수 (RATE_WINDOW보다 길게)
+    HISTORY = 32
+
+    def __init__(self, pedal, pressForce=2.0, releaseForce=1.0, smoothing=0.02):
+        """pressForce/releaseForce: 밟힘/떼어짐 판정 힘 (kg), smoothing: EMA 시정수 (초)"""
+        if releaseForce > pressForce:
+            raise ValueError("PedalTracker() releaseForce must not be greater than pressForce!")
+        self.pedal = pedal
+        self.pressForce = pressForce
+        self.releaseForce = releaseForce
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        """상태 초기화"""
+        self.force = 0.0
+        self.rate = 0.0
+        self.pressed = False
+        self.pressedSinceNs = None
+        self.timestampNs = None
+        self.sampleCount = 0
+        self._last = [0.0, 0.0]
+        self._forces = [0.0] * self.HISTORY
+        self._timestamps = [0] * self.HISTORY
+        self._index = 0
+
+    def duration(self):
+        """현재 밟고 있는 시간 (초). 떼어져 있으면 0"""
+        if not self.pressed:
+            return 0.0
+        return (self.timestampNs - self.pressedSinceNs) / 1e9
+
+    def update(self, force, timestampNs):
+        """샘플 하나로 상태를 갱신"""
+        previousNs = self.timestampNs
+        self.timestampNs = timestampNs
+        self.sampleCount += 1
+
+        # 최근 3개의 중앙값으로 한 샘플짜리 스파이크 제거
+        a, b = self._last
+        self._last[0] = b
+        self._last[1] = force
+        if self.sampleCount >= 3:
+            if a > b:
+                a, b = b, a
+            median = a if force < a else (b if force > b else force)
+        else:
+            median = force
+
+        if previousNs is None:
+            smoothed = median
+        else:
+            dt = (timestampNs - previousNs) / 1e9
+            alpha = dt / (self.smoothing + dt) if dt > 0 else 1.0
+            smoothed = self.force + alpha * (median - self.force)
+        self.force = smoothed
+
+        # RATE_WINDOW 전(또는 그보다 조금 더 전)의 값과 비교
+        forces = self._forces
+        timestamps = self._timestamps
+        history = self.HISTORY
+        index = self._index
+        forces[index] = smoothed
+        timestamps[index] = timestampNs
+        self._index = (index + 1) % history
+        windowNs = self.RATE_WINDOW * 1e9
+        back = 1
+        count = min(self.sampleCount, history)
+        while back < count - 1 and timestampNs - timestamps[(index - back) % history] < windowNs:
+            back += 1
+        if back < count:
+            old = (index - back) % history
+            dt = (timestampNs - timestamps[old]) / 1e9
+            self.rate = (smoothed - forces[old]) / dt if dt > 0 else 0.0
+        else:
+            self.rate = 0.0
+
+        if self.pressed:
+            if smoothed < self.releaseForce:
+                self.pressed = False
+                self.pressedSinceNs = None
+        elif smoothed > self.pressForce:
+            self.pressed = True
+            self.pressedSinceNs = timestampNs
+
+
+class PedalEventDetector:
+    """가속/브레이크 페달 스트림에서 급가속, 급제동, 브레이크 미사용, 정차 이벤트를 감지"""
+
+    def __init__(self, rapidRate=40.0, hardBrakeRate=60.0, hardBrakeForce=25.0,
+                 noBrakeForce=15.0, noBrakeSeconds=2.0, stopForce=5.0, stopSeconds=1.5,
+                 confirmSamples=2, refractory=1.0, pressForce=2.0, releaseForce=1.0):
+        """rapidRate/hardBrakeRate: 급가속/급제동 변화율 (kg/s), hardBrakeForce: 급제동 힘 (kg),
+        noBrakeForce/noBrakeSeconds: 브레이크 없이 가속 페달을 이 힘 이상으로 이 시간 밟으면 NO_BRAKE,
+        stopForce/stopSeconds: 가속 페달 없이 브레이크를 이 힘 이상으로 이 시간 밟으면 STOP,
+        confirmSamples: 변화율 조건이 연속으로 유지되어야 하는 샘플 수, refractory: 같은 이벤트의 최소 간격 (초)"""
+        self.rapidRate = rapidRate
+        self.hardBrakeRate = hardBrakeRate
+        self.hardBrakeForce = hardBrakeForce
+        self.noBrakeForce = noBrakeForce
+        self.noBrakeSeconds = noBrakeSeconds
+        self.stopForce = stopForce
+        self.stopSeconds = stopSeconds
+        self.confirmSamples = confirmSamples
+        self.refractoryNs = int(refractory * 1e9)
+
+        self.trackers = {
+            ACCELERATOR: PedalTracker(ACCELERATOR, pressForce, releaseForce),
+            BRAKE: PedalTracker(BRAKE, pressForce, releaseForce),
+        }
+        # 이벤트가 생길 때마다 listener(event) 호출 (update()를 부른 스레드에서)
+        self.listeners = []
+        self.eventCounts = dict.fromkeys((RAPID_ACCELERATION, HARD_BRAKE, NO_BRAKE, STOP), 0)
+        self.lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._streak = {RAPID_ACCELERATION: 0, HARD_BRAKE: 0}
+        self._armed = dict.fromkeys(self.eventCounts, True)
+        self._lastEventNs = dict.fromkeys(self.eventCounts, None)
+        self._noBrakeSinceNs = None
+        self._stopSinceNs = None
+
+    def reset(self):
+        """페달 상태와 이벤트 재무장 상태 초기화 (카운터는 유지)"""
+        with self.lock:
+            for tracker in self.trackers.values():
+                tracker.reset()
+            self._reset()
+
+    def _fire(self, kind, tracker, events):
+        """kind 이벤트를 만들어 events에 추가. 재무장 전이거나 최소 간격 안이면 무시"""
+        timestampNs = tracker.timestampNs
+        lastNs = self._lastEventNs[kind]
+        if not self._armed[kind] or (lastNs is not None and timestampNs - lastNs < self.refractoryNs):
+            return
+        self._armed[kind] = False
+        self._lastEventNs[kind] = timestampNs
+        self.eventCounts[kind] += 1
+        events.append(PedalEvent(kind, timestampNs, tracker.pedal, tracker.force, tracker.rate,
+                                 tracker.duration()))
+
+    def _rateEvent(self, kind, tracker, triggered, cleared, events):
+        """변화율 조건이 confirmSamples번 연속이면 발생, cleared면 재무장"""
+        if triggered:
+            self._streak[kind] += 1
+            if self._streak[kind] >= self.confirmSamples:
+                self._fire(kind, tracker, events)
+        else:
+            self._streak[kind] = 0
+            if cleared:
+                self._armed[kind] = True
+
+    def update(self, pedal, force, timestampNs):
+        """pedal(ACCELERATOR 또는 BRAKE)의 샘플 하나(kg, ns)를 처리하고 새로 생긴 이벤트 목록을 반환"""
+        events = []
+        with self.lock:
+            tracker = self.trackers[pedal]
+            tracker.update(force, timestampNs)
+            accelerator = self.trackers[ACCELERATOR]
+            brake = self.trackers[BRAKE]
+
+            if pedal == ACCELERATOR:
+                self._rateEvent(RAPID_ACCELERATION, tracker,
+                                tracker.pressed and tracker.rate >= self.rapidRate,
+                                tracker.rate < 0.5 * self.rapidRate, events)
+
+                if tracker.force >= self.noBrakeForce and not brake.pressed:
+                    if self._noBrakeSinceNs is None:
+                        self._noBrakeSinceNs = timestampNs
+                    elif timestampNs - self._noBrakeSinceNs >= self.noBrakeSeconds * 1e9:
+                        self._fire(NO_BRAKE, tracker, events)
+                else:
+                    self._noBrakeSinceNs = None
+                    self._armed[NO_BRAKE] = True
+            else:
+                hard = tracker.pressed and (tracker.rate >= self.hardBrakeRate or
+                                            tracker.force >= self.hardBrakeForce)
+                self._rateEvent(HARD_BRAKE, tracker, hard,
+                                tracker.rate < 0.5 * self.hardBrakeRate and
+                                tracker.force < 0.8 * self.hardBrakeForce, events)
+
+                if tracker.force >= self.stopForce and not accelerator.pressed:
+                    if self._stopSinceNs is None:
+                        self._stopSinceNs = timestampNs
+                    elif timestampNs - self._stopSinceNs >= self.stopSeconds * 1e9:
+                        self._fire(STOP, tracker, events)
+                elif not tracker.pressed or accelerator.pressed:
+                    self._stopSinceNs = None
+                    self._armed[STOP] = True
+
+            # 가속 페달을 밟으면 정차가 끝나고, 브레이크를 밟으면 브레이크 미사용 구간이 끝남
+            if pedal == ACCELERATOR and tracker.pressed:
+                self._stopSinceNs = None
+                self._armed[STOP] = True
+            elif pedal == BRAKE and tracker.pressed:
+                self._noBrakeSinceNs = None
+                self._armed[NO_BRAKE] = True
+
+        for event in events:
+            for listener in self.listeners:
+                listener(event)
+        return events
+
+    def attach(self, hx, pedal):
+        """hx(hx711v0_5_1.HX711 API)의 모든 변환을 pedal 샘플로 처리하도록 준비 콜백을 등록. 등록한 콜백을 반환"""
+        update = self.update
+        rawBytesToWeight = hx.rawBytesToWeight
+
+        def onSample(rawBytes):
+            """변환 하나를 무게로 바꿔 감지기에 넣음 (ChannelScheduler가 섞어 읽는 다른 채널 변환은 무시)"""
+            if hx.lastReadMatchesGain():
+                update(pedal, rawBytesToWeight(rawBytes), hx.lastReadyNs)
+
+        hx.enableReadyCallback(onSample)
+        return onSample
+
+    def getStats(self):
+        """종류별 이벤트 수와 페달별 현재 상태"""
+        with self.lock:
+            return {
+                'events': dict(self.eventCounts),
+                'pedals': dict((pedal, {'force': tracker.force, 'rate': tracker.rate,
+                                        'pressed': tracker.pressed, 'duration': tracker.duration()})
+                               for pedal, tracker in self.trackers.items()),
+            }
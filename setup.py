@@ -4,7 +4,9 @@ setup(
     name='hx711',
     version='0.1.0',
     description='HX711 Python Library for Raspberry Pi',
-    py_modules=['hx711'],
+    py_modules=['hx711', 'hx711_gpio', 'hx711_ready',
+                'hx711_acquisition', 'hx711_clockout', 'hx711_reduce',
+                'hx711_integrity', 'hx711_stats', 'hx711_channels'],
     install_requires=['Rpi.GPIO'],
 )
 